@@ -0,0 +1,125 @@
+"""Content-hash manifest for generated artifacts (SVGs, README sections).
+
+Each artifact is recorded with a digest of its INPUTS (the data.json
+slice it renders, its template version, the date label it prints) and a
+sha256 of the OUTPUT as written. A stage asks is_fresh() before
+rendering; when the input digest matches and the output still hashes to
+what was written, rendering and writing are both skipped — no work and
+no git churn for a run whose inputs didn't move.
+
+Several artifacts can share one output (README.md carries four sections,
+patched by different workflows). Such an artifact passes `part`, its own
+slice of the file, and only that slice is hashed, so rewriting a sibling
+section doesn't invalidate it. A hand edit, or a stage that skipped the
+manifest, changes the hash and forces a rebuild.
+
+Entries hold no timestamps and are rewritten only when the digest or the
+output hash moves, so an unchanged run leaves the manifest byte-identical.
+Each workflow commits its own manifest (BUILD_MANIFEST_PATH; default
+dashboard/.build_manifest.json) so concurrent workflows never race on
+one file: they start from a fresh checkout and push after a rebase.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from _fileio import atomic_write_text
+
+MANIFEST_PATH = Path('dashboard/.build_manifest.json')
+MANIFEST_VERSION = 1
+
+
+def input_digest(*parts: Any) -> str:
+    """Stable sha256 over JSON-serializable inputs (dict key order ignored)."""
+    blob = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+
+def _text_sha(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def _file_sha(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+class BuildManifest:
+    def __init__(self, path: Union[str, Path] = MANIFEST_PATH):
+        self.path = Path(path)
+        self.rebuilt: List[str] = []
+        self.unchanged: List[str] = []
+        try:
+            raw = json.loads(self.path.read_text())
+            ok = isinstance(raw, dict) and raw.get('version') == MANIFEST_VERSION
+            self.artifacts: Dict[str, Dict[str, Any]] = raw.get('artifacts', {}) if ok else {}
+        except (FileNotFoundError, ValueError):
+            self.artifacts = {}
+
+    def is_fresh(self, artifact: str, digest: str, output: Union[str, Path],
+                 part: Optional[str] = None) -> bool:
+        """True (and noted as unchanged) if `artifact` was built from `digest`
+        and its output — or its `part` of a shared output — is byte-for-byte
+        what was written then."""
+        entry = self.artifacts.get(artifact)
+        current = _file_sha(Path(output)) if part is None else _text_sha(part)
+        fresh = (isinstance(entry, dict) and entry.get('digest') == digest
+                 and entry.get('output') == str(output)
+                 and entry.get('outputSha') is not None
+                 and entry.get('outputSha') == current)
+        if fresh:
+            self.unchanged.append(artifact)
+        return fresh
+
+    def write(self, artifact: str, digest: str, output: Union[str, Path], text: str,
+              part: Optional[str] = None) -> bool:
+        """Record a build of `artifact`; write `output` only if its bytes change.
+
+        `part` is the artifact's slice of `text` when the output is shared.
+        Returns True if the file was (re)written.
+        """
+        output = Path(output)
+        written = _file_sha(output) != _text_sha(text)
+        if written:
+            atomic_write_text(output, text)
+        entry = {
+            'digest': digest,
+            'output': str(output),
+            'outputSha': _text_sha(text if part is None else part),
+        }
+        self.rebuilt.append(artifact)
+        if self.artifacts.get(artifact) != entry:
+            self.artifacts[artifact] = entry
+            self.save()
+        return written
+
+    def save(self) -> None:
+        doc = {'version': MANIFEST_VERSION, 'artifacts': self.artifacts}
+        atomic_write_text(self.path, json.dumps(doc, indent=2, sort_keys=True) + '\n')
+
+    def report(self) -> str:
+        return (f"rebuilt: {', '.join(self.rebuilt) or 'none'} | "
+                f"unchanged: {', '.join(self.unchanged) or 'none'}")
+
+
+_manifests: Dict[Path, BuildManifest] = {}
+
+
+def _default_path() -> Path:
+    """BUILD_MANIFEST_PATH picks the calling workflow's manifest."""
+    return Path(os.getenv('BUILD_MANIFEST_PATH') or MANIFEST_PATH)
+
+
+def get_manifest(path: Union[str, Path, None] = None) -> BuildManifest:
+    """Process-wide manifest for `path` (resolved against the current cwd)."""
+    key = Path(path or _default_path()).resolve()
+    manifest = _manifests.get(key)
+    if manifest is None:
+        manifest = _manifests[key] = BuildManifest(key)
+    return manifest
@@ -0,0 +1,47 @@
+"""Disk cache of per-day commit contributions, keyed by KST date.
+
+Every weekly/range commit total (get_weekly_commits, check_weekly_reset's
+closing-week confirmation, backfill_commits) is a local sum over these
+days; only days that aren't final yet go back to the API.
+
+A day is 'final' once it was fetched at least FINAL_AFTER after it ended
+(KST) — late pushes with an earlier author date have landed by then.
+Today and yesterday are therefore always refetched.
+"""
+
+from __future__ import annotations
+import json
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+CACHE_VERSION = 1
+KST = timezone(timedelta(hours=9))
+FINAL_AFTER = timedelta(days=1)
+
+
+def load_calendar(path: Path) -> Dict[str, Any]:
+    try:
+        data = json.loads(path.read_text())
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return {"version": CACHE_VERSION, "days": {}}
+        if not isinstance(data.get("days"), dict):
+            data["days"] = {}
+        return data
+    except (FileNotFoundError, ValueError):
+        return {"version": CACHE_VERSION, "days": {}}
+
+
+def save_calendar(path: Path, calendar: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(calendar, indent=2, sort_keys=True) + "\n")
+
+
+def is_day_final(day: date, entry: Dict[str, Any]) -> bool:
+    """Day is final iff it was fetched FINAL_AFTER (or more) after it ended."""
+    try:
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    day_end = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=KST)
+    return fetched_at >= day_end + FINAL_AFTER
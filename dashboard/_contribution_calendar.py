@@ -0,0 +1,93 @@
+"""Disk cache of the profile card's contribution heatmap (53 weeks x 7 days).
+
+Stored as one dense array of per-day contributionCount values starting at
+the grid's first Sunday, plus a checkpoint: the first day that was not
+final when last fetched. Everything before the checkpoint is final and is
+never asked for again, so a run only queries checkpoint..today — usually
+two days. As the grid rolls forward, rebase() drops the oldest week and
+pads the new one with zeros.
+
+A day is final once it was fetched at least FINAL_AFTER after it ended
+(KST), as in _commit_calendar.
+"""
+
+from __future__ import annotations
+import json
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from _commit_calendar import FINAL_AFTER, KST
+
+CALENDAR_VERSION = 1
+GRID_WEEKS = 53
+GRID_DAYS = GRID_WEEKS * 7
+
+
+def grid_start(today: date) -> date:
+    """First day (a Sunday) of the GRID_WEEKS-column grid ending this week."""
+    this_sunday = today - timedelta(days=(today.weekday() + 1) % 7)
+    return this_sunday - timedelta(weeks=GRID_WEEKS - 1)
+
+
+def first_open_day(now: datetime) -> date:
+    """Earliest day that is not final when fetched at `now`."""
+    return (now.astimezone(KST) - FINAL_AFTER).date()
+
+
+def empty_calendar(start: date) -> Dict[str, Any]:
+    return {"version": CALENDAR_VERSION, "start": start.isoformat(),
+            "checkpoint": start.isoformat(), "counts": [0] * GRID_DAYS}
+
+
+def load_calendar(path: Path, start: date) -> Dict[str, Any]:
+    """Cached calendar rebased onto the grid starting at `start`."""
+    try:
+        data = json.loads(path.read_text())
+        if (not isinstance(data, dict) or data.get("version") != CALENDAR_VERSION
+                or not isinstance(data.get("counts"), list)):
+            return empty_calendar(start)
+        return rebase(data, start)
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return empty_calendar(start)
+
+
+def save_calendar(path: Path, calendar: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(calendar, indent=1) + "\n")
+
+
+def rebase(calendar: Dict[str, Any], start: date) -> Dict[str, Any]:
+    """Shift the counts array so index 0 is `start`; unknown days are 0."""
+    old_start = date.fromisoformat(calendar["start"])
+    shift = (start - old_start).days
+    old = calendar["counts"]
+    counts = [int(old[i + shift]) if 0 <= i + shift < len(old) else 0
+              for i in range(GRID_DAYS)]
+    checkpoint = date.fromisoformat(calendar["checkpoint"])
+    if shift < 0:
+        checkpoint = start  # days prepended: nothing about them is known
+    return {"version": CALENDAR_VERSION, "start": start.isoformat(),
+            "checkpoint": max(checkpoint, start).isoformat(), "counts": counts}
+
+
+def apply_days(calendar: Dict[str, Any], days: Dict[str, int], fetched_through: date,
+               now: datetime) -> None:
+    """Store fetched {iso date: count} values and advance the checkpoint.
+
+    `fetched_through` is the last day the fetch covered; the checkpoint
+    never moves past it, so a partial fetch is resumed next run.
+    """
+    start = date.fromisoformat(calendar["start"])
+    counts = calendar["counts"]
+    for iso, count in days.items():
+        i = (date.fromisoformat(iso) - start).days
+        if 0 <= i < GRID_DAYS:
+            counts[i] = int(count)
+    checkpoint = min(first_open_day(now), fetched_through + timedelta(days=1))
+    calendar["checkpoint"] = max(checkpoint, start).isoformat()
+
+
+def day_count(calendar: Dict[str, Any], day: date) -> Optional[int]:
+    i = (day - date.fromisoformat(calendar["start"])).days
+    return calendar["counts"][i] if 0 <= i < GRID_DAYS else None
@@ -0,0 +1,192 @@
+"""Shared in-memory view of dashboard/data.json.
+
+Every script used to open, parse and rewrite data.json on its own, so one
+process (slack_update → generate_svg, or the progress chart which read it
+twice) parsed and wrote the same file several times. get_store() hands
+out one DataStore per path: the file is parsed once, scripts mutate the
+same dict, and save() writes only when the content actually changed.
+
+Inside `with store.deferred():` save() calls are coalesced into a single
+write when the block exits, so a multi-step run writes at most once.
+
+Writes are atomic (temp + fsync + rename, see _fileio) and taken under
+the data.json advisory lock. Read-modify-write updates belong in
+`with store.transaction() as data:` — it holds the lock, re-reads the file
+so edits apply on top of whatever another job just wrote, and writes
+before releasing it. Unsaved edits made outside a transaction can't be
+merged onto a newer file, so if data.json changed underneath them the
+transaction raises StaleStore instead of overwriting the other write.
+
+The default path is relative ('dashboard/data.json') and resolved against
+the cwd on first use — the workflows run from the repo root and tests
+chdir into a temp tree.
+"""
+
+from __future__ import annotations
+import contextlib
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TypedDict, Union
+
+from _fileio import LOCK_TIMEOUT_SECONDS, atomic_write_text, file_lock
+
+DEFAULT_PATH = Path('dashboard/data.json')
+
+
+class StaleStore(RuntimeError):
+    """Unsaved edits were made against a data.json another writer has since replaced."""
+
+
+class Metrics(TypedDict, total=False):
+    commits: int
+    socialContent: Dict[str, int]
+    userSessions: int
+    ctoMeetings: int
+    blogPosts: int
+    workouts: Dict[str, int]
+    tokens: Dict[str, Any]
+
+
+class Week(TypedDict, total=False):
+    week: str
+    startDate: str
+    endDate: str
+    metrics: Metrics
+
+
+class Goals(TypedDict, total=False):
+    weeklyCommits: int
+
+
+class DataStore:
+    """One parsed copy of data.json plus the text it was loaded from."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_PATH):
+        self.path = Path(path)
+        self._data: Optional[Dict[str, Any]] = None
+        self._saved: Optional[str] = None           # serialized form on disk
+        self._stat: Optional[Tuple[int, int, int]] = None  # (inode, mtime_ns, size) at load
+        self._defer_depth = 0
+        self._save_pending = False
+
+    def exists(self) -> bool:
+        return self._data is not None or self.path.exists()
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Parsed document. Raises FileNotFoundError / ValueError like json.load."""
+        if self._data is None or self._changed_on_disk():
+            self.reload()
+        return self._data
+
+    def reload(self) -> Dict[str, Any]:
+        text = self.path.read_text()
+        self._data = json.loads(text)
+        self._saved = self._serialize(self._data)
+        self._stat = self._disk_stat()
+        return self._data
+
+    def current_week(self) -> Week:
+        return self.data['currentWeek']
+
+    def current_metrics(self) -> Metrics:
+        return self.data['currentWeek']['metrics']
+
+    def weekly_history(self) -> List[Week]:
+        return self.data.setdefault('weeklyHistory', [])
+
+    def goals(self) -> Goals:
+        return self.data.get('goals', {})
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Deep copy for callers that need a before/after comparison."""
+        return copy.deepcopy(self.data)
+
+    def is_dirty(self) -> bool:
+        return self._data is not None and self._serialize(self._data) != self._saved
+
+    def save(self) -> bool:
+        """Write data.json if it changed since load/last save. True if written."""
+        if self._defer_depth:
+            self._save_pending = True
+            return False
+        return self._write()
+
+    @contextlib.contextmanager
+    def transaction(self, timeout: float = LOCK_TIMEOUT_SECONDS) -> Iterator[Dict[str, Any]]:
+        """Locked read-modify-write: re-read, yield the data, write on success.
+
+        Writes through even inside deferred() — releasing the lock before
+        the write would reopen the lost-update window. On an exception
+        nothing is written and the in-memory copy is re-read from disk.
+        Unsaved edits made before the transaction are kept and written only
+        if the file is unchanged since they were made; otherwise StaleStore.
+        """
+        with file_lock(self.path, timeout):
+            # Under the lock an unchanged stat means nobody wrote since we
+            # parsed — reuse the parse (pipeline stages share one).
+            if self._data is not None and self._disk_stat() != self._stat and self.is_dirty():
+                raise StaleStore(f"{self.path} changed on disk under unsaved edits; "
+                                 "make them inside the transaction")
+            if self._data is None or self._changed_on_disk():
+                self.reload()
+            try:
+                yield self._data
+            except BaseException:
+                if self.path.exists():
+                    self.reload()
+                raise
+            self._write()
+
+    def _write(self) -> bool:
+        if not self.is_dirty():
+            return False
+        text = self._serialize(self._data)
+        with file_lock(self.path):
+            atomic_write_text(self.path, text)
+        self._saved = text
+        self._stat = self._disk_stat()
+        return True
+
+    @contextlib.contextmanager
+    def deferred(self) -> Iterator['DataStore']:
+        """Hold every save() until the outermost block exits, then write once."""
+        self._defer_depth += 1
+        try:
+            yield self
+        finally:
+            self._defer_depth -= 1
+            if not self._defer_depth and self._save_pending:
+                self._save_pending = False
+                self.save()
+
+    @staticmethod
+    def _serialize(data: Dict[str, Any]) -> str:
+        return json.dumps(data, indent=2)
+
+    def _disk_stat(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        # Atomic writes replace the inode, so this also catches a rewrite
+        # landing within the same mtime tick.
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _changed_on_disk(self) -> bool:
+        # Another process (or a shell step between scripts) rewrote the
+        # file. Pick that up unless we hold unsaved edits of our own.
+        return self._disk_stat() != self._stat and not self.is_dirty()
+
+
+_stores: Dict[Path, DataStore] = {}
+
+
+def get_store(path: Union[str, Path] = DEFAULT_PATH) -> DataStore:
+    """Process-wide DataStore for `path` (resolved against the current cwd)."""
+    key = Path(path).resolve()
+    store = _stores.get(key)
+    if store is None:
+        store = _stores[key] = DataStore(key)
+    return store
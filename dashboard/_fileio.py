@@ -0,0 +1,114 @@
+"""Crash-safe writes and advisory locking for files several jobs rewrite.
+
+atomic_write_text(): write a sibling temp file, fsync it, os.replace() it
+over the target, then fsync the directory. A reader (or a crash) sees the
+old file or the new one — never a truncated half-write.
+
+file_lock(): fcntl.flock on '<file>.lock' with a timeout. The Slack
+workflow, the cron dashboard job and the local launchd token wrapper all
+read-modify-write data.json; holding the lock across the re-read and the
+write serializes them so no increment is lost. The lock is advisory —
+only writers that take it are serialized.
+"""
+
+from __future__ import annotations
+import contextlib
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover — non-POSIX; the jobs run on Linux/macOS
+    fcntl = None
+
+LOCK_TIMEOUT_SECONDS = 30.0
+_POLL_SECONDS = 0.05
+
+# flock is per open file, so a nested file_lock() on the same path from
+# the same thread would wait on itself. Track depth per (lock, thread) and
+# only lock once; other threads still open their own handle and wait.
+_held: Dict[Tuple[Path, int], int] = {}
+_held_lock = threading.Lock()
+
+
+class LockTimeout(TimeoutError):
+    """Another writer held the lock for longer than the timeout."""
+
+
+def atomic_write_text(path: Union[str, Path], text: str) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o777)
+        else:
+            os.chmod(tmp, 0o644)  # mkstemp's 0600 would hide the file from other users
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    _fsync_dir(path.parent)
+
+
+def _fsync_dir(directory: Path) -> None:
+    # Makes the rename itself durable. Not every platform/filesystem
+    # allows opening a directory — the data is already safe without it.
+    with contextlib.suppress(OSError):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def lock_path_for(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + '.lock')
+
+
+@contextlib.contextmanager
+def file_lock(path: Union[str, Path], timeout: float = LOCK_TIMEOUT_SECONDS) -> Iterator[None]:
+    """Exclusive advisory lock guarding `path`; raises LockTimeout after `timeout`s."""
+    lock_path = lock_path_for(Path(path).resolve())
+    key = (lock_path, threading.get_ident())
+    with _held_lock:
+        nested = _held.get(key, 0) > 0
+        if nested:
+            _held[key] += 1
+    if nested or fcntl is None:
+        try:
+            yield
+        finally:
+            if nested:
+                with _held_lock:
+                    _held[key] -= 1
+        return
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as handle:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise LockTimeout(f"{path}: lock held > {timeout:.0f}s") from None
+                time.sleep(_POLL_SECONDS)
+        with _held_lock:
+            _held[key] = 1
+        try:
+            yield
+        finally:
+            with _held_lock:
+                _held.pop(key, None)
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
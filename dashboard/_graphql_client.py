@@ -1,16 +1,56 @@
 """Shared GraphQL client. Single rule: never lie about what happened.
 
-Returns (data, None) on success or (None, ErrorKind) on any failure.
-Callers MUST check err and decide what to do — never silently treat None
-as zero.
+Returns (data, None) on success or (None, ErrorKind) on any failure. The
+one exception is ErrorKind.PARTIAL: GraphQL reported errors but other
+aliases resolved, so the payload comes back as (data, PARTIAL) with the
+failing fields null. Callers MUST check err and decide what to do — never
+silently treat None as zero.
+
+All calls in one process share a pooled keep-alive requests.Session, so
+only the first call pays for the TCP+TLS handshake to api.github.com;
+later calls (generate_svg → check_weekly_reset → backfill weeks) reuse the
+open connection. connection_stats() reports new vs reused connections.
+
+post_graphql_async / post_graphql_many are the asyncio counterparts with
+the same (data, ErrorKind) contract: many queries in flight at once under
+a concurrency limit, backing off with asyncio.sleep instead of blocking.
+
+Every response also feeds a shared rate-limit budget (x-ratelimit-* headers
+plus the GraphQL rateLimit { cost remaining resetAt } block when a query
+asks for it), persisted to dashboard/.graphql_budget.json so the next
+script in the same job knows what's left. CI checkouts start without that
+file, so seed_budget() asks for the rateLimit block alone (a point at
+most) whenever nothing current is known; remaining_budget() /
+has_budget() then let callers check before a large backfill and defer
+low-priority work such as the profile card.
+
+Calls that pass ttl=<seconds> go through an on-disk response cache
+(dashboard/.graphql_cache.json) keyed by a hash of the url, normalized
+query, variables and token. A repeat inside the TTL is served locally and
+costs no quota; only successful responses are stored, the file is bounded
+to _CACHE_MAX_ENTRIES (least recently used evicted first) and
+cache_stats() reports hits/misses. Hits only touch the in-memory LRU order;
+the file is written on put and once more at exit if hits moved it. The
+file is gitignored, so it is shared by the scripts of one job, not
+across jobs or runs.
 """
 
 from __future__ import annotations
+import asyncio
+import atexit
+import contextlib
+import hashlib
+import json
+import os
+import threading
 import time
+from datetime import datetime, timezone
 from enum import Enum
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
 
 class ErrorKind(str, Enum):
@@ -18,38 +58,437 @@ class ErrorKind(str, Enum):
     AUTH       = "auth"         # 401/403 / bad credentials / missing token
     NETWORK    = "network"      # connection error / timeout / 5xx
     UNKNOWN    = "unknown"      # GraphQL errors we didn't classify
+    PARTIAL    = "partial"      # errors alongside usable data (some fields null)
 
 
 _TIMEOUT_SECONDS = 15
 _MAX_ATTEMPTS = 3
 _BACKOFF_BASE = 0.5  # 0.5s, 1.0s, 2.0s
+# Keep-alive connections kept open per host (GRAPHQL_POOL_SIZE).
+# gather_graphql grows the pool to match its concurrency limit.
+_DEFAULT_POOL_SIZE = 4
+_DEFAULT_CONCURRENCY = 4
+
+_session: Optional[requests.Session] = None
+_pool_size = 0
+_session_lock = threading.Lock()
+
+_DEFAULT_BUDGET_PATH = Path(__file__).resolve().parent / ".graphql_budget.json"
+_budget: Optional[Dict] = None
+_budget_lock = threading.Lock()
+
+_DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / ".graphql_cache.json"
+_CACHE_VERSION = 1
+_CACHE_MAX_ENTRIES = 256
+_cache: Optional[Dict] = None
+_cache_loaded_from: Optional[Path] = None
+_cache_dirty = False  # LRU order changed by hits since the last write
+_cache_hits = 0
+_cache_misses = 0
+_cache_lock = threading.Lock()
+
+
+def _env_pool_size() -> int:
+    """GRAPHQL_POOL_SIZE, or the default when unset or not a positive int."""
+    try:
+        size = int(os.getenv("GRAPHQL_POOL_SIZE", ""))
+    except ValueError:
+        return _DEFAULT_POOL_SIZE
+    return size if size > 0 else _DEFAULT_POOL_SIZE
+
+
+def configure_session(pool_size: Optional[int] = None) -> requests.Session:
+    """(Re)build the shared session with `pool_size` keep-alive connections.
+
+    pool_size defaults to GRAPHQL_POOL_SIZE (read here, not at import, so a
+    bad value falls back to the default instead of breaking every script).
+    Retries stay in post_graphql (max_retries=0 on the adapter) so the
+    NETWORK-only retry rule isn't doubled up by urllib3.
+    """
+    global _session, _pool_size
+    if pool_size is None:
+        pool_size = _env_pool_size()
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size,
+                              max_retries=0)
+        s.mount("https://", adapter)
+        s.mount("http://", adapter)
+        _session = s
+        _pool_size = pool_size
+        return s
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    if _session is None:
+        return configure_session()
+    return _session
+
+
+def connection_stats() -> Dict[str, int]:
+    """Connection reuse counters for the shared session.
+
+    requests = HTTP requests sent, new = TCP/TLS connections opened,
+    reused = requests served over an already-open connection.
+    """
+    requests_sent = opened = 0
+    if _session is not None:
+        # Both schemes are mounted on the same adapter — count it once.
+        for adapter in {id(a): a for a in _session.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_sent += pool.num_requests
+                opened += pool.num_connections
+    return {"requests": requests_sent, "new": opened,
+            "reused": max(requests_sent - opened, 0)}
 
 
 def post_graphql(
     url: str,
     headers: dict,
     body: dict,
+    *,
+    ttl: Optional[float] = None,
 ) -> Tuple[Optional[dict], Optional[ErrorKind]]:
-    """Retries on NETWORK errors only. RATE_LIMIT/AUTH/UNKNOWN return immediately."""
+    """Retries on NETWORK errors only. RATE_LIMIT/AUTH/UNKNOWN return immediately.
+
+    With `ttl`, a cached response younger than ttl seconds is returned
+    without touching the network, and a fresh success is cached.
+    """
+    key = _cache_key(url, headers, body) if ttl else None
+    if key is not None:
+        cached = _cache_get(key, ttl)
+        if cached is not None:
+            return cached, None
     last_err: Optional[ErrorKind] = None
     for attempt in range(_MAX_ATTEMPTS):
         data, err = _post_once(url, headers, body)
         if err is None:
+            if key is not None:
+                _cache_put(key, data)
             return data, None
         last_err = err
         if err is not ErrorKind.NETWORK:
-            return None, err  # rate-limit / auth / unknown — don't retry
+            # rate-limit / auth / unknown / partial — don't retry. PARTIAL
+            # keeps its data so callers can use the fields that resolved.
+            return data, err
         if attempt < _MAX_ATTEMPTS - 1:
             time.sleep(_BACKOFF_BASE * (2 ** attempt))
     return None, last_err
 
 
+def _budget_path() -> Optional[Path]:
+    """GRAPHQL_BUDGET_PATH overrides the file; set it empty to keep the budget in memory only."""
+    raw = os.getenv("GRAPHQL_BUDGET_PATH")
+    if raw is None:
+        return _DEFAULT_BUDGET_PATH
+    return Path(raw) if raw else None
+
+
+def _load_budget() -> Dict:
+    global _budget
+    if _budget is None:
+        _budget = {}
+        path = _budget_path()
+        if path is not None:
+            try:
+                raw = json.loads(path.read_text())
+                if isinstance(raw, dict):
+                    _budget = raw
+            except (FileNotFoundError, ValueError):
+                pass
+    return _budget
+
+
+def _as_int(v) -> Optional[int]:
+    if isinstance(v, bool) or not isinstance(v, (int, str)):
+        return None
+    try:
+        return int(v)
+    except ValueError:
+        return None
+
+
+def _record_budget(r, data) -> None:
+    """Fold one response's rate-limit info into the shared, persisted budget."""
+    headers = getattr(r, "headers", None) or {}
+    update = {}
+    remaining = _as_int(headers.get("x-ratelimit-remaining"))
+    if remaining is not None:
+        update["remaining"] = remaining
+    limit = _as_int(headers.get("x-ratelimit-limit"))
+    if limit is not None:
+        update["limit"] = limit
+    reset = _as_int(headers.get("x-ratelimit-reset"))
+    if reset is not None:
+        try:
+            update["reset_at"] = datetime.fromtimestamp(reset, timezone.utc).isoformat()
+        except (OverflowError, OSError, ValueError):
+            pass
+
+    rl = ((data or {}).get("data") or {}).get("rateLimit") if isinstance(data, dict) else None
+    if isinstance(rl, dict):
+        if _as_int(rl.get("remaining")) is not None:
+            update["remaining"] = _as_int(rl["remaining"])
+        if _as_int(rl.get("cost")) is not None:
+            update["last_cost"] = _as_int(rl["cost"])
+        if isinstance(rl.get("resetAt"), str):
+            update["reset_at"] = rl["resetAt"].replace("Z", "+00:00")
+
+    if not update:
+        return
+    update["observed_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    with _budget_lock:
+        budget = _load_budget()
+        budget.update(update)
+        path = _budget_path()
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(budget, indent=2, sort_keys=True) + "\n")
+            except OSError:
+                pass  # budget is advisory — never fail a query over it
+
+
+def budget_snapshot() -> Dict:
+    """Copy of the last observed budget: remaining, limit, reset_at, last_cost, observed_at."""
+    with _budget_lock:
+        return dict(_load_budget())
+
+
+def remaining_budget(now: Optional[datetime] = None) -> Optional[int]:
+    """Points left in the current window, or None if unknown / the window has reset."""
+    budget = budget_snapshot()
+    remaining = _as_int(budget.get("remaining"))
+    if remaining is None:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(budget["reset_at"])
+    except (KeyError, TypeError, ValueError):
+        return remaining
+    if (now or datetime.now(timezone.utc)) >= reset_at:
+        return None  # quota refilled since we last looked
+    return remaining
+
+
+_RATE_LIMIT_QUERY = "query { rateLimit { cost remaining resetAt limit } }"
+
+
+def seed_budget(url: str, headers: dict, now: Optional[datetime] = None) -> Optional[int]:
+    """Remaining points, asking the API when no current budget is known.
+
+    Gates run before a script's first real query, usually in a fresh
+    checkout with no budget file, where has_budget() would always pass.
+    One rateLimit-only query fills the budget in; its failure leaves the
+    budget unknown rather than blocking the caller.
+    """
+    remaining = remaining_budget(now)
+    if remaining is None and headers.get("Authorization"):
+        _post_once(url, headers, {"query": _RATE_LIMIT_QUERY})
+        remaining = remaining_budget(now)
+    return remaining
+
+
+def has_budget(min_remaining: int, now: Optional[datetime] = None) -> bool:
+    """False only when we KNOW fewer than min_remaining points are left."""
+    remaining = remaining_budget(now)
+    return remaining is None or remaining >= min_remaining
+
+
+def _cache_path() -> Optional[Path]:
+    """GRAPHQL_CACHE_PATH overrides the file; set it empty to disable the cache."""
+    raw = os.getenv("GRAPHQL_CACHE_PATH")
+    if raw is None:
+        return _DEFAULT_CACHE_PATH
+    return Path(raw) if raw else None
+
+
+def _cache_key(url: str, headers: dict, body: dict) -> Optional[str]:
+    """sha256 over url, whitespace-normalized query, sorted variables and token.
+
+    The token is part of the key so two identities never share answers.
+    """
+    if _cache_path() is None:
+        return None
+    query = " ".join(str(body.get("query", "")).split())
+    try:
+        variables = json.dumps(body.get("variables") or {}, sort_keys=True,
+                               separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None  # not JSON-serializable — don't guess a key
+    auth = str((headers or {}).get("Authorization", ""))
+    h = hashlib.sha256()
+    for part in (url, query, variables, auth):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _load_cache(path: Path) -> Dict:
+    global _cache, _cache_loaded_from
+    if _cache is None or _cache_loaded_from != path:
+        _flush_cache()
+        _cache = {"version": _CACHE_VERSION, "entries": {}}
+        _cache_loaded_from = path
+        try:
+            raw = json.loads(path.read_text())
+            if (isinstance(raw, dict) and raw.get("version") == _CACHE_VERSION
+                    and isinstance(raw.get("entries"), dict)):
+                _cache = raw
+        except (FileNotFoundError, ValueError):
+            pass
+    return _cache
+
+
+def _save_cache(path: Path, cache: Dict) -> None:
+    global _cache_dirty
+    _cache_dirty = False
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(cache, sort_keys=True) + "\n")
+    except OSError:
+        pass  # the cache is an optimization — never fail a query over it
+
+
+def _cache_get(key: str, ttl: float) -> Optional[dict]:
+    global _cache_hits, _cache_misses, _cache_dirty
+    path = _cache_path()
+    if path is None:
+        return None
+    now = time.time()
+    with _cache_lock:
+        cache = _load_cache(path)
+        entry = cache["entries"].get(key)
+        stored_at = entry.get("stored_at") if isinstance(entry, dict) else None
+        if not isinstance(stored_at, (int, float)) or now - stored_at > ttl:
+            _cache_misses += 1
+            return None
+        _cache_hits += 1
+        entry["used_at"] = now  # LRU order lives in memory until the next write
+        _cache_dirty = True
+        return entry.get("data")
+
+
+def _flush_cache() -> None:
+    """Write LRU order that only hits changed; a no-op after a put."""
+    if _cache_dirty and _cache is not None and _cache_loaded_from is not None:
+        _save_cache(_cache_loaded_from, _cache)
+
+
+atexit.register(_flush_cache)
+
+
+def _cache_put(key: str, data: dict) -> None:
+    path = _cache_path()
+    if path is None:
+        return
+    now = time.time()
+    with _cache_lock:
+        cache = _load_cache(path)
+        entries = cache["entries"]
+        entries[key] = {"stored_at": now, "used_at": now, "data": data}
+        if len(entries) > _CACHE_MAX_ENTRIES:
+            by_use = sorted(entries, key=lambda k: entries[k].get("used_at") or 0)
+            for old in by_use[:len(entries) - _CACHE_MAX_ENTRIES]:
+                del entries[old]
+        _save_cache(path, cache)
+
+
+def cache_stats() -> Dict[str, int]:
+    """Response-cache counters for this process: hits, misses, entries on disk."""
+    path = _cache_path()
+    with _cache_lock:
+        entries = len(_load_cache(path)["entries"]) if path is not None else 0
+        return {"hits": _cache_hits, "misses": _cache_misses, "entries": entries}
+
+
+async def post_graphql_async(
+    url: str,
+    headers: dict,
+    body: dict,
+    *,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    ttl: Optional[float] = None,
+) -> Tuple[Optional[dict], Optional[ErrorKind]]:
+    """Async post_graphql: same retry rule and ttl cache, asyncio.sleep backoff.
+
+    The blocking send runs in a worker thread over the shared pooled
+    session. `semaphore` is held only while a request is in flight, so a
+    query sleeping in backoff doesn't block the others.
+    """
+    key = _cache_key(url, headers, body) if ttl else None
+    if key is not None:
+        cached = _cache_get(key, ttl)
+        if cached is not None:
+            return cached, None
+    last_err: Optional[ErrorKind] = None
+    for attempt in range(_MAX_ATTEMPTS):
+        async with (semaphore or contextlib.nullcontext()):
+            data, err = await asyncio.to_thread(_post_once, url, headers, body)
+        if err is None:
+            if key is not None:
+                _cache_put(key, data)
+            return data, None
+        last_err = err
+        if err is not ErrorKind.NETWORK:
+            return data, err
+        if attempt < _MAX_ATTEMPTS - 1:
+            await asyncio.sleep(_BACKOFF_BASE * (2 ** attempt))
+    return None, last_err
+
+
+async def gather_graphql(
+    url: str,
+    headers: dict,
+    bodies: Sequence[dict],
+    *,
+    concurrency: int = _DEFAULT_CONCURRENCY,
+    ttl: Optional[float] = None,
+) -> List[Tuple[Optional[dict], Optional[ErrorKind]]]:
+    """Send every body concurrently (at most `concurrency` in flight).
+
+    Results are in input order; each one is judged on its own, so one
+    rate-limited query doesn't discard the others' data.
+    """
+    if _pool_size < concurrency:
+        # Otherwise urllib3 opens throwaway connections past the pool size.
+        configure_session(pool_size=concurrency)
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    return list(await asyncio.gather(*(
+        post_graphql_async(url, headers, body, semaphore=semaphore, ttl=ttl)
+        for body in bodies
+    )))
+
+
+def post_graphql_many(
+    url: str,
+    headers: dict,
+    bodies: Sequence[dict],
+    *,
+    concurrency: int = _DEFAULT_CONCURRENCY,
+    ttl: Optional[float] = None,
+) -> List[Tuple[Optional[dict], Optional[ErrorKind]]]:
+    """Blocking entry point for scripts: runs gather_graphql in a fresh loop."""
+    if not bodies:
+        return []
+    return asyncio.run(gather_graphql(url, headers, bodies,
+                                      concurrency=concurrency, ttl=ttl))
+
+
 def _post_once(url, headers, body):
     try:
-        r = requests.post(url, headers=headers, json=body, timeout=_TIMEOUT_SECONDS)
+        r = get_session().post(url, headers=headers, json=body, timeout=_TIMEOUT_SECONDS)
     except requests.RequestException:
         return None, ErrorKind.NETWORK
 
+    if r.status_code != 200:
+        _record_budget(r, None)
     if r.status_code == 429:
         return None, ErrorKind.RATE_LIMIT
     if r.status_code == 403 and r.headers.get("x-ratelimit-remaining") == "0":
@@ -67,7 +506,9 @@ def _post_once(url, headers, body):
     try:
         data = r.json()
     except ValueError:
+        _record_budget(r, None)
         return None, ErrorKind.UNKNOWN
+    _record_budget(r, data)
 
     errs = data.get("errors") if isinstance(data, dict) else None
     if errs:
@@ -75,6 +516,10 @@ def _post_once(url, headers, body):
             t = (e.get("type") or "").upper()
             if t == "RATE_LIMIT":
                 return None, ErrorKind.RATE_LIMIT
+        # A failing alias nulls only its own field; the rest of the payload
+        # is still good, so hand it back for per-field handling.
+        if any(v is not None for v in ((data.get("data") or {}).get("user") or {}).values()):
+            return data, ErrorKind.PARTIAL
         return None, ErrorKind.UNKNOWN
 
     return data, None
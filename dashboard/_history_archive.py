@@ -0,0 +1,185 @@
+"""Unbounded weekly history: a JSONL archive with a week-id index.
+
+data.json keeps only the hot window (HOT_WEEKS entries of weeklyHistory)
+so every load stays small. Every week that ever passed through it is kept
+in dashboard/history/archive.jsonl, one compact JSON line per version of a
+week entry, appended — a week re-archived after a backfill simply gets a
+newer line.
+
+dashboard/history/archive.index.json maps week id → [offset, length] of
+its latest line, so get() is one seek + one json.loads instead of a scan.
+The index records the archive size it describes; if the archive was
+changed behind its back (hand edit, merge) it is rebuilt by one scan.
+Superseded lines are dropped by compact(), which runs on its own once they
+outnumber the live ones.
+
+Both files live in dashboard/history/, which the workflows already commit.
+"""
+
+from __future__ import annotations
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from _fileio import atomic_write_text, file_lock
+
+HOT_WEEKS = 12
+ARCHIVE_PATH = Path('dashboard/history/archive.jsonl')
+INDEX_VERSION = 1
+
+
+def _line(entry: Dict[str, Any]) -> bytes:
+    return (json.dumps(entry, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+
+
+class HistoryArchive:
+    def __init__(self, path: Union[str, Path] = ARCHIVE_PATH):
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.stem + '.index.json')
+        self._index: Optional[Dict[str, List[int]]] = None
+        self._indexed_size = -1
+        self._lines = 0  # lines in the file, live + superseded
+
+    # ── index ────────────────────────────────────────────────────────────
+    def _size(self) -> int:
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _load_index(self) -> Dict[str, List[int]]:
+        size = self._size()
+        if self._index is not None and self._indexed_size == size:
+            return self._index
+        try:
+            raw = json.loads(self.index_path.read_text())
+            if (isinstance(raw, dict) and raw.get('version') == INDEX_VERSION
+                    and raw.get('size') == size and isinstance(raw.get('weeks'), dict)):
+                self._index, self._lines, self._indexed_size = raw['weeks'], raw.get('lines', 0), size
+                return self._index
+        except (FileNotFoundError, ValueError):
+            pass
+        return self._rebuild()
+
+    def _rebuild(self) -> Dict[str, List[int]]:
+        index: Dict[str, List[int]] = {}
+        lines = 0
+        offset = 0
+        if self.path.exists():
+            with open(self.path, 'rb') as f:
+                for raw in f:
+                    if raw.endswith(b'\n'):
+                        try:
+                            week = json.loads(raw).get('week')
+                        except (ValueError, AttributeError):
+                            week = None
+                        if isinstance(week, str):
+                            index[week] = [offset, len(raw)]
+                        lines += 1
+                    offset += len(raw)
+        self._index, self._lines, self._indexed_size = index, lines, self._size()
+        if self.path.exists():
+            self._save_index()
+        return index
+
+    def _save_index(self) -> None:
+        doc = {'version': INDEX_VERSION, 'size': self._indexed_size,
+               'lines': self._lines, 'weeks': self._index}
+        atomic_write_text(self.index_path, json.dumps(doc, sort_keys=True) + '\n')
+
+    # ── reads ────────────────────────────────────────────────────────────
+    def weeks(self) -> List[str]:
+        """Archived week ids, newest first."""
+        return sorted(self._load_index(), reverse=True)
+
+    def __contains__(self, week: str) -> bool:
+        return week in self._load_index()
+
+    def get(self, week: str) -> Optional[Dict[str, Any]]:
+        span = self._load_index().get(week)
+        if span is None:
+            return None
+        with open(self.path, 'rb') as f:
+            f.seek(span[0])
+            return json.loads(f.read(span[1]))
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        """Latest version of every archived week, newest first."""
+        index = self._load_index()
+        if not index:
+            return
+        with open(self.path, 'rb') as f:
+            for week in sorted(index, reverse=True):
+                offset, length = index[week]
+                f.seek(offset)
+                yield json.loads(f.read(length))
+
+    # ── writes ───────────────────────────────────────────────────────────
+    def put_many(self, entries: List[Dict[str, Any]]) -> int:
+        """Archive entries whose content changed. Returns the number appended."""
+        with file_lock(self.path):
+            index = self._load_index()
+            pending: List[Tuple[str, bytes]] = []
+            for entry in entries:
+                week = entry.get('week')
+                if not isinstance(week, str):
+                    continue
+                line = _line(entry)
+                if week in index and self.get(week) == json.loads(line):
+                    continue
+                pending.append((week, line))
+            if not pending:
+                return 0
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                offset = f.seek(0, os.SEEK_END)
+                for week, line in pending:
+                    f.write(line)
+                    index[week] = [offset, len(line)]
+                    offset += len(line)
+                    self._lines += 1
+                f.flush()
+                os.fsync(f.fileno())
+            self._indexed_size = self._size()
+            self._save_index()
+            if self._lines > 2 * len(index):
+                self.compact()
+            return len(pending)
+
+    def put(self, entry: Dict[str, Any]) -> bool:
+        return self.put_many([entry]) == 1
+
+    def compact(self) -> None:
+        """Rewrite the archive with only the latest line per week (oldest first)."""
+        with file_lock(self.path):
+            entries = list(self.entries())[::-1]
+            blob = b''.join(_line(e) for e in entries)
+            atomic_write_text(self.path, blob.decode('utf-8'))
+            self._rebuild()
+
+
+def archive_and_trim(data: Dict[str, Any], archive: Optional[HistoryArchive] = None,
+                     keep: int = HOT_WEEKS) -> int:
+    """Archive every weeklyHistory entry, then keep only the newest `keep` in data.
+
+    Entries are archived before they leave the hot window, so nothing is
+    ever dropped. Returns the number of archive lines written.
+    """
+    archive = archive or HistoryArchive()
+    history = data.get('weeklyHistory') or []
+    written = archive.put_many(history)
+    data['weeklyHistory'] = history[:keep]
+    return written
+
+
+def full_history(data: Dict[str, Any], archive: Optional[HistoryArchive] = None) -> List[Dict[str, Any]]:
+    """Hot weeklyHistory plus every older archived week, newest first.
+
+    The hot copy wins for weeks present in both (backfills edit data.json).
+    """
+    archive = archive or HistoryArchive()
+    hot = list(data.get('weeklyHistory') or [])
+    hot_weeks = {e.get('week') for e in hot}
+    cold = [e for e in archive.entries() if e.get('week') not in hot_weeks]
+    return sorted(hot + cold, key=lambda e: str(e.get('week') or ''), reverse=True)
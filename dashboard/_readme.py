@@ -0,0 +1,329 @@
+"""README.md as a list of marker-delimited sections, patched in memory.
+
+Four stages (profile card, dashboard, charts, weekly history) each used to
+read README.md, locate their block with whole-file DOTALL regexes and write
+it back. Here the file is split once, line by line, into plain text and
+generated sections fenced by HTML comments (invisible on GitHub):
+
+    <!-- readme:charts -->
+    # Consistent enough?
+    ...
+    <!-- /readme:charts -->
+
+A stage replaces its section's body with set_section() and calls save();
+the file is written only if its bytes changed. get_readme() hands out one
+Readme per path, and inside `with readme.deferred():` saves are coalesced
+into a single write when the block exits — the pipeline wraps its stages
+in one, so a run writes README.md at most once.
+
+A README without markers is migrated on load: each section is found with
+the regex its stage used before and fenced in place; sections that can't
+be found are inserted where the old code put them. The legacy regexes
+only run while some section is still unfenced.
+"""
+
+from __future__ import annotations
+import contextlib
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from _fileio import atomic_write_text
+
+DEFAULT_PATH = Path('README.md')
+# Stages fold this into their manifest digests, so a layout change
+# re-renders every section once.
+LAYOUT_VERSION = 1
+
+_START = '<!-- readme:{} -->\n'
+_END = '<!-- /readme:{} -->\n'
+_UPDATED = r'<div align="right"><sub>updated at \d{2}/\d{2}/\d{2}</sub></div>'
+
+
+class SectionSpec(NamedTuple):
+    name: str
+    # Pre-marker forms of the section; the first that matches is fenced.
+    legacy: Sequence[str]
+    # Where a missing section goes: ('before'|'after', section name or
+    # '# Heading'), first match wins. Empty: never inserted.
+    placement: Sequence[Tuple[str, str]] = ()
+
+
+SECTIONS = (
+    SectionSpec('profile-card', [
+        r'<p align="center">\n  <img src="[^"]+0-profile-details\.svg" alt="Profile Details">\n</p>\n*'
+        r'(?:' + _UPDATED + r'\n*)?',
+    ]),
+    SectionSpec('dashboard', [
+        r'# Grinding enough\?\n\n<p align="center">\n  <img src="[^"]+" alt="Weekly Dashboard">\n</p>\n*'
+        r'(?:' + _UPDATED + r'\n*)?',
+    ]),
+    SectionSpec('charts', [
+        r'(?s)# Consistent enough\?\n\n.*?</details>\n\n' + _UPDATED + r'\n*',
+    ], [('before', 'tokens'), ('before', 'weekly-history'), ('before', '# Token Usage'),
+        ('before', '# Weekly History'), ('before', '# Tech Stack')]),
+    SectionSpec('tokens', [
+        r'(?s)# Token Usage\n\n.*?</p>\n\n' + _UPDATED + r'\n*',
+        r'(?s)# AI Tokens\n\n.*?</p>\n\n' + _UPDATED + r'\n*',
+    ], [('before', 'weekly-history'), ('before', '# Weekly History'), ('before', '# Tech Stack')]),
+    SectionSpec('weekly-history', [
+        r'# Weekly History\n\n\|.*?\n\|.*?\n(?:\|.*?\n)*\n(?:' + _UPDATED + r'\n)?\n*',
+    ], [('after', 'tokens'), ('after', 'charts'), ('before', '# Tech Stack')]),
+)
+SPECS: Dict[str, SectionSpec] = {spec.name: spec for spec in SECTIONS}
+
+# Retired sections, dropped when an unmigrated README is first loaded.
+LEGACY_REMOVALS = (
+    r'(?s)# Cumulative Progress\n\n.*?(?=\n# Tech Stack)',
+    r'(?s)## Individual Metrics\n\n.*?(?=\n# Tech Stack)',
+)
+
+
+class _Section:
+    __slots__ = ('name', 'body')
+
+    def __init__(self, name: str, body: str):
+        self.name = name
+        self.body = body
+
+    def render(self) -> str:
+        return _START.format(self.name) + self.body + _END.format(self.name)
+
+
+Chunk = Union[str, _Section]
+
+
+def _normalize(body: str) -> str:
+    body = body.strip('\n')
+    return body + '\n' if body else ''
+
+
+def parse(text: str) -> List[Chunk]:
+    """Split README text into plain-text chunks and fenced sections."""
+    chunks: List[Chunk] = []
+    plain: List[str] = []
+    lines = text.splitlines(keepends=True)
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        name = _marker_name(line, '<!-- readme:')
+        end = _END.format(name) if name else None
+        if end is not None:
+            for j in range(i + 1, len(lines)):
+                if lines[j].rstrip('\n') + '\n' == end:
+                    if plain:
+                        chunks.append(''.join(plain))
+                        plain = []
+                    chunks.append(_Section(name, ''.join(lines[i + 1:j])))
+                    i = j + 1
+                    break
+            else:
+                end = None  # unterminated: keep the line as plain text
+        if end is None:
+            plain.append(line)
+            i += 1
+    if plain:
+        chunks.append(''.join(plain))
+    return chunks
+
+
+def _marker_name(line: str, prefix: str) -> Optional[str]:
+    line = line.rstrip('\n')
+    if line.startswith(prefix) and line.endswith(' -->'):
+        name = line[len(prefix):-4]
+        if name in SPECS:
+            return name
+    return None
+
+
+class Readme:
+    def __init__(self, path: Union[str, Path] = DEFAULT_PATH):
+        self.path = Path(path)
+        self._chunks: Optional[List[Chunk]] = None
+        self._saved: Optional[str] = None
+        self._stat: Optional[Tuple[int, int]] = None
+        self._defer_depth = 0
+        self._pending: List[Tuple[object, str, str, Tuple[str, ...]]] = []
+        self._save_pending = False
+
+    # ── load ─────────────────────────────────────────────────────────────
+    def exists(self) -> bool:
+        return self._chunks is not None or self.path.exists()
+
+    def _disk_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _load(self) -> List[Chunk]:
+        # Re-read if another writer replaced the file and nothing is pending here.
+        if self._chunks is not None and self._disk_stat() != self._stat and not self.is_dirty():
+            self._chunks = None
+        if self._chunks is None:
+            self._saved = self.path.read_text()
+            self._stat = self._disk_stat()
+            self._chunks = parse(self._saved)
+            self._migrate()
+        return self._chunks
+
+    def _migrate(self) -> None:
+        missing = [spec for spec in SECTIONS if self._index(spec.name) is None]
+        if not missing:
+            return
+        for pattern in LEGACY_REMOVALS:
+            self._sub_plain(pattern, lambda m: '')
+        for spec in missing:
+            for pattern in spec.legacy:
+                if self._sub_plain(pattern, lambda m, name=spec.name: _Section(
+                        name, _normalize(m.group(0)))):
+                    break
+
+    def _sub_plain(self, pattern: str, make) -> bool:
+        """Replace the first match of `pattern` in a plain chunk. True if matched."""
+        regex = re.compile(pattern)
+        for i, chunk in enumerate(self._chunks):
+            if isinstance(chunk, _Section):
+                continue
+            m = regex.search(chunk)
+            if m is None:
+                continue
+            made = make(m)
+            if isinstance(made, _Section):
+                # The legacy match ate the blank line(s) after the section.
+                pieces: List[Chunk] = [chunk[:m.start()], made, '\n' + chunk[m.end():]]
+            else:
+                pieces = [chunk[:m.start()] + made + chunk[m.end():]]
+            self._chunks[i:i + 1] = [p for p in pieces if p != '']
+            return True
+        return False
+
+    def _index(self, name: str) -> Optional[int]:
+        for i, chunk in enumerate(self._chunks or []):
+            if isinstance(chunk, _Section) and chunk.name == name:
+                return i
+        return None
+
+    # ── read / edit ──────────────────────────────────────────────────────
+    def section(self, name: str) -> Optional[str]:
+        """Body of section `name`, or None if the README has no such section."""
+        self._load()
+        i = self._index(name)
+        return None if i is None else self._chunks[i].body
+
+    def part(self, *names: str) -> str:
+        """Rendered sections `names`, markers included: what a manifest
+        entry for them hashes (an absent section contributes nothing)."""
+        self._load()
+        return ''.join(self._chunks[i].render() for i in map(self._index, names) if i is not None)
+
+    def text(self) -> str:
+        return ''.join(c.render() if isinstance(c, _Section) else c for c in self._load())
+
+    def set_section(self, name: str, body: str) -> bool:
+        """Replace (or insert, per SECTIONS placement) a section's body.
+
+        An empty body keeps the markers so the section's place is
+        remembered. Returns True if the body changed.
+        """
+        self._load()
+        body = _normalize(body)
+        i = self._index(name)
+        if i is None:
+            if not body or not self._insert(_Section(name, body)):
+                return False
+            return True
+        if self._chunks[i].body == body:
+            return False
+        self._chunks[i].body = body
+        return True
+
+    def _insert(self, section: _Section) -> bool:
+        placement = SPECS[section.name].placement
+        if not placement:
+            return False
+        for where, target in placement:
+            if target in SPECS:
+                i = self._index(target)
+                if i is None:
+                    continue
+                if where == 'before':
+                    self._chunks[i:i] = [section, '\n']
+                else:
+                    self._chunks[i + 1:i + 1] = ['\n', section]
+                return True
+            for i, chunk in enumerate(self._chunks):
+                if isinstance(chunk, _Section):
+                    continue
+                at = 0 if chunk.startswith(target) else chunk.find('\n' + target) + 1
+                if at or chunk.startswith(target):
+                    self._chunks[i:i + 1] = [p for p in (chunk[:at], section, '\n', chunk[at:]) if p != '']
+                    return True
+        tail = self._chunks[-1] if self._chunks else ''
+        if isinstance(tail, str) and not tail.endswith('\n\n'):
+            self._chunks.append('\n' if tail.endswith('\n') else '\n\n')
+        self._chunks.append(section)
+        return True
+
+    # ── write ────────────────────────────────────────────────────────────
+    def is_dirty(self) -> bool:
+        if self._chunks is None:
+            return False
+        return ''.join(c.render() if isinstance(c, _Section) else c for c in self._chunks) != self._saved
+
+    def save(self, manifest=None, artifact: Optional[str] = None,
+             digest: Optional[str] = None, sections: Sequence[str] = ()) -> bool:
+        """Write README.md if its bytes changed; True if written.
+
+        With a manifest, the build is recorded as `artifact` from `digest`
+        (see _build_manifest), hashed over part(*sections), when the file
+        is actually written out.
+        """
+        if manifest is not None:
+            self._pending.append((manifest, artifact, digest, tuple(sections)))
+        if self._defer_depth:
+            self._save_pending = True
+            return False
+        return self._write()
+
+    def _write(self) -> bool:
+        if not self.exists():
+            return False
+        text = self.text()
+        pending, self._pending = self._pending, []
+        written = False
+        if pending:
+            for manifest, artifact, digest, sections in pending:
+                written = manifest.write(artifact, digest, self.path, text,
+                                         self.part(*sections)) or written
+        elif text != self._saved:
+            atomic_write_text(self.path, text)
+            written = True
+        self._saved = text
+        self._stat = self._disk_stat()
+        return written
+
+    @contextlib.contextmanager
+    def deferred(self) -> Iterator['Readme']:
+        """Hold every save() until the outermost block exits, then write once."""
+        self._defer_depth += 1
+        try:
+            yield self
+        finally:
+            self._defer_depth -= 1
+            if not self._defer_depth and self._save_pending:
+                self._save_pending = False
+                self._write()
+
+
+_readmes: Dict[Path, Readme] = {}
+
+
+def get_readme(path: Union[str, Path] = DEFAULT_PATH) -> Readme:
+    """Process-wide Readme for `path` (resolved against the current cwd)."""
+    key = Path(path).resolve()
+    readme = _readmes.get(key)
+    if readme is None:
+        readme = _readmes[key] = Readme(key)
+    return readme
@@ -0,0 +1,226 @@
+"""Columnar weekly series shared by every chart consumer.
+
+The progress chart, the tokens chart and the sparklines all need the same
+thing: every recorded week sorted by week, socialContent and workouts
+flattened to one number, and per-week plus running-total columns for each
+metric. build_series() does that in one pass over the entries and returns
+plain lists keyed by column name:
+
+    {'weeks':  ['2026-W18', ...],          # sorted week ids
+     'labels': ['W18', ...],
+     'weekly':     {'commits': [...], 'user_talks': [...], ...},
+     'cumulative': {'commits': [...], 'user_talks': [...], ...},
+     'tokens':     {'claude': [...], 'codex': [...], 'total': [...]}}
+
+Token columns are raw per-week counts with None for weeks recorded before
+token tracking started; they are never accumulated.
+
+Charts call history_series(data), which builds over full_history(): the
+hot weeklyHistory window of data.json plus every week in the archive
+(_history_archive). data.json alone holds only the last HOT_WEEKS.
+
+The running totals use numpy.cumsum for all-int columns when numpy is
+installed and itertools.accumulate otherwise (np.cumsum would turn a
+column with any float into floats throughout), so the output is
+identical lists of Python numbers either way. Results are cached in-process by a content digest of
+the history, so the pipeline's chart stages share one build per data.json
+state; history_series() keys on the hot window and the archive file's
+size and mtime, so repeat calls skip re-reading the archive. Treat the
+returned columns as read-only.
+
+lttb() thins a long series to a pixel budget for drawing, keeping its
+peaks; charts index their labels with the positions it returns.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Sequence
+
+from _build_manifest import input_digest
+from _history_archive import HistoryArchive, full_history
+
+try:
+    import numpy as np
+except ImportError:  # optional: the dashboard scripts run on a bare python3
+    np = None
+
+# Column names, in the order week_values() reads them from a metrics dict.
+METRIC_KEYS = ('commits', 'user_talks', 'social_posts', 'coffee_chats', 'workouts', 'blog_posts')
+TOKEN_KEYS = ('claude', 'codex', 'total')
+CACHE_SIZE = 8
+
+_cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+
+
+def _rollup(value, parts: Sequence[str]):
+    """Sum a breakdown dict's parts; older entries stored a plain number."""
+    if isinstance(value, dict):
+        return sum(value.get(p, 0) for p in parts)
+    return value
+
+
+def week_values(metrics: Dict[str, Any]) -> List[Any]:
+    """One week's metric values in METRIC_KEYS order."""
+    return [
+        metrics.get('commits', 0),
+        metrics.get('userSessions', 0),
+        _rollup(metrics.get('socialContent', {}), ('instagram', 'tiktok', 'hellotalk')),
+        metrics.get('ctoMeetings', 0),
+        _rollup(metrics.get('workouts', {}), ('running', 'gym')),
+        metrics.get('blogPosts', 0),
+    ]
+
+
+def _week_tokens(metrics: Dict[str, Any]) -> List[Optional[Any]]:
+    tokens = metrics.get('tokens')
+    if not isinstance(tokens, dict):
+        return [None] * len(TOKEN_KEYS)
+    return [tokens.get(k) for k in TOKEN_KEYS]
+
+
+def _running_totals(rows: List[List[Any]]) -> List[List[Any]]:
+    """Column-wise running sums of a weeks × metrics matrix, as columns."""
+    if not rows:
+        return [[] for _ in METRIC_KEYS]
+    return [_cumsum(column) for column in zip(*rows)]
+
+
+def _cumsum(column: Sequence[Any]) -> List[Any]:
+    if np is not None and all(type(v) is int for v in column):
+        return np.cumsum(column).tolist()
+    return list(accumulate(column))
+
+
+def _build(history: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    weeks: List[str] = []
+    labels: List[str] = []
+    rows: List[List[Any]] = []
+    token_rows: List[List[Optional[Any]]] = []
+    for entry in sorted(history, key=lambda e: e.get('week', '')):
+        week_id = entry.get('week', '')
+        if '-W' not in week_id:
+            continue
+        metrics = entry.get('metrics') or {}
+        weeks.append(week_id)
+        labels.append(f"W{week_id.split('-W')[1]}")
+        rows.append(week_values(metrics))
+        token_rows.append(_week_tokens(metrics))
+
+    weekly_columns = [list(c) for c in zip(*rows)] or [[] for _ in METRIC_KEYS]
+    token_columns = [list(c) for c in zip(*token_rows)] or [[] for _ in TOKEN_KEYS]
+    return {
+        'weeks': weeks,
+        'labels': labels,
+        'weekly': dict(zip(METRIC_KEYS, weekly_columns)),
+        'cumulative': dict(zip(METRIC_KEYS, _running_totals(rows))),
+        'tokens': dict(zip(TOKEN_KEYS, token_columns)),
+    }
+
+
+def build_series(history: Optional[Sequence[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Columnar series for a weeklyHistory list (cached by content)."""
+    history = list(history or [])
+    key = input_digest(history)
+    series = _cache.get(key)
+    if series is None:
+        series = _build(history)
+        _cache[key] = series
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return series
+
+
+def history_series(data: Dict[str, Any],
+                   archive: Optional[HistoryArchive] = None) -> Dict[str, Any]:
+    """build_series over data.json's hot window plus the whole archive."""
+    archive = archive or HistoryArchive()
+    try:
+        st = archive.path.stat()
+        stamp = (st.st_size, st.st_mtime_ns)
+    except FileNotFoundError:
+        stamp = None
+    key = 'history:' + input_digest(str(archive.path.resolve()), stamp,
+                                    data.get('weeklyHistory') or [])
+    series = _cache.get(key)
+    if series is None:
+        series = build_series(full_history(data, archive))
+        _cache[key] = series
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    else:
+        _cache.move_to_end(key)
+    return series
+
+
+def _lttb_numpy(xs, ys, threshold: int) -> List[int]:
+    x = np.asarray(xs, dtype=float)
+    y = np.asarray(ys, dtype=float)
+    n = len(x)
+    every = (n - 2) / (threshold - 2)
+    keep = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[avg_start:avg_end].mean()
+        avg_y = y[avg_start:avg_end].mean()
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        areas = np.abs((x[a] - avg_x) * (y[start:end] - y[a])
+                       - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(areas.argmax())
+        keep.append(a)
+    keep.append(n - 1)
+    return keep
+
+
+def _lttb_python(xs, ys, threshold: int) -> List[int]:
+    n = len(xs)
+    every = (n - 2) / (threshold - 2)
+    keep = [0]
+    a = 0
+    for i in range(threshold - 2):
+        avg_start = int((i + 1) * every) + 1
+        avg_end = min(int((i + 2) * every) + 1, n)
+        count = avg_end - avg_start
+        avg_x = sum(xs[avg_start:avg_end]) / count
+        avg_y = sum(ys[avg_start:avg_end]) / count
+        xa, ya = xs[a], ys[a]
+        start, end = int(i * every) + 1, int((i + 1) * every) + 1
+        a = max(range(start, end), key=lambda j: abs(
+            (xa - avg_x) * (ys[j] - ya) - (xa - xs[j]) * (avg_y - ya)))
+        keep.append(a)
+    keep.append(n - 1)
+    return keep
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets: positions of at most `threshold` points.
+
+    Keeps the first and last point and, from each of threshold - 2 equal
+    buckets in between, the point forming the largest triangle with the
+    previous pick and the next bucket's mean — so peaks and dips survive
+    where plain striding would drop them. Positions index into xs/ys, in
+    order. Short series come back whole. Each bucket's areas are one numpy
+    expression when numpy is available.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    if np is not None:
+        return _lttb_numpy(xs, ys, threshold)
+    return _lttb_python(xs, ys, threshold)
+
+
+def cumulative_view(series: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """The {'weeks': labels, <metric>: running totals} shape the charts use."""
+    view = {'weeks': list(series['labels'])}
+    for key in METRIC_KEYS:
+        view[key] = list(series['cumulative'][key])
+    return view
+
+
+def clear_cache() -> None:
+    _cache.clear()
@@ -0,0 +1,168 @@
+"""Precompiled SVG templates shared by the dashboard, history and sparkline cards.
+
+generate_svg, generate_weekly_history and generate_progress_chart all draw
+the same page: a gradient <defs> block, a rounded background, a title and
+a 3x2 grid of cards. The markup for those pieces lives here once.
+
+SvgTemplate takes str.format-style text ("{value}", "{total:,}", "{{" for
+a literal brace), splits it into literal/field parts at import time, and
+render() is a single join over those parts — no re-parsing or nested
+f-string assembly per card. A page is then one fill per card plus one fill
+for the document, however many weeks are rendered.
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+FONT = 'system-ui, -apple-system, sans-serif'
+
+
+class SvgTemplate:
+    __slots__ = ('_parts', 'fields')
+
+    def __init__(self, text: str):
+        parts: List[Tuple[str, Optional[str], str]] = []
+        for literal, field, spec, conversion in Formatter().parse(text):
+            if field is not None and (not field.isidentifier() or conversion):
+                raise ValueError(f"unsupported template field: {{{field}}}")
+            parts.append((literal, field, spec or ''))
+        self._parts = tuple(parts)
+        self.fields = frozenset(f for _, f, _ in parts if f is not None)
+
+    def render(self, values: Optional[Mapping[str, Any]] = None, **kwargs: Any) -> str:
+        if values is None:
+            values = kwargs
+        elif kwargs:
+            values = {**values, **kwargs}
+        out = []
+        for literal, field, spec in self._parts:
+            out.append(literal)
+            if field is not None:
+                value = values[field]
+                out.append(format(value, spec) if spec else str(value))
+        return ''.join(out)
+
+    def render_many(self, rows: Iterable[Mapping[str, Any]]) -> List[str]:
+        return [self.render(row) for row in rows]
+
+
+# ── shared <defs>: page gradient, card gradient, card drop shadow ────────
+_DEFS_LINES = (
+    (0, '<defs>'),
+    (1, '<linearGradient id="bg" x1="0%" y1="0%" x2="100%" y2="100%">'),
+    (2, '<stop offset="0%" style="stop-color:#ffffff;stop-opacity:1" />'),
+    (2, '<stop offset="100%" style="stop-color:#f8fafc;stop-opacity:1" />'),
+    (1, '</linearGradient>'),
+    (1, '<linearGradient id="cardBg" x1="0%" y1="0%" x2="100%" y2="100%">'),
+    (2, '<stop offset="0%" style="stop-color:#ffffff;stop-opacity:1" />'),
+    (2, '<stop offset="100%" style="stop-color:#f1f5f9;stop-opacity:1" />'),
+    (1, '</linearGradient>'),
+    (1, '<filter id="shadow">'),
+    (2, '<feDropShadow dx="0" dy="2" stdDeviation="8" flood-color="#000000" flood-opacity="0.1"/>'),
+    (1, '</filter>'),
+    (0, '</defs>'),
+)
+
+
+@lru_cache(maxsize=None)
+def defs(indent: str = '    ') -> str:
+    """The <defs> block, nested one `indent` per level below <svg>."""
+    return '\n'.join(indent * (level + 1) + line for level, line in _DEFS_LINES)
+
+
+# ── 520px card page: dashboard and weekly history ────────────────────────
+PAGE = SvgTemplate(f'''<svg width="{{width}}" height="{{height}}" xmlns="http://www.w3.org/2000/svg">
+{{defs}}
+
+    <!-- Background -->
+    <rect width="{{width}}" height="{{height}}" fill="url(#bg)" rx="16" stroke="#e2e8f0" stroke-width="1"/>
+
+    <!-- Title -->
+    <text x="{{center}}" y="{{title_y}}" text-anchor="middle" fill="#0f172a" font-size="{{title_size}}" font-weight="700" font-family="{FONT}">
+        {{title}}
+    </text>
+    <text x="{{center}}" y="{{subtitle_y}}" text-anchor="middle" fill="#64748b" font-size="12" font-family="{FONT}">
+        {{subtitle}}
+    </text>
+
+    <!-- Metrics Grid -->
+{{cards}}{{footer}}</svg>''')
+
+_CARD_HEAD = '''    <!-- {comment} -->
+    <g transform="translate({x}, {y})">
+        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
+'''
+_CARD_TAIL = '''    </g>
+
+'''
+
+# Live dashboard tile: value, week-over-week trend, label, goal progress.
+DASHBOARD_CARD = SvgTemplate(_CARD_HEAD + f'''        <text x="60" y="32" text-anchor="middle" fill="#000000" font-size="32" font-weight="800" font-family="{FONT}">
+            {{value}}
+        </text>
+        <text x="60" y="48" text-anchor="middle" fill="{{trend_color}}" font-size="9" font-weight="600" font-family="{FONT}">
+            {{trend}}
+        </text>
+        <text x="60" y="62" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="{FONT}">
+            {{label}}
+        </text>
+        <text x="60" y="76" text-anchor="middle" fill="#9ca3af" font-size="7" font-weight="400" font-family="Monaco, monospace">
+            {{bar}}
+        </text>
+        <text x="60" y="88" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="600" font-family="{FONT}">
+            {{percent}} of goal
+        </text>
+''' + _CARD_TAIL)
+
+# History archive tile: value, label, one line of detail.
+HISTORY_CARD = SvgTemplate(_CARD_HEAD + f'''        <text x="60" y="40" text-anchor="middle" fill="#000000" font-size="36" font-weight="800" font-family="{FONT}">
+            {{value}}
+        </text>
+        <text x="60" y="60" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="{FONT}">
+            {{label}}
+        </text>
+        <text x="60" y="78" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="400" font-family="{FONT}">
+            {{note}}
+        </text>
+''' + _CARD_TAIL)
+
+# Metric spec shared by both card pages: (series key, comment, tile label).
+# Keys match _series.METRIC_KEYS.
+METRIC_CARDS: Sequence[Tuple[str, str, str]] = (
+    ('commits', 'Commits', '🚀 CODE COMMITS'),
+    ('user_talks', 'User Talks', '💬 USER TALKS'),
+    ('social_posts', 'Social Posts', '📱 SOCIAL POSTS'),
+    ('coffee_chats', 'Coffee Chats', '☕ COFFEE CHATS'),
+    ('workouts', 'Workouts', '🏃 WORKOUTS'),
+    ('blog_posts', 'Blog Posts', '📝 BLOG POSTS'),
+)
+
+GRID_COLUMNS = 3
+GRID_LEFT = 60
+GRID_STEP_X = 140
+GRID_STEP_Y = 115
+
+
+def render_card_grid(template: SvgTemplate, values: Mapping[str, Dict[str, Any]], top: int) -> str:
+    """Render one tile per METRIC_CARDS entry in a 3-wide grid starting at `top`.
+
+    `values` maps series key → that tile's template fields.
+    """
+    out = []
+    for i, (key, comment, label) in enumerate(METRIC_CARDS):
+        row, col = divmod(i, GRID_COLUMNS)
+        if col == 0:
+            names = ', '.join(c for _, c, _ in METRIC_CARDS[i:i + GRID_COLUMNS])
+            out.append(f'    <!-- Row {row + 1}: {names} -->\n')
+        out.append(template.render(values[key], comment=comment, label=label,
+                                   x=GRID_LEFT + col * GRID_STEP_X, y=top + row * GRID_STEP_Y))
+    return ''.join(out)
+
+
+def render_page(*, height: int, title: str, subtitle: str, title_y: int, title_size: int,
+                subtitle_y: int, cards: str, footer: str = '', width: int = 520) -> str:
+    return PAGE.render(width=width, height=height, center=width // 2, defs=defs(),
+                       title=title, title_y=title_y, title_size=title_size,
+                       subtitle=subtitle, subtitle_y=subtitle_y, cards=cards, footer=footer)
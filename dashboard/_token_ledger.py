@@ -0,0 +1,150 @@
+"""Append-only per-day token ledger kept next to data.json.
+
+Local usage logs are pruned after ~30 days, so re-querying an old week
+can only under-count. Every get_weekly_tokens run appends what it saw per
+KST day and source to dashboard/token_ledger.jsonl:
+
+    {"date": "2026-05-04", "source": "claude", "tokens": 123, "capturedAt": "..."}
+
+A row is appended only when it raises the value on record for that
+(date, source) — the effective value is the maximum ever captured, which
+is the never-lower rule applied per day. A capture only speaks for days
+its rows cover: from the earliest day it returned on. Earlier days of
+the window may just have had their logs pruned, so they are left
+unrecorded instead of written down as 0. A covered day counts as
+COMPLETE once a capture was taken after it ended (next day 00:00 KST); a
+week whose days are all complete for a source is summed from the ledger
+with no ccusage or log re-read at all.
+
+The file is committed with data.json (the launchd worktree is reset on
+every run). TOKEN_LEDGER_PATH overrides it; empty keeps the ledger in
+memory for that TokenLedger only.
+"""
+
+from __future__ import annotations
+import json
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from _fileio import file_lock
+
+KST = timezone(timedelta(hours=9))
+DEFAULT_PATH = Path('dashboard/token_ledger.jsonl')
+
+Key = Tuple[date, str]  # (KST day, source)
+
+
+def _ledger_path() -> Optional[Path]:
+    raw = os.getenv('TOKEN_LEDGER_PATH')
+    if raw is None:
+        return DEFAULT_PATH
+    return Path(raw) if raw else None
+
+
+def _day_end(day: date) -> datetime:
+    return datetime.combine(day + timedelta(days=1), time.min, tzinfo=KST)
+
+
+def days_between(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+class TokenLedger:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self._tokens: Dict[Key, int] = {}
+        self._complete: Dict[Key, bool] = {}
+        if path is not None:
+            try:
+                lines = path.read_text().splitlines()
+            except FileNotFoundError:
+                lines = []
+            for line in lines:
+                try:
+                    row = json.loads(line)
+                    self._apply(date.fromisoformat(row['date']), row['source'],
+                                int(row['tokens']), datetime.fromisoformat(row['capturedAt']))
+                except (ValueError, KeyError, TypeError):
+                    continue  # torn tail of an interrupted append
+
+    def _apply(self, day: date, source: str, tokens: int, captured_at: datetime) -> bool:
+        key = (day, source)
+        raised = key not in self._tokens or tokens > self._tokens[key]
+        if raised:
+            self._tokens[key] = tokens
+        if captured_at >= _day_end(day):
+            self._complete[key] = True
+        return raised
+
+    def tokens(self, day: date, source: str) -> Optional[int]:
+        return self._tokens.get((day, source))
+
+    def is_complete(self, day: date, source: str) -> bool:
+        return self._complete.get((day, source), False)
+
+    def known_total(self, source: str, start: date, end: date) -> int:
+        """Sum of what is on record over [start, end]; unrecorded days count 0."""
+        return sum(self._tokens.get((d, source), 0) for d in days_between(start, end))
+
+    def items(self) -> Iterable[Tuple[Key, int]]:
+        """((day, source), tokens) for every recorded day."""
+        return self._tokens.items()
+
+    def week_total(self, source: str, start: date, end: date) -> Optional[int]:
+        """Sum over [start, end] if every day is complete for `source`, else None."""
+        days = days_between(start, end)
+        if not all(self.is_complete(d, source) for d in days):
+            return None
+        return sum(self._tokens[(d, source)] for d in days)
+
+    def record(self, source: str, per_day: Mapping[date, int], start: date, end: date,
+               captured_at: Optional[datetime] = None) -> int:
+        """Record one successful query of [start, end].
+
+        Days from the earliest returned row on that it didn't return were
+        0; days before that row are not covered and stay as they were.
+        Appends a row for every day whose value went up, or that this
+        capture completes. Returns the number of rows appended.
+        """
+        captured_at = captured_at or datetime.now(KST)
+        if not per_day:
+            return 0  # covers nothing: maybe idle, maybe pruned
+        covered_from = max(start, min(per_day))
+        rows = []
+        for day in days_between(covered_from, end):
+            if day >= captured_at.astimezone(KST).date() + timedelta(days=1):
+                break  # the future has nothing to record
+            tokens = int(per_day.get(day, 0))
+            was_complete = self.is_complete(day, source)
+            if self._apply(day, source, tokens, captured_at) or (
+                    self.is_complete(day, source) and not was_complete):
+                rows.append({
+                    'date': day.isoformat(), 'source': source,
+                    'tokens': self._tokens[(day, source)],
+                    'capturedAt': captured_at.isoformat(timespec='seconds'),
+                })
+        self._append(rows)
+        return len(rows)
+
+    def _append(self, rows: Iterable[dict]) -> None:
+        rows = list(rows)
+        if self.path is None or not rows:
+            return
+        text = ''.join(json.dumps(r, separators=(', ', ': ')) + '\n' for r in rows)
+        with file_lock(self.path):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'ab+') as f:
+                size = f.seek(0, os.SEEK_END)
+                if size:
+                    f.seek(size - 1)
+                    if f.read(1) != b'\n':
+                        text = '\n' + text  # don't glue onto a torn last line
+                f.write(text.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def open_ledger() -> TokenLedger:
+    return TokenLedger(_ledger_path())
@@ -0,0 +1,291 @@
+"""Daily token totals read straight from the local Claude Code / Codex logs.
+
+get_weekly_tokens used to spawn `ccusage` and `npx ccusage@latest codex`
+only to sum `totalTokens` per day. Both tools read the same session JSONL
+files this module streams:
+
+  - Claude Code: <config>/projects/**/*.jsonl, one line per message; the
+    assistant lines carry message.usage. config = $CLAUDE_CONFIG_DIR
+    (comma-separated) or ~/.config/claude and ~/.claude. A resumed session
+    copies earlier messages into the new file, so lines are de-duplicated
+    on message.id + requestId like ccusage does.
+  - Codex: $CODEX_HOME/sessions/**/*.jsonl (default ~/.codex), where
+    event_msg/token_count lines carry last_token_usage (per turn) and
+    total_token_usage (running total, used for a delta when the per-turn
+    block is missing).
+
+Timestamps are UTC; days are bucketed in KST like `--timezone Asia/Seoul`.
+
+The logs only grow, so a checkpoint (USAGE_CHECKPOINT_PATH, default
+dashboard/.usage_checkpoint.json; empty = keep it in memory) records per
+file its inode, the byte offset parsed so far and the per-day sums found
+up to there. A run parses only the appended bytes — a partial last line
+is left for the next run — and re-reads a file from zero if it was
+replaced or truncated. Files that disappear (the ~30-day pruning) drop
+out of the totals, matching what ccusage would report. Claude dedup keys
+are kept per day and only for KEY_RETENTION_DAYS back from the newest
+day seen: a resumed session copies messages out of a log that still
+exists, so older keys can no longer collide. The file is rewritten only
+when a scan changed something.
+
+Sources can be read concurrently: each has its own scan lock, and the
+shared checkpoint document is only touched under a short module lock.
+
+fetch_total/fetch_daily return ok=False when no log directory exists,
+which is the caller's cue to fall back to the CLIs.
+"""
+
+from __future__ import annotations
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from _fileio import atomic_write_text
+
+KST = timezone(timedelta(hours=9))
+SOURCES = ('claude', 'codex')
+CHECKPOINT_VERSION = 2
+# Claude Code prunes session logs after 30 days (cleanupPeriodDays), plus slack.
+KEY_RETENTION_DAYS = 35
+_DEFAULT_CHECKPOINT_PATH = Path('dashboard/.usage_checkpoint.json')
+
+_lock = threading.Lock()  # guards the checkpoint document
+_source_locks = {source: threading.Lock() for source in SOURCES}
+_checkpoint: Optional[Dict[str, Any]] = None
+_checkpoint_from: Optional[Path] = None
+
+
+def _checkpoint_path() -> Optional[Path]:
+    """USAGE_CHECKPOINT_PATH overrides the file; set it empty to keep it in memory."""
+    raw = os.getenv('USAGE_CHECKPOINT_PATH')
+    if raw is None:
+        return _DEFAULT_CHECKPOINT_PATH
+    return Path(raw) if raw else None
+
+
+def log_dirs(source: str) -> List[Path]:
+    """Existing log roots for `source`, in the order ccusage searches them."""
+    home = Path.home()
+    if source == 'claude':
+        env = os.getenv('CLAUDE_CONFIG_DIR', '').strip()
+        roots = ([Path(p.strip()).expanduser() for p in env.split(',') if p.strip()]
+                 if env else [home / '.config' / 'claude', home / '.claude'])
+        candidates = [r / 'projects' for r in roots]
+    elif source == 'codex':
+        codex_home = os.getenv('CODEX_HOME', '').strip()
+        candidates = [(Path(codex_home).expanduser() if codex_home else home / '.codex')
+                      / 'sessions']
+    else:
+        raise ValueError(f"unknown usage source {source!r}")
+    return [d for d in candidates if d.is_dir()]
+
+
+def _kst_day(timestamp: Any) -> Optional[str]:
+    if not isinstance(timestamp, str):
+        return None
+    try:
+        ts = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(KST).date().isoformat()
+
+
+def _int(value: Any) -> int:
+    try:
+        return max(int(value or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _claude_usage(obj: Dict[str, Any]) -> Optional[Tuple[str, int, Optional[str]]]:
+    """(KST day, tokens, dedup key) for an assistant line with usage."""
+    message = obj.get('message')
+    usage = message.get('usage') if isinstance(message, dict) else None
+    if not isinstance(usage, dict):
+        return None
+    day = _kst_day(obj.get('timestamp'))
+    if day is None:
+        return None
+    tokens = (_int(usage.get('input_tokens')) + _int(usage.get('output_tokens'))
+              + _int(usage.get('cache_creation_input_tokens'))
+              + _int(usage.get('cache_read_input_tokens')))
+    msg_id, req_id = message.get('id'), obj.get('requestId')
+    key = f"{msg_id}:{req_id}" if msg_id and req_id else None
+    return day, tokens, key
+
+
+def _usage_total(usage: Dict[str, Any]) -> int:
+    total = _int(usage.get('total_tokens'))
+    return total or _int(usage.get('input_tokens')) + _int(usage.get('output_tokens'))
+
+
+def _codex_usage(obj: Dict[str, Any], rec: Dict[str, Any]) -> Optional[Tuple[str, int]]:
+    """(KST day, tokens) for a token_count event; tracks the running total in rec."""
+    payload = obj.get('payload')
+    if (obj.get('type') != 'event_msg' or not isinstance(payload, dict)
+            or payload.get('type') != 'token_count'):
+        return None
+    info = payload.get('info')
+    if not isinstance(info, dict):
+        return None
+    day = _kst_day(obj.get('timestamp'))
+    running = info.get('total_token_usage')
+    running_total = _usage_total(running) if isinstance(running, dict) else None
+    last = info.get('last_token_usage')
+    if isinstance(last, dict):
+        tokens = _usage_total(last)
+    elif running_total is not None:
+        tokens = max(running_total - _int(rec.get('runningTotal')), 0)
+    else:
+        return None
+    if running_total is not None:
+        rec['runningTotal'] = running_total
+    return (day, tokens) if day is not None else None
+
+
+def _lines(path: Path, offset: int) -> Iterator[Tuple[bytes, int]]:
+    """Complete lines from `offset` on, each with the offset just past it."""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b'\n'):
+                return  # still being written — pick it up next run
+            offset += len(line)
+            yield line, offset
+
+
+def _scan_file(source: str, path: Path, rec: Dict[str, Any], seen: Set[str]) -> None:
+    days = rec['days']
+    keys = rec.setdefault('keys', {}) if source == 'claude' else None
+    for line, end in _lines(path, rec['offset']):
+        rec['offset'] = end
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(obj, dict):
+            continue
+        if source == 'claude':
+            found = _claude_usage(obj)
+            if found is None:
+                continue
+            day, tokens, key = found
+            if key is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+                keys.setdefault(day, []).append(key)
+        else:
+            found = _codex_usage(obj, rec)
+            if found is None:
+                continue
+            day, tokens = found
+        days[day] = days.get(day, 0) + tokens
+
+
+def _load_checkpoint(path: Optional[Path]) -> Dict[str, Any]:
+    global _checkpoint, _checkpoint_from
+    if _checkpoint is None or _checkpoint_from != path:
+        _checkpoint = {'version': CHECKPOINT_VERSION, 'sources': {}}
+        _checkpoint_from = path
+        if path is not None:
+            try:
+                raw = json.loads(path.read_text())
+                if (isinstance(raw, dict) and raw.get('version') == CHECKPOINT_VERSION
+                        and isinstance(raw.get('sources'), dict)):
+                    _checkpoint = raw
+            except (FileNotFoundError, ValueError):
+                pass
+    return _checkpoint
+
+
+def _save_checkpoint(path: Optional[Path], checkpoint: Dict[str, Any]) -> None:
+    if path is None:
+        return
+    try:
+        atomic_write_text(path, json.dumps(checkpoint, sort_keys=True) + '\n')
+    except OSError:
+        pass  # the checkpoint is an optimization — a full re-read is still correct
+
+
+def _expire_keys(files: Dict[str, Dict[str, Any]]) -> None:
+    """Drop dedup keys of days older than KEY_RETENTION_DAYS before the newest day."""
+    newest = max((day for rec in files.values() for day in rec['days']), default=None)
+    if newest is None:
+        return
+    cutoff = (date.fromisoformat(newest) - timedelta(days=KEY_RETENTION_DAYS)).isoformat()
+    for rec in files.values():
+        keys = rec.get('keys')
+        if keys and min(keys) < cutoff:
+            rec['keys'] = {day: k for day, k in keys.items() if day >= cutoff}
+
+
+def read_daily(source: str) -> Optional[Dict[date, int]]:
+    """{KST date: tokens} over every log file of `source`; None if it has no logs."""
+    dirs = log_dirs(source)
+    if not dirs:
+        return None
+    path = _checkpoint_path()
+    with _source_locks[source]:
+        with _lock:
+            checkpoint = _load_checkpoint(path)
+            old_files = checkpoint['sources'].get(source, {}).get('files', {})
+        files: Dict[str, Dict[str, Any]] = {}
+        for log_file in sorted(p for d in dirs for p in d.rglob('*.jsonl')):
+            try:
+                st = log_file.stat()
+            except OSError:
+                continue
+            rec = old_files.get(str(log_file))
+            if (not isinstance(rec, dict) or rec.get('ino') != st.st_ino
+                    or st.st_size < _int(rec.get('offset'))):
+                rec = {'ino': st.st_ino, 'offset': 0, 'days': {}}
+            else:
+                # Scan a copy: the other source may serialize the document
+                # while this one is still parsing.
+                rec = dict(rec, days=dict(rec.get('days') or {}),
+                           **({'keys': {d: list(k) for d, k in rec['keys'].items()}}
+                              if 'keys' in rec else {}))
+            files[str(log_file)] = rec
+        # Keys of files still present, so a re-read file can't count a
+        # message another file already holds.
+        seen = {k for rec in files.values() for keys in rec.get('keys', {}).values()
+                for k in keys}
+        for name, rec in files.items():
+            try:
+                _scan_file(source, Path(name), rec, seen)
+            except OSError:
+                continue  # vanished mid-run; its parsed prefix still counts
+        _expire_keys(files)
+        with _lock:
+            checkpoint = _load_checkpoint(path)
+            if checkpoint['sources'].get(source) != {'files': files}:
+                checkpoint['sources'][source] = {'files': files}
+                _save_checkpoint(path, checkpoint)
+
+    per_day: Dict[date, int] = {}
+    for rec in files.values():
+        for day, tokens in rec['days'].items():
+            d = date.fromisoformat(day)
+            per_day[d] = per_day.get(d, 0) + tokens
+    return per_day
+
+
+def fetch_daily(source: str, start_iso: str, end_iso: str) -> Tuple[Dict[date, int], bool]:
+    """({KST date: tokens} within [start, end], ok) — ok=False means no logs here."""
+    per_day = read_daily(source)
+    if per_day is None:
+        return {}, False
+    start, end = date.fromisoformat(start_iso), date.fromisoformat(end_iso)
+    return {d: n for d, n in per_day.items() if start <= d <= end}, True
+
+
+def fetch_total(source: str, start_iso: str, end_iso: str) -> Tuple[int, bool]:
+    """(tokens in [start, end], ok) — the fetch_source interface."""
+    per_day, ok = fetch_daily(source, start_iso, end_iso)
+    return sum(per_day.values()), ok
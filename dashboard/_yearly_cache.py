@@ -2,13 +2,20 @@
 
 A year's totals are 'authoritative' once they've been computed in a
 *later* calendar year — at that point the year is final and will never
-change. Current year is never authoritative; it must be queried fresh.
+change. Current year is never authoritative as a whole; instead its
+closed months are cached under "months" ("YYYY-MM" → totals + fetched_at)
+and one is final once it was fetched FINAL_AFTER after it ended (UTC,
+matching the yearly windows). Only the still-open rest of the year has
+to be queried fresh.
 """
 
 from __future__ import annotations
 import json
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Tuple
+
+from _commit_calendar import FINAL_AFTER
 
 CACHE_VERSION = 1
 
@@ -36,3 +43,28 @@ def is_cache_authoritative(*, year: int, current_year: int, entry: Dict[str, Any
     if year >= current_year:
         return False
     return int(entry.get("computed_in_year", 0)) > year
+
+
+def month_key(year: int, month: int) -> str:
+    return f"{year}-{month:02d}"
+
+
+def _month_start(year: int, month: int) -> datetime:
+    if month > 12:
+        return datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+def month_window(year: int, first: int, last: int) -> Tuple[str, str]:
+    """(from_iso, to_iso) in UTC covering months first..last of `year`."""
+    end = _month_start(year, last + 1) - timedelta(seconds=1)
+    return f"{year}-{first:02d}-01T00:00:00Z", end.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def is_month_final(*, year: int, month: int, entry: Dict[str, Any]) -> bool:
+    """Month is final iff it was fetched FINAL_AFTER (or more) after it ended."""
+    try:
+        fetched_at = datetime.fromisoformat(entry["fetched_at"])
+    except (KeyError, TypeError, ValueError):
+        return False
+    return fetched_at >= _month_start(year, month + 1) + FINAL_AFTER
@@ -14,16 +14,25 @@ totals.
 Idempotent: re-running rewrites each entry with the API's answer for its
 exact date range. On API failure (None) the stored value is preserved,
 mirroring generate_svg.py's contract.
+
+All weeks are resolved by get_commits_for_ranges(): a local sum over the
+per-day commit calendar, fetching only days not cached as final yet (one
+batched request), not one request per week.
 """
 
-import json
+import os
 import sys
 from datetime import datetime
 from pathlib import Path
 
-from get_weekly_commits import get_commits_for_range
+from _graphql_client import has_budget, seed_budget
+from get_weekly_commits import GRAPHQL_URL, get_commits_for_ranges
+from _data_store import get_store
 
 DATA = Path('dashboard/data.json')
+# A cold calendar fill is a handful of small aliased requests; refuse to
+# start only when we know the hourly quota is nearly gone.
+BACKFILL_MIN_BUDGET = 100
 
 
 def _normalize_date(s):
@@ -36,36 +45,59 @@ def _normalize_date(s):
     return None
 
 
+def _entry_range(entry):
+    return (_normalize_date(entry.get('startDate', '')),
+            _normalize_date(entry.get('endDate', '')))
+
+
 def main():
     if not DATA.exists():
         print(f"[commits-backfill] {DATA} not found", file=sys.stderr)
         return 1
 
-    data = json.loads(DATA.read_text())
-    changed = 0
-    for entry in data.get('weeklyHistory') or []:
-        start = _normalize_date(entry.get('startDate', ''))
-        end = _normalize_date(entry.get('endDate', ''))
-        week = entry.get('week') or f"{start}..{end}"
+    token = os.getenv('GITHUB_TOKEN', os.getenv('SUMMARY_CARDS_TOKEN', ''))
+    left = seed_budget(GRAPHQL_URL, {'Authorization': f'Bearer {token}'} if token else {})
+    print(f"[commits-backfill] GraphQL budget: "
+          f"{'unknown' if left is None else left} points left")
+    if not has_budget(BACKFILL_MIN_BUDGET):
+        print(f"[commits-backfill] budget below {BACKFILL_MIN_BUDGET} — "
+              f"not starting; re-run after the quota resets", file=sys.stderr)
+        return 1
+
+    store = get_store(DATA)
+    ranges = []
+    for entry in store.weekly_history():
+        start, end = _entry_range(entry)
         if not start or not end:
+            week = entry.get('week') or f"{start}..{end}"
             print(f"[commits-backfill] {week}: unparseable dates — skipping")
             continue
+        ranges.append((start, end))
 
-        confirmed = get_commits_for_range(start, end)
-        old = (entry.get('metrics') or {}).get('commits', 0)
-        if confirmed is None:
-            print(f"[commits-backfill] {week}: API unavailable — keeping {old}")
-            continue
-        if confirmed != old:
-            entry.setdefault('metrics', {})['commits'] = confirmed
-            print(f"[commits-backfill] {week}: {old} -> {confirmed}")
-            changed += 1
-        else:
-            print(f"[commits-backfill] {week}: {old} (unchanged)")
+    # API first, lock second: the answers are applied in one locked
+    # re-read + write, matched back to entries by date range.
+    confirmed_by_range = dict(zip(ranges, get_commits_for_ranges(ranges)))
+
+    changed = 0
+    with store.transaction() as data:
+        for entry in data.get('weeklyHistory') or []:
+            start, end = _entry_range(entry)
+            if (start, end) not in confirmed_by_range:
+                continue
+            week = entry.get('week') or f"{start}..{end}"
+            confirmed = confirmed_by_range[(start, end)]
+            old = (entry.get('metrics') or {}).get('commits', 0)
+            if confirmed is None:
+                print(f"[commits-backfill] {week}: API unavailable — keeping {old}")
+                continue
+            if confirmed != old:
+                entry.setdefault('metrics', {})['commits'] = confirmed
+                print(f"[commits-backfill] {week}: {old} -> {confirmed}")
+                changed += 1
+            else:
+                print(f"[commits-backfill] {week}: {old} (unchanged)")
 
     if changed:
-        with open(DATA, 'w') as f:
-            json.dump(data, f, indent=2)
         print(f"[commits-backfill] updated {changed} weeklyHistory entries")
     else:
         print("[commits-backfill] nothing to update")
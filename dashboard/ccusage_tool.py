@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Managed local install of the ccusage CLI.
+
+fetch_codex used to run `npx -y ccusage@latest` on every call: a registry
+lookup (and often a reinstall) before ccusage even starts, at midnight,
+under a 120s timeout — and the --offline retry still needed the registry.
+
+resolve() keeps one installed copy under CCUSAGE_CACHE_DIR (default
+~/.cache/piesson-tokens/ccusage) and returns the path of its binary:
+
+  - tool.json records the installed version, its bin path and when the
+    registry was last checked.
+  - Within REFRESH_SECONDS the stored bin is returned without any
+    network access, so the --offline retry genuinely works offline.
+  - After that the latest version is looked up once; a newer one is
+    installed beside the old, then the old is removed.
+  - CCUSAGE_VERSION pins an exact version (no registry lookup at all).
+  - Any failure keeps the previous install; with none, callers fall back
+    to the old npx / PATH commands. command() also falls back when the
+    cache dir is unwritable or tool.json stays locked (LockTimeout).
+    CCUSAGE_CACHE_DIR='' disables the cache.
+
+Usage:
+    python3 dashboard/ccusage_tool.py            # resolve, print the bin path
+    python3 dashboard/ccusage_tool.py --bench    # startup time: cached bin vs npx
+"""
+
+from __future__ import annotations
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from _fileio import LockTimeout, atomic_write_text, file_lock
+
+PACKAGE = 'ccusage'
+REFRESH_SECONDS = 7 * 24 * 3600
+INSTALL_TIMEOUT_SECS = 180
+LOOKUP_TIMEOUT_SECS = 30
+NPX_CMD = ['npx', '-y', f'{PACKAGE}@latest']
+
+_lock = threading.Lock()
+
+
+def log(msg):
+    print(msg, file=sys.stderr, flush=True)
+
+
+def cache_dir() -> Optional[Path]:
+    raw = os.getenv('CCUSAGE_CACHE_DIR')
+    if raw is None:
+        return Path.home() / '.cache' / 'piesson-tokens' / PACKAGE
+    return Path(raw).expanduser() if raw else None
+
+
+def _load(path: Path) -> Dict[str, Any]:
+    try:
+        raw = json.loads(path.read_text())
+        return raw if isinstance(raw, dict) else {}
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _run(cmd: List[str], timeout: float) -> Optional[str]:
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        log(f"[ccusage-tool] {' '.join(cmd[:3])} failed: {exc}")
+        return None
+    if proc.returncode != 0:
+        log(f"[ccusage-tool] {' '.join(cmd[:3])} rc={proc.returncode}: {proc.stderr[:200]}")
+        return None
+    return proc.stdout
+
+
+def latest_version() -> Optional[str]:
+    out = _run(['npm', 'view', PACKAGE, 'version', '--json'], LOOKUP_TIMEOUT_SECS)
+    try:
+        version = json.loads(out) if out else None
+    except ValueError:
+        return None
+    return version if isinstance(version, str) and version else None
+
+
+def install(root: Path, version: str) -> Optional[Path]:
+    prefix = root / f'{PACKAGE}-{version}'
+    out = _run(['npm', 'install', '--prefix', str(prefix), '--no-audit', '--no-fund',
+                '--silent', f'{PACKAGE}@{version}'], INSTALL_TIMEOUT_SECS)
+    binary = prefix / 'node_modules' / '.bin' / PACKAGE
+    if out is None or not binary.exists():
+        shutil.rmtree(prefix, ignore_errors=True)
+        return None
+    return binary
+
+
+def resolve(now: Optional[float] = None) -> Optional[Path]:
+    """Path of the cached ccusage binary, installing/refreshing as needed; None if unavailable."""
+    root = cache_dir()
+    if root is None:
+        return None
+    now = time.time() if now is None else now
+    manifest_path = root / 'tool.json'
+    with _lock, file_lock(manifest_path):
+        manifest = _load(manifest_path)
+        current = Path(manifest['bin']) if isinstance(manifest.get('bin'), str) else None
+        if current is not None and not current.exists():
+            current = None
+        pinned = os.getenv('CCUSAGE_VERSION', '').strip() or None
+        checked_at = manifest.get('checkedAt')
+        if current is not None and (
+                manifest.get('version') == pinned if pinned else
+                isinstance(checked_at, (int, float)) and now - checked_at < REFRESH_SECONDS):
+            return current
+
+        version = pinned or latest_version()
+        if version is None:
+            return current  # offline: the installed copy is still good
+        if current is None or version != manifest.get('version'):
+            log(f"[ccusage-tool] installing {PACKAGE}@{version}")
+            binary = install(root, version)
+            if binary is None:
+                return current
+            old = manifest.get('version')
+            if old and old != version:
+                shutil.rmtree(root / f'{PACKAGE}-{old}', ignore_errors=True)
+            manifest = {'version': version, 'bin': str(binary)}
+            current = binary
+        manifest['checkedAt'] = now
+        atomic_write_text(manifest_path, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+        return current
+
+
+def command(*args: str, fallback: List[str]) -> List[str]:
+    """[cached bin, *args] when the managed install is available, else fallback + args."""
+    try:
+        binary = resolve()
+    except (LockTimeout, OSError) as exc:
+        log(f"[ccusage-tool] managed install unavailable, using fallback: {exc}")
+        binary = None
+    return [str(binary), *args] if binary is not None else [*fallback, *args]
+
+
+def measure_startup(cmd: List[str], runs: int = 3) -> Optional[float]:
+    """Best-of-`runs` wall time of `cmd --version`, or None if it fails."""
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        if _run([*cmd, '--version'], INSTALL_TIMEOUT_SECS) is None:
+            return None
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    binary = resolve()
+    if binary is None:
+        log("[ccusage-tool] no managed install available")
+        return 1
+    print(binary)
+    if '--bench' in argv:
+        for label, cmd in (('cached', [str(binary)]), ('npx', NPX_CMD)):
+            secs = measure_startup(cmd)
+            print(f"{label:<7} {'failed' if secs is None else f'{secs:.2f}s'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,18 +4,18 @@ Check if daily update has been made today
 Returns exit code 0 if update needed, 1 if already updated
 """
 
-import json
 import sys
 from datetime import datetime, timezone, timedelta
 
+from _data_store import get_store
+
 # KST = UTC + 9 hours
 KST = timezone(timedelta(hours=9))
 
 def check_daily_update():
     """Check if data.json was updated today (KST timezone)"""
     try:
-        with open('dashboard/data.json', 'r') as f:
-            data = json.load(f)
+        data = get_store().data
 
         last_updated = data.get('lastUpdated', '')
         today = datetime.now(KST).strftime('%Y-%m-%d')
@@ -4,12 +4,12 @@ Check if we're in a new week and reset metrics if needed
 Runs daily at 7 AM KST before sending reminder
 """
 
-import json
 import sys
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 
 from get_weekly_commits import get_commits_for_range
+from _data_store import get_store
+from _history_archive import HOT_WEEKS, archive_and_trim
 
 # KST = UTC + 9 hours
 KST = timezone(timedelta(hours=9))
@@ -90,8 +90,9 @@ def save_to_history(data, current_week_info):
         data['weeklyHistory'].insert(0, history_entry)
         print(f"Added new history entry for {week_id}")
 
-    # Keep only last 12 weeks
-    data['weeklyHistory'] = data['weeklyHistory'][:12]
+    # Keep the last 12 weeks in data.json; every week (including the ones
+    # leaving that window) goes to the unbounded history archive first.
+    archive_and_trim(data, keep=HOT_WEEKS)
 
     return True
 
@@ -121,15 +122,14 @@ def reset_current_week_metrics(data):
 
 def check_and_reset_weekly_data():
     """Main function: check if new week and reset if needed"""
-    data_file = Path('dashboard/data.json')
+    store = get_store()
 
-    if not data_file.exists():
+    if not store.exists():
         print("❌ data.json not found")
         sys.exit(1)
 
     # Load current data
-    with open(data_file, 'r') as f:
-        data = json.load(f)
+    data = store.data
 
     # Get current week info
     current_week = get_current_week_info()
@@ -153,35 +153,43 @@ def check_and_reset_weekly_data():
         # stored value (same None contract as generate_svg.py).
         stored_start = data['currentWeek'].get('startDate')
         stored_end = data['currentWeek'].get('endDate')
+        confirmed = None
         if stored_start and stored_end:
             confirmed = get_commits_for_range(stored_start, stored_end)
             if confirmed is not None:
-                data['currentWeek']['metrics']['commits'] = confirmed
                 print(f"\n🔎 Closing-week commits confirmed from API: {confirmed}")
             else:
                 print("\n🔎 Commits API unavailable — keeping stored value")
 
-        # Step 1: Save last week's data to history
-        print("\n📚 Step 1: Saving last week to history...")
-        saved = save_to_history(data, current_week)
+        # Steps 1-4 run as one locked read-modify-write (the API call above
+        # stays outside the lock) so a Slack update landing mid-reset is
+        # snapshotted into history instead of being overwritten.
+        with store.transaction() as data:
+            if data['currentWeek'].get('startDate') != stored_start:
+                print("\n✓ Week was reset by another job meanwhile; nothing to do")
+                sys.exit(1)
+            if confirmed is not None:
+                data['currentWeek']['metrics']['commits'] = confirmed
+
+            # Step 1: Save last week's data to history
+            print("\n📚 Step 1: Saving last week to history...")
+            saved = save_to_history(data, current_week)
 
-        if saved:
-            # Step 2: Generate history SVG for last week (will be done by generate_weekly_history.py)
-            print("   (History SVG will be generated in next step)")
+            if saved:
+                # Step 2: Generate history SVG for last week (will be done by generate_weekly_history.py)
+                print("   (History SVG will be generated in next step)")
 
-        # Step 3: Reset current week metrics
-        print("\n🔄 Step 2: Resetting current week metrics...")
-        reset_current_week_metrics(data)
+            # Step 3: Reset current week metrics
+            print("\n🔄 Step 2: Resetting current week metrics...")
+            reset_current_week_metrics(data)
 
-        # Step 4: Update week dates
-        print("\n📅 Step 3: Updating week dates...")
-        data['currentWeek']['startDate'] = current_week['monday']
-        data['currentWeek']['endDate'] = current_week['sunday']
+            # Step 4: Update week dates
+            print("\n📅 Step 3: Updating week dates...")
+            data['currentWeek']['startDate'] = current_week['monday']
+            data['currentWeek']['endDate'] = current_week['sunday']
 
-        # Step 5: Save updated data
-        print("\n💾 Step 4: Saving data.json...")
-        with open(data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+            # Step 5: Save updated data (written when the transaction closes)
+            print("\n💾 Step 4: Saving data.json...")
 
         print(f"\n✅ Weekly reset completed for {current_week['week_id']}")
         print(f"   All metrics reset to 0")
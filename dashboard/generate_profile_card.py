@@ -8,9 +8,32 @@ import requests
 import datetime
 from pathlib import Path
 import os
-from graphql_stats import get_github_activity_stats_graphql
+from graphql_stats import GRAPHQL_URL, get_github_activity_stats_graphql, get_contribution_calendar_graphql
+from _graphql_client import has_budget, remaining_budget, seed_budget
+from _build_manifest import get_manifest, input_digest
+from _contribution_calendar import GRID_DAYS
+from _svg_templates import FONT, SvgTemplate
+from _readme import LAYOUT_VERSION, get_readme
 
 KST = datetime.timezone(datetime.timedelta(hours=9))
+# The card is cosmetic: when the shared GraphQL budget is this low, leave
+# the points to the dashboard scripts and the summary-cards action.
+PROFILE_CARD_MIN_BUDGET = 500
+# Bump when the card markup changes so the build manifest re-renders.
+PROFILE_CARD_TEMPLATE_VERSION = 2
+# Own manifest: profile-summary-cards.yml commits in parallel with the
+# dashboard workflows, and one shared file would conflict on rebase.
+PROFILE_MANIFEST_PATH = Path('profile-summary-card-output/.build_manifest.json')
+
+PROFILE_CARD_URL = ("https://raw.githubusercontent.com/Piesson/Piesson/main/"
+                    "profile-summary-card-output/default/0-profile-details.svg")
+# Body of the README's `profile-card` section (see _readme).
+PROFILE_SECTION = '''<p align="center">
+  <img src="{url}" alt="Profile Details">
+</p>
+
+<div align="right"><sub>updated at {date}</sub></div>
+'''
 
 def get_github_data_from_stats(activity_stats):
     """Create github_data dict from already-fetched activity stats"""
@@ -176,11 +199,41 @@ def generate_quadrant_pie_chart(data):
     chart_svg += '</svg>'
     return chart_svg
 
+# Heatmap: GitHub's five green levels, one 7px cell per day, Sunday on top.
+HEATMAP_COLORS = ('#ebedf0', '#9be9a8', '#40c463', '#30a14e', '#216e39')
+HEATMAP_CELL_STEP = 8
+HEATMAP_CELL = SvgTemplate('<rect x="{x}" y="{y}" width="7" height="7" rx="1.5" fill="{fill}"/>')
+
+def heatmap_level(count, max_count):
+    """0 for no contributions, else 1-4 by quarter of the busiest day."""
+    if count <= 0 or max_count <= 0:
+        return 0
+    return min(4, 1 + 4 * (count - 1) // max_count)
+
+def generate_contribution_heatmap(calendar, today):
+    """53x7 heatmap cells: one fill per cached day, in grid order"""
+    start = datetime.date.fromisoformat(calendar['start'])
+    visible = min(GRID_DAYS, (today - start).days + 1)
+    counts = calendar['counts'][:visible]
+    max_count = max(counts, default=0)
+    cells = []
+    for i, count in enumerate(counts):
+        col, row = divmod(i, 7)
+        cells.append(HEATMAP_CELL.render(x=col * HEATMAP_CELL_STEP, y=row * HEATMAP_CELL_STEP,
+                                         fill=HEATMAP_COLORS[heatmap_level(count, max_count)]))
+    return ''.join(cells), sum(counts)
+
 def generate_profile_card():
     """Generate the custom profile summary card"""
     username = os.getenv('USERNAME', 'Piesson')
     token = os.getenv('GITHUB_TOKEN', '')
 
+    seed_budget(GRAPHQL_URL, {'Authorization': f'Bearer {token}'} if token else {})
+    if not has_budget(PROFILE_CARD_MIN_BUDGET):
+        print(f"[profile-card] GraphQL budget low ({remaining_budget()} left) — "
+              f"deferring, keeping previous card")
+        return
+
     # Get activity stats ONCE (used by both pie chart and total commits)
     activity_stats = get_github_activity_stats(username, token)
     if activity_stats is None:
@@ -194,8 +247,24 @@ def generate_profile_card():
     # Get GitHub data using the same commit count
     github_data = get_github_data_from_stats(activity_stats)
 
+    # Heatmap from the cached calendar; only not-yet-final days are fetched
+    today = datetime.datetime.now(KST).date()
+    calendar = get_contribution_calendar_graphql(username, token)
+    if calendar is None:
+        print("[profile-card] contribution calendar unavailable — keeping previous card")
+        return
+    heatmap, year_total = generate_contribution_heatmap(calendar, today)
+
+    output_path = Path('profile-summary-card-output/default/0-profile-details.svg')
+    manifest = get_manifest(PROFILE_MANIFEST_PATH)
+    digest = input_digest(PROFILE_CARD_TEMPLATE_VERSION, quadrant_data, github_data, heatmap)
+    if manifest.is_fresh('0-profile-details.svg', digest, output_path):
+        print(f"Profile card unchanged, skipped: {output_path}")
+        update_readme_profile_timestamp()
+        return
+
     card_width = 500
-    card_height = 220
+    card_height = 310
 
     svg_content = f'''<svg width="{card_width}" height="{card_height}" xmlns="http://www.w3.org/2000/svg">
     <defs>
@@ -288,12 +357,19 @@ def generate_profile_card():
             </text>
         </g>
     </g>
+
+    <!-- Bottom: Contribution Heatmap (53 weeks x 7 days) -->
+    <line x1="20" y1="210" x2="480" y2="210" stroke="#e5e7eb" stroke-width="1"/>
+    <text x="38" y="230" fill="#111827" font-size="11" font-weight="600" font-family="{FONT}">
+        {year_total:,} contributions in the last year
+    </text>
+    <g transform="translate(38, 240)">
+        {heatmap}
+    </g>
 </svg>'''
 
     # Save SVG
-    output_path = Path('profile-summary-card-output/default/0-profile-details.svg')
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(svg_content)
+    manifest.write('0-profile-details.svg', digest, output_path, svg_content)
     print(f"Profile card generated: {output_path}")
 
     # Update README with timestamp
@@ -301,26 +377,21 @@ def generate_profile_card():
 
 def update_readme_profile_timestamp():
     """Update README.md profile section with timestamp"""
-    import re
-    readme_path = Path('README.md')
+    readme = get_readme()
 
-    if not readme_path.exists():
+    if not readme.exists():
         return
 
-    with open(readme_path, 'r') as f:
-        content = f.read()
-
     current_date = datetime.datetime.now(KST).strftime('%m/%d/%y')
-    timestamp_line = f'<div align="right"><sub>updated at {current_date}</sub></div>'
-
-    # Pattern: profile image <p>, then optional timestamp, then next # section
-    pattern = r'(<p align="center">\n  <img src="[^"]+0-profile-details\.svg" alt="Profile Details">\n</p>)\n*(?:<div align="right"><sub>updated at \d{2}/\d{2}/\d{2}</sub></div>\n*)?'
-    replacement = f'\\1\n\n{timestamp_line}\n\n'
-
-    content = re.sub(pattern, replacement, content)
+    manifest = get_manifest(PROFILE_MANIFEST_PATH)
+    digest = input_digest(LAYOUT_VERSION, current_date)
+    if manifest.is_fresh('README.md#profile-timestamp', digest, readme.path,
+                         readme.part('profile-card')):
+        return
 
-    with open(readme_path, 'w') as f:
-        f.write(content)
+    # Only refreshed in place: a README without the section is left alone.
+    readme.set_section('profile-card', PROFILE_SECTION.format(url=PROFILE_CARD_URL, date=current_date))
+    readme.save(manifest, 'README.md#profile-timestamp', digest, ('profile-card',))
 
     print(f"✅ Updated profile card timestamp: {current_date}")
 
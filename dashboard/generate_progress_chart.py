@@ -2,232 +2,284 @@
 """
 Generate progress charts for Piesson GitHub profile README.
 
-Part A: QuickChart.io dual Y-axis URL (combined chart)
+Part A: Local SVG line charts (combined dual-axis chart, token usage)
 Part B: Self-generated SVG sparklines (individual metric detail)
+Part C: Weekly token series feeding the token usage chart
 """
 
-import json
 import math
 from datetime import datetime
 from pathlib import Path
-from urllib.parse import quote
+
+from _data_store import get_store
+from _build_manifest import get_manifest, input_digest
+from _series import cumulative_view, history_series, lttb
+from _svg_templates import FONT, SvgTemplate, defs
+
+# Bump when the sparkline markup changes so the build manifest re-renders.
+SPARKLINES_TEMPLATE_VERSION = 1
 
 
 def load_weekly_data():
-    """Load and process weekly history data into cumulative series."""
-    data_file = Path('dashboard/data.json')
+    """Load every week ever recorded (hot window + archive) into cumulative series."""
+    store = get_store()
 
-    if not data_file.exists():
+    if not store.exists():
         print("data.json not found")
         return None
 
-    with open(data_file, 'r') as f:
-        data = json.load(f)
+    series = history_series(store.data)
 
-    history = data.get('weeklyHistory', [])
-
-    if not history:
+    if not series['weeks']:
         print("No weekly history found")
         return None
 
-    history_sorted = sorted(history, key=lambda x: x['week'])
-
-    weeks = []
-    commits = []
-    user_talks = []
-    social_posts = []
-    coffee_chats = []
-    workouts = []
-    blog_posts = []
-
-    cumulative_commits = 0
-    cumulative_talks = 0
-    cumulative_social = 0
-    cumulative_chats = 0
-    cumulative_workouts = 0
-    cumulative_posts = 0
-
-    for entry in history_sorted:
-        week_id = entry['week']
-        week_num = week_id.split('-W')[1]
-        weeks.append(f"W{week_num}")
-
-        metrics = entry['metrics']
-
-        social = metrics.get('socialContent', {})
-        if isinstance(social, dict):
-            total_social = social.get('instagram', 0) + social.get('tiktok', 0) + social.get('hellotalk', 0)
-        else:
-            total_social = social
-
-        workouts_data = metrics.get('workouts', {})
-        if isinstance(workouts_data, dict):
-            total_workouts = workouts_data.get('running', 0) + workouts_data.get('gym', 0)
-        else:
-            total_workouts = workouts_data
-
-        cumulative_commits += metrics.get('commits', 0)
-        cumulative_talks += metrics.get('userSessions', 0)
-        cumulative_social += total_social
-        cumulative_chats += metrics.get('ctoMeetings', 0)
-        cumulative_workouts += total_workouts
-        cumulative_posts += metrics.get('blogPosts', 0)
-
-        commits.append(cumulative_commits)
-        user_talks.append(cumulative_talks)
-        social_posts.append(cumulative_social)
-        coffee_chats.append(cumulative_chats)
-        workouts.append(cumulative_workouts)
-        blog_posts.append(cumulative_posts)
-
-    return {
-        'weeks': weeks,
-        'commits': commits,
-        'user_talks': user_talks,
-        'social_posts': social_posts,
-        'coffee_chats': coffee_chats,
-        'workouts': workouts,
-        'blog_posts': blog_posts
-    }
+    return cumulative_view(series)
 
 
 # ---------------------------------------------------------------------------
-# Part A: QuickChart.io dual Y-axis combined chart
+# Part A: Local SVG line charts (combined progress chart + token usage)
 # ---------------------------------------------------------------------------
+#
+# Rendered here and committed as static files, so the README embeds a
+# short raw.githubusercontent URL instead of a multi-KB Chart.js config
+# for a third-party renderer. Covers what the two charts use: several
+# datasets, an optional right-hand axis, null gaps (no line drawn across a
+# missing week) and point labels that drop out where they would overlap,
+# like chartjs-plugin-datalabels' display: 'auto'.
+
+# Bump when the chart markup changes so the build manifest re-renders.
+LINE_CHART_TEMPLATE_VERSION = 1
+
+PROGRESS_CHART_PATH = Path('dashboard/progress_chart.svg')
+TOKENS_CHART_PATH = Path('dashboard/tokens_chart.svg')
+
+# Combined chart datasets: (label, data_key, color, axis)
+PROGRESS_DATASETS = [
+    ('Code Commits', 'commits', '#FF6384', 'y1'),
+    ('User Talks', 'user_talks', '#36A2EB', 'y2'),
+    ('Social Posts', 'social_posts', '#E6B800', 'y2'),
+    ('Coffee Chats', 'coffee_chats', '#4BC0C0', 'y2'),
+    ('Workouts', 'workouts', '#9966FF', 'y2'),
+    ('Blog Posts', 'blog_posts', '#FF9F40', 'y2'),
+]
+
+# Token chart datasets: (label, series_key, color)
+TOKENS_DATASETS = [
+    ('Claude Code', 'claude', '#F59E0B'),
+    ('Codex', 'codex', '#10B981'),
+]
+
+# Line chart layout
+LC_TOP = 50            # below the title
+LC_BOTTOM = 40         # x-axis labels
+LC_AXIS_W = 60         # tick labels + rotated axis title, per y-axis
+LC_LEGEND_W = 140
+LC_LEGEND_ROW = 24
+LC_Y_TICKS = 5
+LC_X_LABEL_W = 36      # min spacing before x labels are thinned out
+LC_CHAR_W = 5.5        # ≈ advance of a 9px system-ui digit
+LC_LABEL_BUCKET = 50   # px; wider than any point label
+LC_POINT_SPACING = 8   # px per point needed to draw point markers
+
+LC_PAGE = SvgTemplate(f'''<svg width="{{width}}" height="{{height}}" xmlns="http://www.w3.org/2000/svg">
+  <rect width="{{width}}" height="{{height}}" fill="#ffffff"/>
+  <text x="{{center}}" y="28" fill="#333333" font-size="16" font-weight="700"
+        font-family="{FONT}" text-anchor="middle">{{title}}</text>
+{{body}}</svg>
+''')
+
+LC_GRID_LINE = SvgTemplate(
+    '  <line x1="{x1}" y1="{y}" x2="{x2}" y2="{y}" stroke="#e5e7eb" stroke-width="1" />\n')
+
+LC_TICK = SvgTemplate(
+    f'  <text x="{{x}}" y="{{y}}" fill="#666666" font-size="10" font-family="{FONT}"'
+    f' text-anchor="{{anchor}}">{{text}}</text>\n')
+
+LC_AXIS_TITLE = SvgTemplate(
+    f'  <text x="{{x}}" y="{{y}}" fill="#666666" font-size="11" font-weight="700" font-family="{FONT}"'
+    f' text-anchor="middle" transform="rotate({{angle}} {{x}} {{y}})">{{text}}</text>\n')
+
+LC_SEGMENT = SvgTemplate(
+    '  <polyline points="{points}" fill="none" stroke="{color}" stroke-width="2.5"'
+    ' stroke-linecap="round" stroke-linejoin="round" />\n')
+
+LC_POINT = SvgTemplate(
+    '  <circle cx="{x}" cy="{y}" r="3" fill="#ffffff" stroke="{color}" stroke-width="1.5" />\n')
+
+LC_DATA_LABEL = SvgTemplate(
+    f'  <text x="{{x}}" y="{{y}}" fill="{{color}}" font-size="9" font-family="{FONT}"'
+    f' text-anchor="middle">{{text}}</text>\n')
+
+LC_LEGEND_ITEM = SvgTemplate(
+    '  <line x1="{x}" y1="{y}" x2="{x_end}" y2="{y}" stroke="{color}" stroke-width="3"'
+    ' stroke-linecap="round" />\n'
+    f'  <text x="{{text_x}}" y="{{text_y}}" fill="#333333" font-size="11" font-family="{FONT}">{{label}}</text>\n')
+
+
+def _nice_step(max_value, ticks=LC_Y_TICKS):
+    """Smallest 1/2/2.5/5 x 10^k step that reaches `max_value` in `ticks` steps."""
+    if max_value <= 0:
+        return 1
+    raw = max_value / ticks
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for multiple in (1, 2, 2.5, 5, 10):
+        step = multiple * magnitude
+        if step * ticks >= max_value * (1 - 1e-9):
+            return step
+    return 10 * magnitude
+
 
-def generate_chart_url(data):
-    """Generate QuickChart.io URL with dual Y-axis.
+def _fmt_tick(value):
+    value = round(value, 6)
+    return str(int(value)) if float(value).is_integer() else f"{value:g}"
 
-    Left axis (y1): Code Commits (large scale)
-    Right axis (y2): Other 5 metrics (smaller scale)
+
+def _y_axis(values):
+    """(axis max, tick values) for a zero-based axis covering `values`."""
+    top = max((v for v in values if v is not None), default=0)
+    step = _nice_step(top)
+    count = max(1, math.ceil(top / step - 1e-9))
+    return step * count, [step * i for i in range(count + 1)]
+
+
+def _boxes_overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _reduce_dataset(data, max_points):
+    """LTTB-thin a dataset's non-null points to `max_points`.
+
+    Returns ([(index, value)] kept, {k: kept[k] starts a new line segment}).
+    A segment starts at the first point and after every dropped-out gap.
     """
-    if not data:
+    present = [i for i, v in enumerate(data) if v is not None]
+    keep = lttb(present, [data[i] for i in present], int(max_points))
+    kept = [(present[j], data[present[j]]) for j in keep]
+    breaks = {k for k in range(len(kept))
+              if k == 0 or kept[k][0] - kept[k - 1][0] > 1
+              and any(v is None for v in data[kept[k - 1][0] + 1:kept[k][0]])}
+    return kept, breaks
+
+
+def render_line_chart(labels, datasets, *, title, width=900, height=450,
+                      axis_titles=None, value_format=_fmt_tick):
+    """Render a line chart as a standalone SVG string.
+
+    datasets: dicts with 'label', 'data' (numbers or None for a gap),
+    'color' and 'axis' ('y1' left, 'y2' right). axis_titles maps axis id
+    to its rotated title. value_format turns a point value into its label.
+    Datasets longer than the plot is wide are LTTB-thinned to one vertex
+    per pixel; axes and labels follow the thinned series.
+    """
+    axis_titles = axis_titles or {}
+    axes = [axis for axis in ('y1', 'y2') if any(d['axis'] == axis for d in datasets)]
+    left = LC_AXIS_W
+    right = width - LC_LEGEND_W - (LC_AXIS_W if 'y2' in axes else 20)
+    top, bottom = LC_TOP, height - LC_BOTTOM
+    plot_w, plot_h = right - left, bottom - top
+    n = len(labels)
+
+    def x_at(i):
+        return round(left + (i / (n - 1) * plot_w if n > 1 else plot_w / 2), 1)
+
+    # Thin each dataset to one vertex per pixel; gaps are kept as cut points.
+    reduced = [_reduce_dataset(d['data'][:n], plot_w) for d in datasets]
+
+    scales = {}
+    body = []
+    for axis in axes:
+        values = [v for d, (kept, _) in zip(datasets, reduced) if d['axis'] == axis
+                  for _, v in kept]
+        axis_max, ticks = _y_axis(values)
+        scales[axis] = axis_max
+        is_left = axis == 'y1'
+        for tick in ticks:
+            y = round(bottom - tick / axis_max * plot_h, 1)
+            if is_left:  # y2 keeps its grid off the chart area
+                body.append(LC_GRID_LINE.render(x1=left, x2=right, y=y))
+            body.append(LC_TICK.render(x=left - 8 if is_left else right + 8, y=round(y + 3.5, 1),
+                                       anchor='end' if is_left else 'start', text=_fmt_tick(tick)))
+        if axis_titles.get(axis):
+            body.append(LC_AXIS_TITLE.render(
+                x=16 if is_left else right + LC_AXIS_W - 12, y=round(top + plot_h / 2, 1),
+                angle=-90 if is_left else 90, text=axis_titles[axis]))
+
+    stride = max(1, math.ceil(n * LC_X_LABEL_W / max(plot_w, 1)))
+    body.extend(LC_TICK.render(x=x_at(i), y=bottom + 18, anchor='middle', text=label)
+                for i, label in enumerate(labels) if i % stride == 0)
+
+    placed = {}  # label boxes bucketed by x, for the overlap check
+    for dataset, (kept, breaks) in zip(datasets, reduced):
+        axis_max, color = scales[dataset['axis']], dataset['color']
+        points = [(x_at(i), round(bottom - v / axis_max * plot_h, 1)) for i, v in kept]
+
+        segment = []
+        for k, point in enumerate(points):
+            if k in breaks and len(segment) > 1:
+                body.append(LC_SEGMENT.render(
+                    color=color, points=' '.join(f'{x},{y}' for x, y in segment)))
+            if k in breaks:
+                segment = []
+            segment.append(point)
+        if len(segment) > 1:
+            body.append(LC_SEGMENT.render(
+                color=color, points=' '.join(f'{x},{y}' for x, y in segment)))
+        if len(points) * LC_POINT_SPACING <= plot_w:  # markers would merge into a smear
+            body.extend(LC_POINT.render(x=x, y=y, color=color) for x, y in points)
+
+        for (x, y), (_, value) in zip(points, kept):
+            text = value_format(value)
+            half = len(text) * LC_CHAR_W / 2
+            box = (x - half, y - 16, x + half, y - 6)
+            bucket = int(x // LC_LABEL_BUCKET)
+            nearby = [b for k in (bucket - 1, bucket, bucket + 1) for b in placed.get(k, ())]
+            if any(_boxes_overlap(box, other) for other in nearby):
+                continue
+            placed.setdefault(bucket, []).append(box)
+            body.append(LC_DATA_LABEL.render(x=x, y=round(y - 7, 1), color=color, text=text))
+
+    legend_x = width - LC_LEGEND_W + 10
+    legend_y = top + plot_h / 2 - len(datasets) * LC_LEGEND_ROW / 2 + LC_LEGEND_ROW / 2
+    for i, dataset in enumerate(datasets):
+        y = round(legend_y + i * LC_LEGEND_ROW, 1)
+        body.append(LC_LEGEND_ITEM.render(x=legend_x, x_end=legend_x + 20, y=y,
+                                          color=dataset['color'], text_x=legend_x + 28,
+                                          text_y=round(y + 4, 1), label=dataset['label']))
+
+    return LC_PAGE.render(width=width, height=height, center=width // 2,
+                          title=title, body=''.join(body))
+
+
+def generate_progress_chart_svg(data):
+    """Combined cumulative chart: commits on the left axis, the rest on the right."""
+    if not data or not data.get('weeks'):
+        return None
+    datasets = [{'label': label, 'data': data[key], 'color': color, 'axis': axis}
+                for label, key, color, axis in PROGRESS_DATASETS]
+    return render_line_chart(data['weeks'], datasets, title='Progress Tracker',
+                             axis_titles={'y1': 'Commits', 'y2': 'Other Metrics'},
+                             value_format=lambda v: str(round(v)))
+
+
+def _save_chart(artifact, output_path, inputs, render):
+    manifest = get_manifest()
+    digest = input_digest(LINE_CHART_TEMPLATE_VERSION, inputs)
+    if manifest.is_fresh(artifact, digest, output_path):
+        return str(output_path)
+    svg_content = render()
+    if svg_content is None:
         return None
+    manifest.write(artifact, digest, output_path, svg_content)
+    return str(output_path)
 
-    config = {
-        "type": "line",
-        "data": {
-            "labels": data['weeks'],
-            "datasets": [
-                {
-                    "label": "Code Commits",
-                    "data": data['commits'],
-                    "borderColor": "#FF6384",
-                    "backgroundColor": "rgba(255,99,132,0.08)",
-                    "fill": False,
-                    "yAxisID": "y1",
-                    "borderWidth": 2.5,
-                    "pointRadius": 3,
-                    "tension": 0.3
-                },
-                {
-                    "label": "User Talks",
-                    "data": data['user_talks'],
-                    "borderColor": "#36A2EB",
-                    "backgroundColor": "rgba(54,162,235,0.08)",
-                    "fill": False,
-                    "yAxisID": "y2",
-                    "borderWidth": 2.5,
-                    "pointRadius": 3,
-                    "tension": 0.3
-                },
-                {
-                    "label": "Social Posts",
-                    "data": data['social_posts'],
-                    "borderColor": "#E6B800",
-                    "backgroundColor": "rgba(230,184,0,0.08)",
-                    "fill": False,
-                    "yAxisID": "y2",
-                    "borderWidth": 2.5,
-                    "pointRadius": 3,
-                    "tension": 0.3
-                },
-                {
-                    "label": "Coffee Chats",
-                    "data": data['coffee_chats'],
-                    "borderColor": "#4BC0C0",
-                    "backgroundColor": "rgba(75,192,192,0.08)",
-                    "fill": False,
-                    "yAxisID": "y2",
-                    "borderWidth": 2.5,
-                    "pointRadius": 3,
-                    "tension": 0.3
-                },
-                {
-                    "label": "Workouts",
-                    "data": data['workouts'],
-                    "borderColor": "#9966FF",
-                    "backgroundColor": "rgba(153,102,255,0.08)",
-                    "fill": False,
-                    "yAxisID": "y2",
-                    "borderWidth": 2.5,
-                    "pointRadius": 3,
-                    "tension": 0.3
-                },
-                {
-                    "label": "Blog Posts",
-                    "data": data['blog_posts'],
-                    "borderColor": "#FF9F40",
-                    "backgroundColor": "rgba(255,159,64,0.08)",
-                    "fill": False,
-                    "yAxisID": "y2",
-                    "borderWidth": 2.5,
-                    "pointRadius": 3,
-                    "tension": 0.3
-                }
-            ]
-        },
-        "options": {
-            "responsive": False,
-            "title": {
-                "display": True,
-                "text": "Progress Tracker",
-                "fontSize": 16
-            },
-            "legend": {
-                "position": "right",
-                "labels": {"fontSize": 11, "padding": 12}
-            },
-            "scales": {
-                "yAxes": [
-                    {
-                        "id": "y1",
-                        "position": "left",
-                        "scaleLabel": {
-                            "display": True,
-                            "labelString": "Commits",
-                            "fontStyle": "bold"
-                        },
-                        "ticks": {"beginAtZero": True}
-                    },
-                    {
-                        "id": "y2",
-                        "position": "right",
-                        "scaleLabel": {
-                            "display": True,
-                            "labelString": "Other Metrics",
-                            "fontStyle": "bold"
-                        },
-                        "gridLines": {"drawOnChartArea": False},
-                        "ticks": {"beginAtZero": True}
-                    }
-                ]
-            },
-            "plugins": {
-                "datalabels": {
-                    "display": "auto",
-                    "anchor": "end",
-                    "align": "top",
-                    "font": {"size": 9},
-                    "formatter": "Math.round"
-                }
-            }
-        }
-    }
 
-    config_json = json.dumps(config, separators=(',', ':'))
-    url = f"https://quickchart.io/chart?c={quote(config_json)}&w=900&h=450&bkg=white"
-    return url
+def save_progress_chart_svg(data):
+    """Write dashboard/progress_chart.svg (skipped if inputs unchanged)."""
+    if not data:
+        return None
+    return _save_chart('progress_chart.svg', PROGRESS_CHART_PATH, data,
+                       lambda: generate_progress_chart_svg(data))
 
 
 # ---------------------------------------------------------------------------
@@ -266,31 +318,93 @@ CARD_POSITIONS = [
     (PADDING + 2 * (CARD_W + GAP), 20 + CARD_H + GAP),
 ]
 
+# Sparkline grid markup; engine and shared <defs> live in _svg_templates.
+SPARK_PAGE = SvgTemplate('''<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">
+{defs}
+
+  <rect width="{width}" height="{height}" fill="url(#bg)" rx="16"
+        stroke="#e2e8f0" stroke-width="1"/>
+
+{cards}</svg>''')
+
+SPARK_CARD_SLOT = SvgTemplate('  <g transform="translate({x},{y})">{content}</g>\n')
+
+SPARK_GRID_LINE = SvgTemplate('''
+    <line x1="{x1}" y1="{y}" x2="{x2}" y2="{y}"
+          stroke="#e2e8f0" stroke-width="0.5" stroke-dasharray="4,3" />''')
+
+SPARK_Y_TICK = SvgTemplate('''
+    <text x="{x}" y="{y}" fill="#9ca3af" font-size="8"
+          font-family="Monaco, monospace" text-anchor="end">{value}</text>''')
+
+SPARK_CARD = SvgTemplate(f'''
+    <rect width="{{card_w}}" height="{{card_h}}" fill="url(#cardBg)" rx="12"
+          filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
+
+    <!-- Title -->
+    <text x="12" y="22" fill="#1f2937" font-size="11" font-weight="700"
+          font-family="{FONT}">
+        {{emoji}} {{name}}
+    </text>
+
+    <!-- Final value badge -->
+    <text x="{{badge_x}}" y="22" fill="{{color}}" font-size="12" font-weight="700"
+          font-family="{FONT}" text-anchor="end">
+        {{final_val:,}}
+    </text>
+
+    <!-- Grid lines -->{{grid}}
+
+    <!-- Y-axis ticks -->{{ticks}}
+
+    <!-- Area fill -->
+    <polygon points="{{polygon_pts}}" fill="{{color}}" opacity="0.08" />
+
+    <!-- Sparkline -->
+    <polyline points="{{polyline_pts}}" fill="none" stroke="{{color}}"
+             stroke-width="2" stroke-linecap="round" stroke-linejoin="round" />
+
+    <!-- Last point dot -->
+    {{last_dot}}
+
+    <!-- X-axis labels -->
+    <text x="{{left}}" y="{{label_y}}" fill="#9ca3af" font-size="8"
+          font-family="{FONT}">{{first_week}}</text>
+    <text x="{{right}}" y="{{label_y}}" fill="#9ca3af" font-size="8"
+          font-family="{FONT}" text-anchor="end">{{last_week}}</text>
+    ''')
+
 
 def _scale_points(values, chart_width, chart_height):
     """Scale data values to SVG coordinates within chart area.
 
-    Returns (points_list, max_value_used_for_scaling).
+    Series longer than the chart is wide are thinned with LTTB to one
+    vertex per pixel; kept points stay at their own week's x position.
+
+    Returns (points_list, max_value_used_for_scaling, kept_values).
     """
     n = len(values)
     if n == 0:
-        return [], 1
+        return [], 1, []
+
+    keep = lttb(range(n), values, int(chart_width))
+    kept = [values[i] for i in keep]
 
-    raw_max = max(values)
+    raw_max = max(kept)
     max_val = raw_max * 1.1 if raw_max > 0 else 1
 
     points = []
-    for i, val in enumerate(values):
+    for i, val in zip(keep, kept):
         x = (i / max(n - 1, 1)) * chart_width
         y = chart_height - (val / max_val) * chart_height
         points.append((round(x, 1), round(y, 1)))
-    return points, max_val
+    return points, max_val, kept
 
 
 def _render_sparkline_card(name, emoji, values, weeks, color, card_w, card_h):
     """Render one mini sparkline card as SVG group content."""
     final_val = values[-1] if values else 0
-    points, max_val = _scale_points(values, CHART_W, CHART_H)
+    points, max_val, kept = _scale_points(values, CHART_W, CHART_H)
 
     # Polyline points string
     polyline_pts = ' '.join(f'{CHART_X + x},{CHART_Y + y}' for x, y in points)
@@ -301,8 +415,8 @@ def _render_sparkline_card(name, emoji, values, weeks, color, card_w, card_h):
         polygon_pts += f' {CHART_X + points[-1][0]},{CHART_Y + CHART_H}'
         polygon_pts += f' {CHART_X + points[0][0]},{CHART_Y + CHART_H}'
 
-    # Y-axis tick values: 0, mid, max
-    raw_max = max(values) if values and max(values) > 0 else 0
+    # Y-axis tick values: 0, mid, max (of the drawn series)
+    raw_max = max(kept) if kept and max(kept) > 0 else 0
     if raw_max > 0:
         mid_val = raw_max // 2
         y_ticks = [
@@ -326,57 +440,18 @@ def _render_sparkline_card(name, emoji, values, weeks, color, card_w, card_h):
     first_week = weeks[0] if weeks else ''
     last_week = weeks[-1] if len(weeks) > 1 else ''
 
-    svg = f'''
-    <rect width="{card_w}" height="{card_h}" fill="url(#cardBg)" rx="12"
-          filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-
-    <!-- Title -->
-    <text x="12" y="22" fill="#1f2937" font-size="11" font-weight="700"
-          font-family="system-ui, -apple-system, sans-serif">
-        {emoji} {name}
-    </text>
-
-    <!-- Final value badge -->
-    <text x="{card_w - 12}" y="22" fill="{color}" font-size="12" font-weight="700"
-          font-family="system-ui, -apple-system, sans-serif" text-anchor="end">
-        {final_val:,}
-    </text>
-
-    <!-- Grid lines -->'''
-
-    for gy in grid_ys:
-        svg += f'''
-    <line x1="{CHART_X}" y1="{round(gy, 1)}" x2="{CHART_X + CHART_W}" y2="{round(gy, 1)}"
-          stroke="#e2e8f0" stroke-width="0.5" stroke-dasharray="4,3" />'''
-
-    svg += f'''
+    grid_svg = ''.join(SPARK_GRID_LINE.render(x1=CHART_X, x2=CHART_X + CHART_W, y=round(gy, 1))
+                       for gy in grid_ys)
+    ticks_svg = ''.join(SPARK_Y_TICK.render(x=CHART_X - 4, y=round(y_pos + 3, 1), value=val)
+                        for val, y_pos in y_ticks)
 
-    <!-- Y-axis ticks -->'''
-    for val, y_pos in y_ticks:
-        svg += f'''
-    <text x="{CHART_X - 4}" y="{round(y_pos + 3, 1)}" fill="#9ca3af" font-size="8"
-          font-family="Monaco, monospace" text-anchor="end">{val}</text>'''
-
-    svg += f'''
-
-    <!-- Area fill -->
-    <polygon points="{polygon_pts}" fill="{color}" opacity="0.08" />
-
-    <!-- Sparkline -->
-    <polyline points="{polyline_pts}" fill="none" stroke="{color}"
-             stroke-width="2" stroke-linecap="round" stroke-linejoin="round" />
-
-    <!-- Last point dot -->
-    {last_dot}
-
-    <!-- X-axis labels -->
-    <text x="{CHART_X}" y="{CHART_Y + CHART_H + 14}" fill="#9ca3af" font-size="8"
-          font-family="system-ui, -apple-system, sans-serif">{first_week}</text>
-    <text x="{CHART_X + CHART_W}" y="{CHART_Y + CHART_H + 14}" fill="#9ca3af" font-size="8"
-          font-family="system-ui, -apple-system, sans-serif" text-anchor="end">{last_week}</text>
-    '''
-
-    return svg
+    return SPARK_CARD.render(
+        card_w=card_w, card_h=card_h, badge_x=card_w - 12, emoji=emoji, name=name,
+        color=color, final_val=final_val, grid=grid_svg, ticks=ticks_svg,
+        polygon_pts=polygon_pts, polyline_pts=polyline_pts, last_dot=last_dot,
+        left=CHART_X, right=CHART_X + CHART_W, label_y=CHART_Y + CHART_H + 14,
+        first_week=first_week, last_week=last_week,
+    )
 
 
 def generate_sparklines_svg(data):
@@ -384,44 +459,26 @@ def generate_sparklines_svg(data):
     if not data:
         return None
 
-    cards_svg = ''
-    for i, (name, emoji, data_key, color) in enumerate(METRICS):
-        x, y = CARD_POSITIONS[i]
-        card_content = _render_sparkline_card(
-            name, emoji, data[data_key], data['weeks'], color, CARD_W, CARD_H
-        )
-        cards_svg += f'  <g transform="translate({x},{y})">{card_content}</g>\n'
-
-    svg = f'''<svg width="{SVG_WIDTH}" height="{SVG_HEIGHT}" xmlns="http://www.w3.org/2000/svg">
-  <defs>
-    <linearGradient id="bg" x1="0%" y1="0%" x2="100%" y2="100%">
-      <stop offset="0%" style="stop-color:#ffffff;stop-opacity:1" />
-      <stop offset="100%" style="stop-color:#f8fafc;stop-opacity:1" />
-    </linearGradient>
-    <linearGradient id="cardBg" x1="0%" y1="0%" x2="100%" y2="100%">
-      <stop offset="0%" style="stop-color:#ffffff;stop-opacity:1" />
-      <stop offset="100%" style="stop-color:#f1f5f9;stop-opacity:1" />
-    </linearGradient>
-    <filter id="shadow">
-      <feDropShadow dx="0" dy="2" stdDeviation="8" flood-color="#000000" flood-opacity="0.1"/>
-    </filter>
-  </defs>
-
-  <rect width="{SVG_WIDTH}" height="{SVG_HEIGHT}" fill="url(#bg)" rx="16"
-        stroke="#e2e8f0" stroke-width="1"/>
-
-{cards_svg}</svg>'''
+    cards_svg = ''.join(
+        SPARK_CARD_SLOT.render(x=x, y=y, content=_render_sparkline_card(
+            name, emoji, data[data_key], data['weeks'], color, CARD_W, CARD_H))
+        for (name, emoji, data_key, color), (x, y) in zip(METRICS, CARD_POSITIONS)
+    )
 
-    return svg
+    return SPARK_PAGE.render(width=SVG_WIDTH, height=SVG_HEIGHT, defs=defs('  '), cards=cards_svg)
 
 
 def save_sparklines_svg(data):
-    """Generate and save the sparklines SVG to disk."""
+    """Generate and save the sparklines SVG to disk (skipped if inputs unchanged)."""
+    output_path = Path('dashboard/progress_sparklines.svg')
+    manifest = get_manifest()
+    digest = input_digest(SPARKLINES_TEMPLATE_VERSION, data)
+    if manifest.is_fresh('progress_sparklines.svg', digest, output_path):
+        return str(output_path)
     svg_content = generate_sparklines_svg(data)
     if svg_content is None:
         return None
-    output_path = Path('dashboard/progress_sparklines.svg')
-    output_path.write_text(svg_content)
+    manifest.write('progress_sparklines.svg', digest, output_path, svg_content)
     return str(output_path)
 
 
@@ -452,34 +509,24 @@ def _round_b(value):
 def load_tokens_series(raw_data):
     """Build a non-cumulative weekly tokens series (claude / codex / total).
 
-    Uses the 11 most recent history entries plus a synthetic point for the
-    current in-progress week so the combined chart shows 12 points like the
-    rest of the dashboard. Past weeks without a tokens field render as null
-    so chart.js draws a gap (consistent with forward-only policy).
+    Covers every archived and hot history week from the first one with a
+    tokens record on, plus a synthetic point for the current in-progress
+    week. Later weeks without a tokens field render as null so the chart
+    draws a gap (consistent with forward-only policy); long series are
+    thinned by render_line_chart.
     """
     if not isinstance(raw_data, dict):
         return None
 
-    history = raw_data.get('weeklyHistory', []) or []
-    history_sorted = sorted(history, key=lambda x: x.get('week', ''))
-    completed = history_sorted[-11:]
-
-    weeks, claude, codex, total = [], [], [], []
-
-    for entry in completed:
-        week_id = entry.get('week', '')
-        if '-W' not in week_id:
-            continue
-        weeks.append(f"W{week_id.split('-W')[1]}")
-        tokens = _extract_week_tokens(entry)
-        if tokens is None:
-            claude.append(None)
-            codex.append(None)
-            total.append(None)
-        else:
-            claude.append(_round_b(tokens.get('claude')))
-            codex.append(_round_b(tokens.get('codex')))
-            total.append(_round_b(tokens.get('total')))
+    series = history_series(raw_data)
+    tracked = [i for i, week in enumerate(zip(*series['tokens'].values()))
+               if any(v is not None for v in week)]
+    first = tracked[0] if tracked else len(series['labels'])
+    weeks = list(series['labels'][first:])
+    claude, codex, total = (
+        [_round_b(v) for v in series['tokens'][key][first:]]
+        for key in ('claude', 'codex', 'total')
+    )
 
     current = raw_data.get('currentWeek')
     if isinstance(current, dict):
@@ -505,9 +552,9 @@ def load_tokens_series(raw_data):
     }
 
 
-def generate_tokens_chart_url(raw_data):
-    """Return a QuickChart URL for the weekly Token Usage chart, or None if
-    no week has a tokens record (forward-only pre-tracking state).
+def generate_tokens_chart_svg(raw_data):
+    """Return the weekly Token Usage chart SVG, or None if no week has a
+    tokens record (forward-only pre-tracking state).
 
     Chart intentionally carries no unit text (no 'B', no 'CC'/'CX' labels) —
     the section heading supplies the context."""
@@ -519,72 +566,20 @@ def generate_tokens_chart_url(raw_data):
        all((v is None or v == 0) for v in series['codex']):
         return None
 
-    config = {
-        "type": "line",
-        "data": {
-            "labels": series['weeks'],
-            "datasets": [
-                {
-                    "label": "Claude Code",
-                    "data": series['claude'],
-                    "borderColor": "#F59E0B",
-                    "backgroundColor": "rgba(245,158,11,0.08)",
-                    "fill": False,
-                    "borderWidth": 2.5,
-                    "pointRadius": 3,
-                    "tension": 0.25,
-                    "spanGaps": False,
-                },
-                {
-                    "label": "Codex",
-                    "data": series['codex'],
-                    "borderColor": "#10B981",
-                    "backgroundColor": "rgba(16,185,129,0.08)",
-                    "fill": False,
-                    "borderWidth": 2.5,
-                    "pointRadius": 3,
-                    "tension": 0.25,
-                    "spanGaps": False,
-                },
-            ],
-        },
-        "options": {
-            "responsive": False,
-            "title": {
-                "display": True,
-                "text": "Token Usage",
-                "fontSize": 16,
-            },
-            "legend": {
-                "position": "right",
-                "labels": {"fontSize": 11, "padding": 12},
-            },
-            "scales": {
-                "yAxes": [
-                    {
-                        "scaleLabel": {
-                            "display": True,
-                            "labelString": "Tokens (B)",
-                            "fontStyle": "bold",
-                        },
-                        "ticks": {"beginAtZero": True},
-                    }
-                ]
-            },
-            "plugins": {
-                "datalabels": {
-                    "display": "auto",
-                    "anchor": "end",
-                    "align": "top",
-                    "font": {"size": 9},
-                    "formatter": "(v) => v == null ? '' : v.toFixed(1)",
-                }
-            },
-        },
-    }
+    datasets = [{'label': label, 'data': series[key], 'color': color, 'axis': 'y1'}
+                for label, key, color in TOKENS_DATASETS]
+    return render_line_chart(series['weeks'], datasets, title='Token Usage', height=400,
+                             axis_titles={'y1': 'Tokens (B)'},
+                             value_format=lambda v: f"{v:.1f}")
+
 
-    config_json = json.dumps(config, separators=(',', ':'))
-    return f"https://quickchart.io/chart?c={quote(config_json)}&w=900&h=400&bkg=white"
+def save_tokens_chart_svg(raw_data):
+    """Write dashboard/tokens_chart.svg; None when there is nothing to chart."""
+    series = load_tokens_series(raw_data)
+    if not series:
+        return None
+    return _save_chart('tokens_chart.svg', TOKENS_CHART_PATH, series,
+                       lambda: generate_tokens_chart_svg(raw_data))
 
 
 # ---------------------------------------------------------------------------
@@ -597,25 +592,20 @@ if __name__ == "__main__":
     data = load_weekly_data()
 
     if data:
-        combined_url = generate_chart_url(data)
-        print("Combined Chart URL (QuickChart.io dual Y-axis):")
-        print(combined_url)
-        print(f"\nURL length: {len(combined_url)} chars")
-        print()
+        chart_path = save_progress_chart_svg(data)
+        print(f"Progress chart SVG saved: {chart_path}")
 
         svg_path = save_sparklines_svg(data)
         print(f"Sparklines SVG saved: {svg_path}")
 
     # Tokens chart is fed from raw data.json (needs currentWeek, not just
-    # the cumulative-friendly shape produced by load_weekly_data).
-    raw_path = Path('dashboard/data.json')
-    if raw_path.exists():
-        raw = json.loads(raw_path.read_text())
-        tokens_url = generate_tokens_chart_url(raw)
-        if tokens_url:
-            print("\nTokens Chart URL (QuickChart.io):")
-            print(tokens_url)
-            print(f"\nURL length: {len(tokens_url)} chars")
+    # the cumulative-friendly shape produced by load_weekly_data). Same
+    # store, so the file is parsed once for both charts.
+    store = get_store()
+    if store.exists():
+        tokens_path = save_tokens_chart_svg(store.data)
+        if tokens_path:
+            print(f"\nTokens chart SVG saved: {tokens_path}")
         else:
             print("\nTokens Chart: no tracked weeks yet, skipping")
     else:
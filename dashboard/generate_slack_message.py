@@ -8,6 +8,7 @@ import os
 import sys
 from datetime import datetime, timedelta, timezone
 from get_weekly_commits import get_weekly_commits
+from _data_store import get_store
 
 # KST = UTC + 9 hours
 KST = timezone(timedelta(hours=9))
@@ -20,10 +21,7 @@ def load_current_metrics():
     to data.json's last known good value (True).
     """
     try:
-        with open('dashboard/data.json', 'r') as f:
-            data = json.load(f)
-
-        metrics = data['currentWeek']['metrics']
+        metrics = get_store().current_metrics()
         social = metrics['socialContent']
         workouts = metrics['workouts']
         cached_commits = metrics.get('commits', 0)
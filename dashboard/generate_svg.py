@@ -1,13 +1,51 @@
-import json
+import contextlib
 import datetime
 import os
 import sys
 from pathlib import Path
+import metrics_db
 from get_weekly_commits import get_weekly_commits
+from _data_store import get_store
+from _build_manifest import get_manifest, input_digest
+from _readme import LAYOUT_VERSION, get_readme
+from _svg_templates import DASHBOARD_CARD, FONT, SvgTemplate, render_card_grid, render_page
 
 # KST = UTC + 9 hours
 KST = datetime.timezone(datetime.timedelta(hours=9))
 
+# Bump when the SVG markup changes so the build manifest re-renders.
+DASHBOARD_TEMPLATE_VERSION = 1
+
+# Tile → metrics_db column its week-over-week arrow compares.
+TREND_METRICS = {'commits': 'commits', 'user_talks': 'user_sessions', 'social_posts': 'social',
+                 'coffee_chats': 'cto_meetings', 'workouts': 'workouts', 'blog_posts': 'blog_posts'}
+
+LIVE_DASHBOARD_URL = "https://raw.githubusercontent.com/Piesson/Piesson/main/dashboard/weekly_dashboard.svg"
+# Body of the README's `dashboard` section (see _readme).
+DASHBOARD_SECTION = '''# Grinding enough?
+
+<p align="center">
+  <img src="{url}" alt="Weekly Dashboard">
+</p>
+
+<div align="right"><sub>updated at {date}</sub></div>
+'''
+
+# Full-width banner below the 6-card grid.
+TOKEN_BANNER = SvgTemplate(f'''    <!-- Token Usage banner (full-width, below 6-card grid).
+         Number on top, label below — same visual order as the six card tiles. -->
+    <g transform="translate(30, 315)">
+        <rect width="460" height="70" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
+        <text x="230" y="38" text-anchor="middle" fill="#000000" font-size="30" font-weight="800" font-family="{FONT}">
+            {{total}}
+        </text>
+        <text x="230" y="58" text-anchor="middle" fill="#1f2937" font-size="11" font-weight="700" font-family="{FONT}">
+            🪙 Token Usage
+        </text>
+    </g>
+
+''')
+
 def get_trend_indicator(current, last_week_value):
     """Calculate trend arrow and percentage change"""
     if last_week_value is None or last_week_value == 0:
@@ -52,9 +90,7 @@ def fmt_b(n):
     return "0.0B"
 
 def generate_dashboard_svg():
-    # Load data
-    with open('dashboard/data.json', 'r') as f:
-        data = json.load(f)
+    store = get_store()
 
     # Auto-update commits from GitHub GraphQL API (all repos).
     # If the API returns None (rate-limit, network, auth, schema drift, etc.)
@@ -63,24 +99,25 @@ def generate_dashboard_svg():
     # to git (May 1 2026 incident: 166 -> 0).
     fresh = get_weekly_commits()
     if fresh is not None:
-        data['currentWeek']['metrics']['commits'] = fresh
+        # Locked re-read + write (no-op when commits didn't change), so a
+        # Slack update that landed during the API call isn't clobbered.
+        with store.transaction() as data:
+            data['currentWeek']['metrics']['commits'] = fresh
     else:
-        prev = data['currentWeek']['metrics'].get('commits', 0)
+        prev = store.current_metrics().get('commits', 0)
         print(
             f"[generate_svg] commits API failed; keeping previous value {prev}",
             file=sys.stderr,
         )
-
-    # Save updated data back
-    with open('dashboard/data.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    data = store.data
 
     current = data['currentWeek']['metrics']
     goals = data.get('goals', {})
 
-    # Get last week's data for trend calculation
-    history = data.get('weeklyHistory', [])
-    last_week = history[0]['metrics'] if history else None
+    # (this week, last week) per tile: one LAG query over the metrics view,
+    # which also folds legacy int socialContent/workouts entries.
+    with contextlib.closing(metrics_db.load_memory(data)) as conn:
+        trends = metrics_db.current_trends(conn, TREND_METRICS.values())
 
     # Calculate current week dates (Monday to Sunday) in KST
     today = datetime.datetime.now(KST)
@@ -93,20 +130,22 @@ def generate_dashboard_svg():
     week_number = f"W{monday.isocalendar()[1]}"  # "W44"
     date_range = f"{week_start} - {week_end} · {week_number}"
 
+    # Skip the render entirely when nothing the card shows has changed.
+    output_path = Path('dashboard/weekly_dashboard.svg')
+    manifest = get_manifest()
+    digest = input_digest(DASHBOARD_TEMPLATE_VERSION, current, goals, trends, date_range)
+    if manifest.is_fresh('weekly_dashboard.svg', digest, output_path):
+        print(f"Dashboard unchanged, skipped: {output_path}")
+        update_readme_dashboard_timestamp(today)
+        return
+
     # Calculate totals
     total_social = current['socialContent']['instagram'] + current['socialContent']['tiktok'] + current['socialContent']['hellotalk']
     total_workouts = current['workouts']['running'] + current['workouts']['gym']
 
-    # Calculate trends and progress
-    if last_week:
-        commits_trend = get_trend_indicator(current['commits'], last_week['commits'])
-        talks_trend = get_trend_indicator(current['userSessions'], last_week['userSessions'])
-        social_trend = get_trend_indicator(total_social, last_week['socialContent']['instagram'] + last_week['socialContent']['tiktok'] + last_week['socialContent']['hellotalk'])
-        coffee_trend = get_trend_indicator(current['ctoMeetings'], last_week['ctoMeetings'])
-        workouts_trend = get_trend_indicator(total_workouts, last_week['workouts']['running'] + last_week['workouts']['gym'])
-        blog_trend = get_trend_indicator(current['blogPosts'], last_week['blogPosts'])
-    else:
-        commits_trend = talks_trend = social_trend = coffee_trend = workouts_trend = blog_trend = ("", "", "#9ca3af")
+    def trend(name, value):
+        _, prev = trends.get(TREND_METRICS[name], (value, None))
+        return get_trend_indicator(value, prev)
 
     # Calculate progress bars
     commits_progress = get_progress_bar(current['commits'], goals.get('weeklyCommits', 140))
@@ -121,172 +160,26 @@ def generate_dashboard_svg():
     tokens = current.get('tokens') or {'claude': 0, 'codex': 0, 'total': 0}
     tokens_total_str = fmt_b(tokens.get('total', 0))
 
-    svg_content = f'''<svg width="520" height="400" xmlns="http://www.w3.org/2000/svg">
-    <defs>
-        <linearGradient id="bg" x1="0%" y1="0%" x2="100%" y2="100%">
-            <stop offset="0%" style="stop-color:#ffffff;stop-opacity:1" />
-            <stop offset="100%" style="stop-color:#f8fafc;stop-opacity:1" />
-        </linearGradient>
-        <linearGradient id="cardBg" x1="0%" y1="0%" x2="100%" y2="100%">
-            <stop offset="0%" style="stop-color:#ffffff;stop-opacity:1" />
-            <stop offset="100%" style="stop-color:#f1f5f9;stop-opacity:1" />
-        </linearGradient>
-        <filter id="shadow">
-            <feDropShadow dx="0" dy="2" stdDeviation="8" flood-color="#000000" flood-opacity="0.1"/>
-        </filter>
-    </defs>
-
-    <!-- Background -->
-    <rect width="520" height="400" fill="url(#bg)" rx="16" stroke="#e2e8f0" stroke-width="1"/>
-
-    <!-- Title -->
-    <text x="260" y="35" text-anchor="middle" fill="#0f172a" font-size="22" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-        Moved the needle this week? 📈
-    </text>
-    <text x="260" y="60" text-anchor="middle" fill="#64748b" font-size="12" font-family="system-ui, -apple-system, sans-serif">
-        {date_range}
-    </text>
-
-    <!-- Metrics Grid -->
-    <!-- Row 1: Commits, User Talks, Social Posts -->
-    <!-- Commits -->
-    <g transform="translate(60, 85)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="32" text-anchor="middle" fill="#000000" font-size="32" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {current['commits']}
-        </text>
-        <text x="60" y="48" text-anchor="middle" fill="{commits_trend[2] if len(commits_trend) > 2 else '#9ca3af'}" font-size="9" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {commits_trend[0] + ' ' + commits_trend[1] if len(commits_trend) > 1 and commits_trend[0] else ''}
-        </text>
-        <text x="60" y="62" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            🚀 CODE COMMITS
-        </text>
-        <text x="60" y="76" text-anchor="middle" fill="#9ca3af" font-size="7" font-weight="400" font-family="Monaco, monospace">
-            {commits_progress[0]}
-        </text>
-        <text x="60" y="88" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {commits_progress[1]} of goal
-        </text>
-    </g>
-
-    <!-- User Talks -->
-    <g transform="translate(200, 85)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="32" text-anchor="middle" fill="#000000" font-size="32" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {current['userSessions']}
-        </text>
-        <text x="60" y="48" text-anchor="middle" fill="{talks_trend[2] if len(talks_trend) > 2 else '#9ca3af'}" font-size="9" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {talks_trend[0] + ' ' + talks_trend[1] if len(talks_trend) > 1 and talks_trend[0] else ''}
-        </text>
-        <text x="60" y="62" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            💬 USER TALKS
-        </text>
-        <text x="60" y="76" text-anchor="middle" fill="#9ca3af" font-size="7" font-weight="400" font-family="Monaco, monospace">
-            {talks_progress[0]}
-        </text>
-        <text x="60" y="88" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {talks_progress[1]} of goal
-        </text>
-    </g>
-
-    <!-- Social Posts -->
-    <g transform="translate(340, 85)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="32" text-anchor="middle" fill="#000000" font-size="32" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {total_social}
-        </text>
-        <text x="60" y="48" text-anchor="middle" fill="{social_trend[2] if len(social_trend) > 2 else '#9ca3af'}" font-size="9" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {social_trend[0] + ' ' + social_trend[1] if len(social_trend) > 1 and social_trend[0] else ''}
-        </text>
-        <text x="60" y="62" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            📱 SOCIAL POSTS
-        </text>
-        <text x="60" y="76" text-anchor="middle" fill="#9ca3af" font-size="7" font-weight="400" font-family="Monaco, monospace">
-            {social_progress[0]}
-        </text>
-        <text x="60" y="88" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {social_progress[1]} of goal
-        </text>
-    </g>
-
-    <!-- Row 2: Coffee Chats, Workouts, Blog Posts -->
-    <!-- Coffee Chats -->
-    <g transform="translate(60, 200)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="32" text-anchor="middle" fill="#000000" font-size="32" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {current['ctoMeetings']}
-        </text>
-        <text x="60" y="48" text-anchor="middle" fill="{coffee_trend[2] if len(coffee_trend) > 2 else '#9ca3af'}" font-size="9" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {coffee_trend[0] + ' ' + coffee_trend[1] if len(coffee_trend) > 1 and coffee_trend[0] else ''}
-        </text>
-        <text x="60" y="62" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            ☕ COFFEE CHATS
-        </text>
-        <text x="60" y="76" text-anchor="middle" fill="#9ca3af" font-size="7" font-weight="400" font-family="Monaco, monospace">
-            {coffee_progress[0]}
-        </text>
-        <text x="60" y="88" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {coffee_progress[1]} of goal
-        </text>
-    </g>
-
-    <!-- Workouts -->
-    <g transform="translate(200, 200)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="32" text-anchor="middle" fill="#000000" font-size="32" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {total_workouts}
-        </text>
-        <text x="60" y="48" text-anchor="middle" fill="{workouts_trend[2] if len(workouts_trend) > 2 else '#9ca3af'}" font-size="9" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {workouts_trend[0] + ' ' + workouts_trend[1] if len(workouts_trend) > 1 and workouts_trend[0] else ''}
-        </text>
-        <text x="60" y="62" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            🏃 WORKOUTS
-        </text>
-        <text x="60" y="76" text-anchor="middle" fill="#9ca3af" font-size="7" font-weight="400" font-family="Monaco, monospace">
-            {workouts_progress[0]}
-        </text>
-        <text x="60" y="88" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {workouts_progress[1]} of goal
-        </text>
-    </g>
-
-    <!-- Blog Posts -->
-    <g transform="translate(340, 200)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="32" text-anchor="middle" fill="#000000" font-size="32" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {current['blogPosts']}
-        </text>
-        <text x="60" y="48" text-anchor="middle" fill="{blog_trend[2] if len(blog_trend) > 2 else '#9ca3af'}" font-size="9" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {blog_trend[0] + ' ' + blog_trend[1] if len(blog_trend) > 1 and blog_trend[0] else ''}
-        </text>
-        <text x="60" y="62" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            📝 BLOG POSTS
-        </text>
-        <text x="60" y="76" text-anchor="middle" fill="#9ca3af" font-size="7" font-weight="400" font-family="Monaco, monospace">
-            {blog_progress[0]}
-        </text>
-        <text x="60" y="88" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="600" font-family="system-ui, -apple-system, sans-serif">
-            {blog_progress[1]} of goal
-        </text>
-    </g>
+    def tile(value, trend, progress):
+        return {'value': value, 'trend_color': trend[2] if len(trend) > 2 else '#9ca3af',
+                'trend': trend[0] + ' ' + trend[1] if len(trend) > 1 and trend[0] else '',
+                'bar': progress[0], 'percent': progress[1]}
 
-    <!-- Token Usage banner (full-width, below 6-card grid).
-         Number on top, label below — same visual order as the six card tiles. -->
-    <g transform="translate(30, 315)">
-        <rect width="460" height="70" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="230" y="38" text-anchor="middle" fill="#000000" font-size="30" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {tokens_total_str}
-        </text>
-        <text x="230" y="58" text-anchor="middle" fill="#1f2937" font-size="11" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            🪙 Token Usage
-        </text>
-    </g>
+    cards = render_card_grid(DASHBOARD_CARD, {
+        'commits': tile(current['commits'], trend('commits', current['commits']), commits_progress),
+        'user_talks': tile(current['userSessions'], trend('user_talks', current['userSessions']), talks_progress),
+        'social_posts': tile(total_social, trend('social_posts', total_social), social_progress),
+        'coffee_chats': tile(current['ctoMeetings'], trend('coffee_chats', current['ctoMeetings']), coffee_progress),
+        'workouts': tile(total_workouts, trend('workouts', total_workouts), workouts_progress),
+        'blog_posts': tile(current['blogPosts'], trend('blog_posts', current['blogPosts']), blog_progress),
+    }, top=85)
 
-</svg>'''
+    svg_content = render_page(height=400, title="Moved the needle this week? 📈",
+                              title_y=35, title_size=22, subtitle=date_range, subtitle_y=60,
+                              cards=cards, footer=TOKEN_BANNER.render(total=tokens_total_str))
 
     # Save SVG
-    output_path = Path('dashboard/weekly_dashboard.svg')
-    output_path.write_text(svg_content)
+    manifest.write('weekly_dashboard.svg', digest, output_path, svg_content)
     print(f"Dashboard generated: {output_path}")
 
     # Update README with timestamp
@@ -294,26 +187,21 @@ def generate_dashboard_svg():
 
 def update_readme_dashboard_timestamp(today):
     """Update README.md Grinding enough? section with timestamp"""
-    import re
-    readme_path = Path('README.md')
+    readme = get_readme()
 
-    if not readme_path.exists():
+    if not readme.exists():
         return
 
-    with open(readme_path, 'r') as f:
-        content = f.read()
-
     current_date = today.strftime('%m/%d/%y')
-    timestamp_line = f'<div align="right"><sub>updated at {current_date}</sub></div>'
-
-    # Pattern: # Grinding enough?, <p> with image, then optional timestamp
-    pattern = r'(# Grinding enough\?\n\n<p align="center">\n  <img src="[^"]+" alt="Weekly Dashboard">\n</p>)\n*(?:<div align="right"><sub>updated at \d{2}/\d{2}/\d{2}</sub></div>)?'
-    replacement = f'\\1\n\n{timestamp_line}'
-
-    content = re.sub(pattern, replacement, content)
+    manifest = get_manifest()
+    digest = input_digest(LAYOUT_VERSION, current_date)
+    if manifest.is_fresh('README.md#dashboard-timestamp', digest, readme.path,
+                         readme.part('dashboard')):
+        return
 
-    with open(readme_path, 'w') as f:
-        f.write(content)
+    # Only refreshed in place: a README without the section is left alone.
+    readme.set_section('dashboard', DASHBOARD_SECTION.format(url=LIVE_DASHBOARD_URL, date=current_date))
+    readme.save(manifest, 'README.md#dashboard-timestamp', digest, ('dashboard',))
 
     print(f"✅ Updated Grinding enough? timestamp: {current_date}")
 
@@ -4,11 +4,22 @@ Generate individual SVG cards for each week in history
 Creates: dashboard/history/weekly_history_2025-W43.svg
 """
 
-import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from datetime import datetime
 
+from _data_store import get_store
+from _fileio import atomic_write_text
+from _history_archive import full_history
+from _svg_templates import HISTORY_CARD, render_card_grid, render_page
+
+# Below this many weeks a process pool costs more than it saves.
+PARALLEL_MIN_WEEKS = 32
+
 def generate_history_svg(week_entry):
     """Generate SVG for a single week's history"""
     week_id = week_entry['week']
@@ -56,141 +67,96 @@ def generate_history_svg(week_entry):
     cto_meetings = metrics.get('ctoMeetings', 0)
     blog_posts = metrics.get('blogPosts', 0)
 
-    svg_content = f'''<svg width="520" height="330" xmlns="http://www.w3.org/2000/svg">
-    <defs>
-        <linearGradient id="bg" x1="0%" y1="0%" x2="100%" y2="100%">
-            <stop offset="0%" style="stop-color:#ffffff;stop-opacity:1" />
-            <stop offset="100%" style="stop-color:#f8fafc;stop-opacity:1" />
-        </linearGradient>
-        <linearGradient id="cardBg" x1="0%" y1="0%" x2="100%" y2="100%">
-            <stop offset="0%" style="stop-color:#ffffff;stop-opacity:1" />
-            <stop offset="100%" style="stop-color:#f1f5f9;stop-opacity:1" />
-        </linearGradient>
-        <filter id="shadow">
-            <feDropShadow dx="0" dy="2" stdDeviation="8" flood-color="#000000" flood-opacity="0.1"/>
-        </filter>
-    </defs>
-
-    <!-- Background -->
-    <rect width="520" height="330" fill="url(#bg)" rx="16" stroke="#e2e8f0" stroke-width="1"/>
-
-    <!-- Title -->
-    <text x="260" y="28" text-anchor="middle" fill="#0f172a" font-size="20" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-        Week {week_id.split('-W')[1]} Archive
-    </text>
-    <text x="260" y="50" text-anchor="middle" fill="#64748b" font-size="12" font-family="system-ui, -apple-system, sans-serif">
-        {week_display}
-    </text>
-
-    <!-- Metrics Grid -->
-    <!-- Row 1: Commits, User Talks, Social Posts -->
-    <!-- Commits -->
-    <g transform="translate(60, 75)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="40" text-anchor="middle" fill="#000000" font-size="36" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {commits}
-        </text>
-        <text x="60" y="60" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            🚀 CODE COMMITS
-        </text>
-        <text x="60" y="78" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="400" font-family="system-ui, -apple-system, sans-serif">
-            Daily goal: 20 commits
-        </text>
-    </g>
-
-    <!-- User Talks -->
-    <g transform="translate(200, 75)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="40" text-anchor="middle" fill="#000000" font-size="36" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {user_sessions}
-        </text>
-        <text x="60" y="60" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            💬 USER TALKS
-        </text>
-        <text x="60" y="78" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="400" font-family="system-ui, -apple-system, sans-serif">
-            Daily goal: 1 talk
-        </text>
-    </g>
-
-    <!-- Social Posts -->
-    <g transform="translate(340, 75)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="40" text-anchor="middle" fill="#000000" font-size="36" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {total_social}
-        </text>
-        <text x="60" y="60" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            📱 SOCIAL POSTS
-        </text>
-        <text x="60" y="78" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="400" font-family="system-ui, -apple-system, sans-serif">
-            IG:{instagram} TT:{tiktok} HT:{hellotalk}
-        </text>
-    </g>
-
-    <!-- Row 2: Coffee Chats, Workouts, Blog Posts -->
-    <!-- Coffee Chats -->
-    <g transform="translate(60, 190)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="40" text-anchor="middle" fill="#000000" font-size="36" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {cto_meetings}
-        </text>
-        <text x="60" y="60" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            ☕ COFFEE CHATS
-        </text>
-        <text x="60" y="78" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="400" font-family="system-ui, -apple-system, sans-serif">
-            Weekly goal: 2 chats
-        </text>
-    </g>
-
-    <!-- Workouts -->
-    <g transform="translate(200, 190)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="40" text-anchor="middle" fill="#000000" font-size="36" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {total_workouts}
-        </text>
-        <text x="60" y="60" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            🏃 WORKOUTS
-        </text>
-        <text x="60" y="78" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="400" font-family="system-ui, -apple-system, sans-serif">
-            Run:{running} Gym:{gym}
-        </text>
-    </g>
-
-    <!-- Blog Posts -->
-    <g transform="translate(340, 190)">
-        <rect width="120" height="100" fill="url(#cardBg)" rx="12" filter="url(#shadow)" stroke="#e2e8f0" stroke-width="1"/>
-        <text x="60" y="40" text-anchor="middle" fill="#000000" font-size="36" font-weight="800" font-family="system-ui, -apple-system, sans-serif">
-            {blog_posts}
-        </text>
-        <text x="60" y="60" text-anchor="middle" fill="#1f2937" font-size="10" font-weight="700" font-family="system-ui, -apple-system, sans-serif">
-            📝 BLOG POSTS
-        </text>
-        <text x="60" y="78" text-anchor="middle" fill="#9ca3af" font-size="8" font-weight="400" font-family="system-ui, -apple-system, sans-serif">
-            AI &amp; Startup content
-        </text>
-    </g>
-
-</svg>'''
-
-    return svg_content
-
-def generate_all_history_svgs(force=False):
-    """Generate SVGs for all weeks in history.
+    cards = render_card_grid(HISTORY_CARD, {
+        'commits': {'value': commits, 'note': 'Daily goal: 20 commits'},
+        'user_talks': {'value': user_sessions, 'note': 'Daily goal: 1 talk'},
+        'social_posts': {'value': total_social, 'note': f'IG:{instagram} TT:{tiktok} HT:{hellotalk}'},
+        'coffee_chats': {'value': cto_meetings, 'note': 'Weekly goal: 2 chats'},
+        'workouts': {'value': total_workouts, 'note': f'Run:{running} Gym:{gym}'},
+        'blog_posts': {'value': blog_posts, 'note': 'AI &amp; Startup content'},
+    }, top=75)
+
+    return render_page(height=330, title=f"Week {week_id.split('-W')[1]} Archive",
+                       title_y=28, title_size=20, subtitle=week_display, subtitle_y=50,
+                       cards=cards)
+
+def _history_path(history_dir, week_id):
+    return history_dir / f"weekly_history_{week_id}.svg"
+
+
+def _read_text(path):
+    try:
+        return path.read_text()
+    except FileNotFoundError:
+        return None
+
+
+def write_history_svg(entry, history_dir):
+    """Render one week and write it if the file's content changed.
+
+    Returns (week_id, written). Runs inside pool workers, so the render,
+    the compare and the fsync'd write all happen in parallel.
+    """
+    output_file = _history_path(Path(history_dir), entry['week'])
+    svg_content = generate_history_svg(entry)
+    if _read_text(output_file) == svg_content:
+        return entry['week'], False
+    atomic_write_text(output_file, svg_content)
+    return entry['week'], True
+
+
+def render_history_batch(entries, history_dir, workers=None):
+    """write_history_svg() for every entry, fanned out over a process pool.
+
+    Returns [(week_id, written)] in input order. Small batches, or
+    workers=1, run in-process: pool start-up costs more than a dozen
+    weeks. Falls back to in-process if a pool can't be started.
+    """
+    entries = list(entries)
+    workers = pool_size(len(entries), workers)
+    if workers > 1:
+        chunksize = max(1, len(entries) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                return list(pool.map(write_history_svg, entries,
+                                     [str(history_dir)] * len(entries), chunksize=chunksize))
+        except (OSError, BrokenProcessPool) as e:
+            print(f"  ⚠️  Process pool unavailable ({e}); rendering in-process", file=sys.stderr)
+    return [write_history_svg(e, history_dir) for e in entries]
+
+
+def pool_size(count, workers=None):
+    """Worker processes for a batch of `count` weeks; 1 means in-process.
+
+    HISTORY_RENDER_WORKERS overrides the default of one per CPU.
+    """
+    if workers is None:
+        raw = os.getenv('HISTORY_RENDER_WORKERS')
+        workers = int(raw) if raw else (os.cpu_count() or 1)
+    if count < PARALLEL_MIN_WEEKS:
+        return 1
+    return max(1, min(workers, count))
+
+
+def generate_all_history_svgs(force=False, workers=None):
+    """Generate SVGs for all weeks in history (hot window + archive).
 
     force=True regenerates existing files too — needed after a data
     backfill, because the skip-if-exists default would leave the SVGs
-    showing the stale pre-backfill numbers forever.
+    showing the stale pre-backfill numbers forever. Either way a file is
+    only written when its content changed, so a forced run over an
+    unchanged history touches nothing.
     """
-    data_file = Path('dashboard/data.json')
+    store = get_store()
 
-    if not data_file.exists():
+    if not store.exists():
         print("❌ data.json not found")
         return
 
     # Load data
-    with open(data_file, 'r') as f:
-        data = json.load(f)
+    data = store.data
 
-    weekly_history = data.get('weeklyHistory', [])
+    weekly_history = full_history(data)
 
     if not weekly_history:
         print("No weekly history to generate")
@@ -198,34 +164,38 @@ def generate_all_history_svgs(force=False):
 
     # Create history directory
     history_dir = Path('dashboard/history')
-    history_dir.mkdir(exist_ok=True)
+    history_dir.mkdir(parents=True, exist_ok=True)
 
     print(f"📚 Generating history SVGs for {len(weekly_history)} weeks...")
+    started = time.perf_counter()
 
-    generated_count = 0
+    pending = []
     skipped_count = 0
-
     for entry in weekly_history:
         week_id = entry['week']
-        output_file = history_dir / f"weekly_history_{week_id}.svg"
-
         # Check if file already exists (skip regeneration unless forced)
-        if output_file.exists() and not force:
+        if not force and _history_path(history_dir, week_id).exists():
             print(f"  ⏭️  Skipped {week_id} (already exists)")
             skipped_count += 1
             continue
+        pending.append(entry)
 
-        # Generate SVG
-        svg_content = generate_history_svg(entry)
+    results = render_history_batch(pending, history_dir, workers)
 
-        # Save to file
-        with open(output_file, 'w') as f:
-            f.write(svg_content)
-
-        print(f"  ✅ Generated {week_id}")
-        generated_count += 1
-
-    print(f"\n✅ Completed: {generated_count} generated, {skipped_count} skipped")
+    generated_count = 0
+    unchanged_count = 0
+    for week_id, written in results:
+        if written:
+            print(f"  ✅ Generated {week_id}")
+            generated_count += 1
+        else:
+            unchanged_count += 1
+
+    elapsed = time.perf_counter() - started
+    per_week = elapsed / len(pending) * 1000 if pending else 0.0
+    print(f"\n✅ Completed: {generated_count} generated, {unchanged_count} unchanged, "
+          f"{skipped_count} skipped in {elapsed:.2f}s "
+          f"({per_week:.1f} ms/week, {pool_size(len(pending), workers)} workers)")
 
 if __name__ == "__main__":
     generate_all_history_svgs(force='--force' in sys.argv[1:])
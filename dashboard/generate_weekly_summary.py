@@ -5,18 +5,18 @@ Sends on Monday morning after weekly reset
 """
 
 import json
-from pathlib import Path
+
+from _data_store import get_store
 
 def generate_weekly_summary():
     """Generate weekly summary message from last week's data"""
-    data_file = Path('dashboard/data.json')
+    store = get_store()
 
-    if not data_file.exists():
+    if not store.exists():
         print("❌ data.json not found")
         return None
 
-    with open(data_file, 'r') as f:
-        data = json.load(f)
+    data = store.data
 
     if not data.get('weeklyHistory'):
         print("No weekly history found")
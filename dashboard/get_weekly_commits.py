@@ -5,18 +5,35 @@ Returns:
     int  - actual commit count (including 0 if user really had 0 commits)
     None - API call failed for any reason. Callers MUST treat None as
            "unknown - keep showing previous value", never as zero.
+
+Week and range totals are sums over the per-day commit calendar
+(_commit_calendar, dashboard/.commit_calendar.json). Only days that are
+missing or not yet final are fetched — one aliased totalCommitContributions
+per KST day, batched — so re-confirming an old week costs no API calls.
 """
 
 from __future__ import annotations
 import os
 import sys
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from _graphql_client import post_graphql, ErrorKind
+from _graphql_client import post_graphql, post_graphql_many, ErrorKind
+from _commit_calendar import load_calendar, save_calendar, is_day_final
 
 KST = timezone(timedelta(hours=9))
 GRAPHQL_URL = "https://api.github.com/graphql"
+CALENDAR_PATH = Path(__file__).resolve().parent / ".commit_calendar.json"
+# Aliased contributionsCollection blocks (one per day) per request. Each is
+# a cheap aggregate, but GitHub caps query complexity/nodes per call. A
+# cold 12-week backfill is 4 requests; after that only non-final days go out.
+MAX_RANGES_PER_QUERY = 25
+# Non-final days are refetched every run. A repeat within one job (a second
+# script, or a re-run of the pipeline) is served from the GraphQL response
+# cache instead of spending quota; the cache file is gitignored, so separate
+# jobs such as the reminder and the dashboard update each fetch once.
+RESPONSE_TTL_SECONDS = 300
 
 
 def _week_window_utc(now_kst: datetime):
@@ -35,70 +52,210 @@ def _week_window_utc(now_kst: datetime):
     )
 
 
-def get_weekly_commits() -> Optional[int]:
-    from_iso, to_iso = _week_window_utc(datetime.now(KST))
-    return _query_commit_contributions(from_iso, to_iso)
+def get_weekly_commits(now: Optional[datetime] = None) -> Optional[int]:
+    now = now or datetime.now(KST)
+    from_iso, _ = _week_window_utc(now)
+    monday = datetime.strptime(from_iso, "%Y-%m-%dT%H:%M:%SZ").replace(
+        tzinfo=timezone.utc).astimezone(KST).date()
+    sunday = monday + timedelta(days=6)
+    return get_commits_for_range(monday.isoformat(), sunday.isoformat(), now=now)
 
 
-def get_commits_for_range(start_date: str, end_date: str) -> Optional[int]:
+def get_commits_for_range(start_date: str, end_date: str, *,
+                          now: Optional[datetime] = None) -> Optional[int]:
     """Commit contributions for an explicit KST date range (inclusive).
 
     Dates are 'YYYY-MM-DD'. Same None-on-failure contract as
     get_weekly_commits(). Used by check_weekly_reset.py to confirm the
-    closing week at snapshot time, and by backfill_commits.py to repair
-    weeklyHistory entries that were snapshotted as 0.
+    closing week at snapshot time.
+    """
+    return get_commits_for_ranges([(start_date, end_date)], now=now)[0]
+
+
+def get_commits_for_ranges(ranges: Sequence[Tuple[str, str]], *,
+                           now: Optional[datetime] = None) -> List[Optional[int]]:
+    """Commit contributions for many KST date ranges, summed from cached days.
+
+    Every day the ranges touch (up to today) that is missing from the
+    calendar or not final yet is fetched in one batched request (chunked
+    at MAX_RANGES_PER_QUERY days). Returns one Optional[int] per input
+    range, in order. A bad range, or any day in it that is neither cached
+    as final nor successfully refetched, maps to None for that range only —
+    callers keep their stored value. Days after today count as 0.
     """
+    now = now or datetime.now(KST)
+    today = now.astimezone(KST).date()
+
+    range_days: List[Optional[List[date]]] = []
+    for start_date, end_date in ranges:
+        days = _days_in_range(start_date, end_date)
+        if days is None:
+            print(f"[weekly-commits] bad range {start_date}..{end_date}; None", file=sys.stderr)
+        range_days.append(days)
+
+    calendar = load_calendar(CALENDAR_PATH)
+    cached = calendar["days"]
+    needed = sorted({d for days in range_days if days for d in days if d <= today})
+    stale = [d for d in needed
+             if not (d.isoformat() in cached and is_day_final(d, cached[d.isoformat()]))]
+
+    fresh: Dict[date, Optional[int]] = {}
+    if stale:
+        print(f"[weekly-commits] {len(needed) - len(stale)} days cached, "
+              f"fetching {len(stale)}", file=sys.stderr)
+        windows = [_range_window_utc(d.isoformat(), d.isoformat()) for d in stale]
+        fetched_at = now.astimezone(KST).isoformat(timespec="seconds")
+        for d, n in zip(stale, _query_windows_chunked(windows)):
+            fresh[d] = n
+            if n is not None:
+                cached[d.isoformat()] = {"commits": n, "fetched_at": fetched_at}
+        if any(n is not None for n in fresh.values()):
+            save_calendar(CALENDAR_PATH, calendar)
+    elif needed:
+        print(f"[weekly-commits] all {len(needed)} days served from calendar; 0 API calls",
+              file=sys.stderr)
+
+    results: List[Optional[int]] = []
+    for days in range_days:
+        if days is None:
+            results.append(None)
+            continue
+        total = 0
+        for d in days:
+            if d > today:
+                continue
+            if d in fresh and fresh[d] is None:
+                total = None  # refetch failed — a stale partial day would under-count
+                break
+            total += int(cached[d.isoformat()]["commits"])
+        results.append(total)
+    return results
+
+
+def _days_in_range(start_date: str, end_date: str) -> Optional[List[date]]:
+    try:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date()
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except (ValueError, TypeError):
+        return None
+    if end < start:
+        return None
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _query_windows_chunked(windows: Sequence[Tuple[str, str]]) -> List[Optional[int]]:
+    """Query every window, MAX_RANGES_PER_QUERY aliases per request.
+
+    Multiple chunks go out concurrently (post_graphql_many) so a cold
+    backfill pays roughly one round trip, not one per chunk.
+    """
+    if not windows:
+        return []
+    username, token = _credentials()
+    if not token:
+        print("[weekly-commits] no token in env; returning None (NOT 0)", file=sys.stderr)
+        return [None] * len(windows)
+
+    chunks = [windows[at:at + MAX_RANGES_PER_QUERY]
+              for at in range(0, len(windows), MAX_RANGES_PER_QUERY)]
+    bodies = []
+    for chunk in chunks:
+        query, variables = _build_ranges_query(chunk)
+        variables["username"] = username
+        bodies.append({"query": query, "variables": variables})
+
+    print(f"[weekly-commits] querying {len(windows)} ranges in {len(bodies)} request(s)",
+          file=sys.stderr)
+    if len(bodies) == 1:
+        responses = [post_graphql(GRAPHQL_URL, _headers(token), bodies[0],
+                                  ttl=RESPONSE_TTL_SECONDS)]
+    else:
+        responses = post_graphql_many(GRAPHQL_URL, _headers(token), bodies,
+                                      ttl=RESPONSE_TTL_SECONDS)
+
+    results: List[Optional[int]] = []
+    for chunk, (data, err) in zip(chunks, responses):
+        results.extend(_parse_ranges_response(data, err, len(chunk)))
+    return results
+
+
+def _range_window_utc(start_date: str, end_date: str) -> Optional[Tuple[str, str]]:
+    """KST 'YYYY-MM-DD' inclusive range → (from_iso, to_iso) in UTC, or None."""
     try:
         start_kst = datetime.strptime(start_date, "%Y-%m-%d").replace(tzinfo=KST)
         end_kst = datetime.strptime(end_date, "%Y-%m-%d").replace(
             hour=23, minute=59, second=59, tzinfo=KST
         )
     except (ValueError, TypeError):
-        print(f"[weekly-commits] bad range {start_date}..{end_date}; returning None", file=sys.stderr)
         return None
-    from_iso = start_kst.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    to_iso = end_kst.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-    return _query_commit_contributions(from_iso, to_iso)
+    return (
+        start_kst.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        end_kst.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    )
 
 
-def _query_commit_contributions(from_iso: str, to_iso: str) -> Optional[int]:
+def _credentials() -> Tuple[str, str]:
     username = os.getenv("GITHUB_USERNAME", os.getenv("USERNAME", "Piesson"))
     token = os.getenv("GITHUB_TOKEN", os.getenv("SUMMARY_CARDS_TOKEN", ""))
-    if not token:
-        print("[weekly-commits] no token in env; returning None (NOT 0)", file=sys.stderr)
-        return None
+    return username, token
 
-    print(f"[weekly-commits] querying {from_iso} -> {to_iso}", file=sys.stderr)
 
-    headers = {
+def _headers(token: str) -> dict:
+    return {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
     }
-    query = """
-    query($username: String!, $from: DateTime!, $to: DateTime!) {
-        user(login: $username) {
-            contributionsCollection(from: $from, to: $to) {
-                totalCommitContributions
-            }
-        }
-    }
+
+
+def _build_ranges_query(windows: Sequence[Tuple[str, str]]):
+    """One aliased contributionsCollection per (from_iso, to_iso) window.
+
+    Returns (query_string, variables_dict) with aliases r0..rN-1.
     """
-    variables = {"username": username, "from": from_iso, "to": to_iso}
-    body = {"query": query, "variables": variables}
+    aliases = []
+    variables = {"username": None}
+    var_decls = ["$username: String!"]
+    for i, (from_iso, to_iso) in enumerate(windows):
+        aliases.append(
+            f"      r{i}: contributionsCollection(from: $from{i}, to: $to{i}) {{\n"
+            f"        totalCommitContributions\n"
+            f"      }}"
+        )
+        variables[f"from{i}"] = from_iso
+        variables[f"to{i}"] = to_iso
+        var_decls.append(f"$from{i}: DateTime!, $to{i}: DateTime!")
+    query = (
+        f"query({', '.join(var_decls)}) {{\n"
+        f"  user(login: $username) {{\n"
+        + "\n".join(aliases) + "\n"
+        "  }\n"
+        "  rateLimit { cost remaining resetAt }\n"
+        "}\n"
+    )
+    return query, variables
 
-    data, err = post_graphql(GRAPHQL_URL, headers, body)
-    if err is not None:
-        print(f"[weekly-commits] API failed ({err.value}); returning None (NOT 0)", file=sys.stderr)
-        return None
 
-    try:
-        n = int(data["data"]["user"]["contributionsCollection"]["totalCommitContributions"])
-    except (KeyError, TypeError, ValueError):
-        print("[weekly-commits] unexpected response shape; returning None", file=sys.stderr)
-        return None
+def _parse_ranges_response(data, err, n: int) -> List[Optional[int]]:
+    """r0..r{n-1} counts from one aliased response. Every failure path yields None, never 0.
+
+    A PARTIAL response keeps the aliases that resolved; only the failing
+    ones (null in the payload) become None.
+    """
+    if err is ErrorKind.PARTIAL:
+        print("[weekly-commits] partial response; failing aliases → None", file=sys.stderr)
+    elif err is not None:
+        print(f"[weekly-commits] API failed ({err.value}); returning None (NOT 0)", file=sys.stderr)
+        return [None] * n
 
-    print(f"[weekly-commits] got {n}", file=sys.stderr)
-    return n
+    user = ((data or {}).get("data") or {}).get("user") or {}
+    results: List[Optional[int]] = []
+    for i in range(n):
+        try:
+            results.append(int(user[f"r{i}"]["totalCommitContributions"]))
+        except (KeyError, TypeError, ValueError):
+            print(f"[weekly-commits] missing/invalid alias r{i}; None", file=sys.stderr)
+            results.append(None)
+    return results
 
 
 if __name__ == "__main__":
@@ -5,24 +5,44 @@ Fetch weekly Claude Code + Codex CLI token usage, write to data.json.
 Reads currentWeek.startDate/endDate from data.json (not now()) so upstream
 reset timing is irrelevant: query range always matches the labeled week.
 
+Sources are read natively from the local session logs (_usage_logs) —
+no subprocess, and only the bytes appended since the last run are parsed.
+The ccusage CLIs remain the fallback when a source has no log directory
+on this machine, or for every source with TOKENS_READER=cli.
+
 Error contract:
-  - Each source (ccusage, @ccusage/codex) runs in an isolated try/except.
+  - Each source (ccusage, ccusage codex) runs in an isolated try/except.
   - On network failure the CLI is retried once with --offline.
   - If a single source fails, its previous value is preserved and the other
     source still updates (exit 0).
   - If both sources fail, the existing tokens block is preserved unchanged
     and the script exits 1 so the wrapper can skip the commit.
+  - The two sources are fetched concurrently (fetch_parallel); each keeps
+    its own isolation and retry, so wall time is the slower one, not the sum.
+
+Every successful daily read is also appended to the token ledger
+(_token_ledger), so weeks whose logs have since been pruned are still
+summed from what was seen at the time.
 """
 
 import json
+import os
 import subprocess
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+import _usage_logs
+import ccusage_tool
+from _data_store import get_store
+from _token_ledger import open_ledger
+
 KST = timezone(timedelta(hours=9))
 DATA = Path('dashboard/data.json')
 TIMEOUT_SECS = 120
+FETCH_WORKERS = 2  # one per source; each worker mostly waits on a subprocess
 NETWORK_SIGNALS = (
     'network', 'fetch', 'enotfound', 'etimedout', 'eai_again',
     'econnrefused', 'econnreset',
@@ -45,10 +65,26 @@ def day_total(entry):
     return int(entry.get('totalTokens') or entry.get('total_tokens') or 0)
 
 
+def day_date(entry):
+    """KST date of a daily row ('2026-05-04', '20260504' or 'May 04, 2026'), or None."""
+    raw = entry.get('date') if isinstance(entry, dict) else None
+    if not isinstance(raw, str):
+        return None
+    for fmt in ('%Y-%m-%d', '%Y%m%d', '%b %d, %Y'):
+        try:
+            return datetime.strptime(raw.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
 def run_cli(cmd):
+    started = time.perf_counter()
     proc = subprocess.run(
         cmd, capture_output=True, text=True, timeout=TIMEOUT_SECS
     )
+    log(f"[cli] {Path(cmd[0]).name} {' '.join(cmd[1:3])} rc={proc.returncode} "
+        f"{time.perf_counter() - started:.1f}s")
     return proc.stdout, proc.stderr, proc.returncode
 
 
@@ -58,6 +94,36 @@ def looks_like_network_error(stderr):
 
 
 def fetch_source(label, online_cmd, offline_cmd):
+    days, ok = _fetch_days(label, online_cmd, offline_cmd)
+    if not ok:
+        return 0, False
+    total = sum(day_total(d) for d in days)
+    log(f"[{label}] days={len(days)} total={total:,}")
+    return total, True
+
+
+def fetch_source_daily(label, online_cmd, offline_cmd):
+    """Like fetch_source, but ({date: tokens}, ok) per KST day.
+
+    A row without a parseable date can't be bucketed into a week; it is
+    logged and skipped, and the rest of the source still counts.
+    """
+    days, ok = _fetch_days(label, online_cmd, offline_cmd)
+    if not ok:
+        return {}, False
+    per_day = {}
+    for entry in days:
+        d = day_date(entry)
+        if d is None:
+            log(f"[{label}] skipping daily row without a usable date: {str(entry)[:120]}")
+            continue
+        per_day[d] = per_day.get(d, 0) + day_total(entry)
+    log(f"[{label}] days={len(per_day)} total={sum(per_day.values()):,}")
+    return per_day, True
+
+
+def _fetch_days(label, online_cmd, offline_cmd):
+    """Run the CLI (with the --offline retry) and return (daily rows, ok)."""
     try:
         stdout, stderr, rc = run_cli(online_cmd)
         if rc != 0:
@@ -66,62 +132,109 @@ def fetch_source(label, online_cmd, offline_cmd):
                 stdout, stderr, rc = run_cli(offline_cmd)
                 if rc != 0:
                     log(f"[{label}] offline retry failed rc={rc}: {stderr[:200]}")
-                    return 0, False
+                    return [], False
             else:
                 log(f"[{label}] CLI failed rc={rc}: {stderr[:200]}")
-                return 0, False
+                return [], False
         payload = json.loads(stdout) if stdout.strip() else {}
     except FileNotFoundError:
         log(f"[{label}] CLI not found in PATH")
-        return 0, False
+        return [], False
     except subprocess.TimeoutExpired as exc:
         log(f"[{label}] timeout after {exc.timeout}s")
-        return 0, False
+        return [], False
     except json.JSONDecodeError as exc:
         log(f"[{label}] JSON decode failed: {exc}")
-        return 0, False
+        return [], False
 
-    days = extract_days(payload)
-    total = sum(day_total(d) for d in days)
-    log(f"[{label}] days={len(days)} total={total:,}")
-    return total, True
+    return extract_days(payload), True
 
 
-def fetch_claude(start_iso, end_iso):
+def _claude_cmds(start_iso, end_iso):
     start = start_iso.replace('-', '')
     end = end_iso.replace('-', '')
-    return fetch_source(
-        'claude',
-        online_cmd=[
-            'ccusage', 'daily', '--json',
-            '--since', start, '--until', end,
-            '--timezone', 'Asia/Seoul',
-        ],
-        offline_cmd=[
-            'ccusage', 'daily', '--json', '--offline',
-            '--since', start, '--until', end,
-            '--timezone', 'Asia/Seoul',
-        ],
-    )
+    base = ccusage_tool.command('daily', '--json', fallback=['ccusage'])
+    date_args = [
+        '--since', start, '--until', end,
+        '--timezone', 'Asia/Seoul',
+    ]
+    return base + date_args, base + ['--offline'] + date_args
 
 
-def fetch_codex(start_iso, end_iso):
+def _codex_cmds(start_iso, end_iso):
     # @ccusage/codex was retired upstream — the standalone CLI now exits 1
     # with "use npx ccusage instead", which silently zeroed codex counts
     # from 2026-06 onward. Codex usage ships as a subcommand of the main
-    # ccusage CLI now.
+    # ccusage CLI now. ccusage_tool launches a cached install directly;
+    # npx is only the fallback when there is none.
     start = start_iso.replace('-', '')
     end = end_iso.replace('-', '')
-    base = ['npx', '-y', 'ccusage@latest', 'codex', 'daily', '--json']
+    base = ccusage_tool.command('codex', 'daily', '--json', fallback=ccusage_tool.NPX_CMD)
     date_args = [
         '--since', start, '--until', end,
         '--timezone', 'Asia/Seoul',
     ]
-    return fetch_source(
-        'codex',
-        online_cmd=base + date_args,
-        offline_cmd=base + ['--offline'] + date_args,
-    )
+    return base + date_args, base + ['--offline'] + date_args
+
+
+def native_daily(label, start_iso, end_iso):
+    """({date: tokens}, ok) from the local logs; ok=False → use the CLI."""
+    if os.getenv('TOKENS_READER', 'native') == 'cli':
+        return {}, False
+    try:
+        per_day, ok = _usage_logs.fetch_daily(label, start_iso, end_iso)
+    except Exception as exc:  # noqa: BLE001 — the CLI is the fallback
+        log(f"[{label}] log reader failed, falling back to CLI: {exc}")
+        return {}, False
+    if ok:
+        log(f"[{label}] logs days={len(per_day)} total={sum(per_day.values()):,}")
+    else:
+        log(f"[{label}] no local logs, falling back to CLI")
+    return per_day, ok
+
+
+def fetch_claude(start_iso, end_iso):
+    per_day, ok = native_daily('claude', start_iso, end_iso)
+    if ok:
+        return sum(per_day.values()), True
+    online_cmd, offline_cmd = _claude_cmds(start_iso, end_iso)
+    return fetch_source('claude', online_cmd=online_cmd, offline_cmd=offline_cmd)
+
+
+def fetch_codex(start_iso, end_iso):
+    per_day, ok = native_daily('codex', start_iso, end_iso)
+    if ok:
+        return sum(per_day.values()), True
+    online_cmd, offline_cmd = _codex_cmds(start_iso, end_iso)
+    return fetch_source('codex', online_cmd=online_cmd, offline_cmd=offline_cmd)
+
+
+def fetch_claude_daily(start_iso, end_iso):
+    per_day, ok = native_daily('claude', start_iso, end_iso)
+    if ok:
+        return per_day, True
+    online_cmd, offline_cmd = _claude_cmds(start_iso, end_iso)
+    return fetch_source_daily('claude', online_cmd=online_cmd, offline_cmd=offline_cmd)
+
+
+def fetch_codex_daily(start_iso, end_iso):
+    per_day, ok = native_daily('codex', start_iso, end_iso)
+    if ok:
+        return per_day, True
+    online_cmd, offline_cmd = _codex_cmds(start_iso, end_iso)
+    return fetch_source_daily('codex', online_cmd=online_cmd, offline_cmd=offline_cmd)
+
+
+def fetch_parallel(*calls):
+    """Run (fn, *args) calls in a bounded thread pool; results in call order.
+
+    Every fetch_* already turns its own failures into ok=False, so running
+    them side by side changes nothing but wall time. An unexpected
+    exception still propagates to the caller, as it did when sequential.
+    """
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(calls))) as pool:
+        futures = [pool.submit(fn, *args) for fn, *args in calls]
+        return [f.result() for f in futures]
 
 
 def fmt_b(n):
@@ -185,9 +298,27 @@ def is_history_entry_stale(entry):
     return updated_at < close_boundary
 
 
-def backfill_weekly_history(data):
-    """Re-query ccusage for each stale weeklyHistory entry. Returns the
-    count of entries successfully backfilled.
+def _week_tokens(ledger, source, start, end, queried):
+    """Week total for `source` from the ledger, or None if unknown.
+
+    Days no capture covered (idle, or logs already pruned) stay incomplete;
+    a source queried in this run still sums what is on record for them.
+    """
+    total = ledger.week_total(source, start, end)
+    if total is None and source in queried:
+        total = ledger.known_total(source, start, end)
+    return total
+
+
+def backfill_weekly_history(data, ledger=None):
+    """Re-total each stale weeklyHistory entry. Returns the count of
+    entries successfully backfilled.
+
+    Weeks the token ledger already holds complete days for are summed from
+    it — no query. For the rest, one daily-granularity call per source
+    covers them all (earliest → latest such week), the rows are recorded in
+    the ledger and the weeks are summed from there. A 12-week backfill is
+    at most 2 CLI spawns, not 24.
 
     Safety rules:
       - Both ccusage sources fail → skip entry (don't overwrite with 0).
@@ -197,7 +328,7 @@ def backfill_weekly_history(data):
         keep existing for the failed source.
     """
     history = data.get('weeklyHistory') or []
-    backfilled = 0
+    stale = []
     for entry in history:
         if not is_history_entry_stale(entry):
             continue
@@ -205,11 +336,43 @@ def backfill_weekly_history(data):
         end_iso = _normalize_date(entry.get('endDate'))
         if not start_iso or not end_iso:
             continue
+        stale.append((entry, start_iso, end_iso))
+    if not stale:
+        return 0
+
+    ledger = ledger if ledger is not None else open_ledger()
+    uncovered = [(s, e) for _, s, e in stale
+                 if any(ledger.week_total(source, parse_date_str(s), parse_date_str(e)) is None
+                        for source in _usage_logs.SOURCES)]
+    if uncovered:
+        window_start = min(s for s, _ in uncovered)
+        window_end = max(e for _, e in uncovered)
+        log(f"[backfill] {len(uncovered)}/{len(stale)} stale week(s) not in the "
+            f"ledger, one daily query per source {window_start}..{window_end}")
+        results = fetch_parallel(
+            (fetch_claude_daily, window_start, window_end),
+            (fetch_codex_daily, window_start, window_end),
+        )
+        queried = set()
+        for source, (per_day, ok) in zip(_usage_logs.SOURCES, results):
+            if ok:
+                ledger.record(source, per_day,
+                              parse_date_str(window_start), parse_date_str(window_end))
+                queried.add(source)
+    else:
+        queried = set()
+        log(f"[backfill] {len(stale)} stale week(s), all summed from the ledger")
+
+    backfilled = 0
+    for entry, start_iso, end_iso in stale:
         week_label = entry.get('week') or f"{start_iso}..{end_iso}"
         log(f"[backfill] {week_label} ({start_iso}..{end_iso})")
 
-        claude_total, claude_ok = fetch_claude(start_iso, end_iso)
-        codex_total, codex_ok = fetch_codex(start_iso, end_iso)
+        start_d, end_d = parse_date_str(start_iso), parse_date_str(end_iso)
+        claude_total = _week_tokens(ledger, 'claude', start_d, end_d, queried)
+        codex_total = _week_tokens(ledger, 'codex', start_d, end_d, queried)
+        claude_ok = claude_total is not None
+        codex_ok = codex_total is not None
 
         if not claude_ok and not codex_ok:
             log(f"[backfill] {week_label} both sources failed — preserving")
@@ -255,45 +418,81 @@ def backfill_weekly_history(data):
     return backfilled
 
 
+def _history_key(entry):
+    return (entry.get('week'), _normalize_date(entry.get('startDate')))
+
+
+def _changed_history_tokens(before, after):
+    """{history key: tokens} for entries whose tokens block differs."""
+    old = {_history_key(e): (e.get('metrics') or {}).get('tokens')
+           for e in before.get('weeklyHistory') or []}
+    return {_history_key(e): e['metrics']['tokens']
+            for e in after.get('weeklyHistory') or []
+            if (e.get('metrics') or {}).get('tokens') != old.get(_history_key(e))}
+
+
 def main():
     if not DATA.exists():
         log(f"[fatal] {DATA} not found (cwd={Path.cwd()})")
         return 1
 
-    data = json.loads(DATA.read_text())
-    start = data['currentWeek']['startDate']
-    end = data['currentWeek']['endDate']
+    store = get_store(DATA)
+    start = store.current_week()['startDate']
+    end = store.current_week()['endDate']
     log(f"[range] {start}..{end}")
 
-    claude_total, claude_ok = fetch_claude(start, end)
-    codex_total, codex_ok = fetch_codex(start, end)
+    (claude_days, claude_ok), (codex_days, codex_ok) = fetch_parallel(
+        (fetch_claude_daily, start, end),
+        (fetch_codex_daily, start, end),
+    )
+    claude_total = sum(claude_days.values())
+    codex_total = sum(codex_days.values())
+
+    ledger = open_ledger()
+    for source, per_day, ok in (('claude', claude_days, claude_ok),
+                                ('codex', codex_days, codex_ok)):
+        if ok:
+            ledger.record(source, per_day, parse_date_str(start), parse_date_str(end))
 
     if not claude_ok and not codex_ok:
         log("[fatal] both sources failed, preserving existing tokens")
         return 1
 
-    existing = data['currentWeek']['metrics'].get('tokens') or {}
-    new_claude = claude_total if claude_ok else int(existing.get('claude') or 0)
-    new_codex = codex_total if codex_ok else int(existing.get('codex') or 0)
-    new_total = new_claude + new_codex
-
-    data['currentWeek']['metrics']['tokens'] = {
-        'claude': new_claude,
-        'codex': new_codex,
-        'total': new_total,
-        'updatedAt': datetime.now(KST).isoformat(timespec='seconds'),
-    }
-
-    # Backfill any stale weeklyHistory entries (Mac-off-across-Monday case).
+    # Backfill any stale weeklyHistory entries (Mac-off-across-Monday case)
+    # on a scratch copy — the ccusage re-queries take minutes and must not
+    # hold the data.json lock. Only the tokens blocks it changed are merged.
     # Best-effort: unexpected exceptions are logged and don't fail the wrapper.
+    before = store.snapshot()
+    scratch = store.snapshot()
     try:
-        n = backfill_weekly_history(data)
+        n = backfill_weekly_history(scratch, ledger)
         if n:
             log(f"[backfill] updated {n} stale weeklyHistory entries")
     except Exception as exc:  # noqa: BLE001 — last-resort safety net
         log(f"[backfill] unexpected error, skipping: {exc}")
-
-    DATA.write_text(json.dumps(data, indent=2) + '\n')
+    backfilled = _changed_history_tokens(before, scratch)
+
+    with store.transaction() as data:
+        if data['currentWeek'].get('startDate') != start:
+            # Weekly reset ran while ccusage was busy — these totals belong
+            # to the week that was just archived, not the new one.
+            log(f"[skip] currentWeek moved past {start}; not writing tokens")
+            return 1
+        existing = data['currentWeek']['metrics'].get('tokens') or {}
+        new_claude = claude_total if claude_ok else int(existing.get('claude') or 0)
+        new_codex = codex_total if codex_ok else int(existing.get('codex') or 0)
+        new_total = new_claude + new_codex
+
+        data['currentWeek']['metrics']['tokens'] = {
+            'claude': new_claude,
+            'codex': new_codex,
+            'total': new_total,
+            'updatedAt': datetime.now(KST).isoformat(timespec='seconds'),
+        }
+        for entry in data.get('weeklyHistory') or []:
+            tokens = backfilled.get(_history_key(entry))
+            if tokens is not None:
+                entry.setdefault('metrics', {})['tokens'] = tokens
 
     print(
         f"Updated tokens: claude={fmt_b(new_claude)}, "
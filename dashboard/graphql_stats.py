@@ -1,64 +1,89 @@
 #!/usr/bin/env python3
 """GitHub GraphQL API integration for accurate yearly contribution stats.
 
-This module is called by generate_profile_card.py. Past-year stats are
-cached on disk by _yearly_cache (Task 8); this module just builds the
-single aliased GraphQL query and parses the response.
+This module is called by generate_profile_card.py. Past-year stats and
+the current year's final months are cached on disk by _yearly_cache
+(Task 8), the heatmap's per-day counts by
+_contribution_calendar; this module just builds the aliased GraphQL
+queries and parses the responses.
 """
 
 from __future__ import annotations
 import datetime as _dt
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from _graphql_client import post_graphql
-from _yearly_cache import load_cache, save_cache, is_cache_authoritative
+from _yearly_cache import (
+    load_cache, save_cache, is_cache_authoritative, is_month_final, month_key, month_window,
+)
+from _contribution_calendar import KST, apply_days, grid_start, load_calendar, save_calendar
 
 GRAPHQL_URL = "https://api.github.com/graphql"
 CACHE_PATH = Path(__file__).resolve().parent / ".stats_cache.json"
+CALENDAR_PATH = Path(__file__).resolve().parent / ".contribution_calendar.json"
+# contributionsCollection rejects from..to spans over one year; a cold
+# heatmap (53 weeks) takes two aliased windows in the same request.
+MAX_WINDOW_DAYS = 364
 
+STAT_FIELDS = (
+    ("commits", "totalCommitContributions"),
+    ("code_reviews", "totalPullRequestReviewContributions"),
+    ("pull_requests", "totalPullRequestContributions"),
+    ("issues", "totalIssueContributions"),
+)
 
-def _build_query(years):
-    """Build a single GraphQL query with one aliased contributionsCollection per year.
 
-    Returns (query_string, variables_dict).
+def _build_query(windows: List[Tuple[str, str, str]]):
+    """Build a single GraphQL query with one aliased contributionsCollection per window.
+
+    `windows` is [(alias, from_iso, to_iso)]. Returns (query_string, variables_dict).
     """
     aliases = []
     variables = {"username": None}
-    for y in years:
-        from_var, to_var = f"from{y}", f"to{y}"
+    var_decls = ["$username: String!"]
+    for alias, from_iso, to_iso in windows:
+        from_var, to_var = f"from_{alias}", f"to_{alias}"
         aliases.append(
-            f"      y{y}: contributionsCollection(from: ${from_var}, to: ${to_var}) {{\n"
-            f"        totalCommitContributions\n"
-            f"        totalPullRequestContributions\n"
-            f"        totalPullRequestReviewContributions\n"
-            f"        totalIssueContributions\n"
-            f"      }}"
+            f"      {alias}: contributionsCollection(from: ${from_var}, to: ${to_var}) {{\n"
+            + "".join(f"        {field}\n" for _, field in STAT_FIELDS)
+            + "      }"
         )
-        variables[from_var] = f"{y}-01-01T00:00:00Z"
-        variables[to_var] = f"{y}-12-31T23:59:59Z"
+        variables[from_var] = from_iso
+        variables[to_var] = to_iso
+        var_decls.append(f"${from_var}: DateTime!, ${to_var}: DateTime!")
 
-    var_decls = ", ".join(["$username: String!"] +
-                          [f"${f'from{y}'}: DateTime!, ${f'to{y}'}: DateTime!"
-                           for y in years])
     query = (
-        f"query({var_decls}) {{\n"
+        f"query({', '.join(var_decls)}) {{\n"
         f"  user(login: $username) {{\n"
         + "\n".join(aliases) + "\n"
-        f"  }}\n"
-        f"}}\n"
+        "  }\n"
+        "  rateLimit { cost remaining resetAt }\n"
+        "}\n"
     )
     return query, variables
 
 
+def _add(totals: Dict[str, int], entry: Dict[str, Any]) -> None:
+    for key, _ in STAT_FIELDS:
+        totals[key] += int(entry.get(key, 0))
+
+
 def get_github_activity_stats_graphql(
     username: str,
     token: str,
     *,
     current_year: Optional[int] = None,
+    now: Optional[_dt.datetime] = None,
 ):
-    """Sum yearly contributions from 2020 onward, querying only uncached years.
+    """Sum contributions from 2020 onward as cached partitions plus one fresh query.
+
+    Past years and the current year's final months come from the cache;
+    one aliased request covers whatever isn't cached yet plus the open
+    window (current month → Dec 31), so a normal run asks for one window
+    however far into the year it is. A past year whose twelve months are
+    all cached and final is rolled up without a query.
 
     Returns dict {commits, code_reviews, pull_requests, issues} on success,
     None on any API failure. (No silent zero.)
@@ -67,33 +92,56 @@ def get_github_activity_stats_graphql(
         print("[graphql_stats] no token; returning None", file=sys.stderr)
         return None
 
+    now = now or _dt.datetime.now(_dt.timezone.utc)
     if current_year is None:
-        current_year = _dt.datetime.now().year
-    # Fixed floor at 2020 — see T7 rationale (rolling-window phantom-drop bug + caching).
-    all_years = list(range(2020, current_year + 1))
+        current_year = now.year
+    # Months of the current year before this one are closed; from here on is open.
+    if now.year == current_year:
+        open_month = now.month
+    else:
+        open_month = 13 if now.year > current_year else 1
 
     cache = load_cache(CACHE_PATH)
-    cached_years = []
-    fetch_years = []
-    for y in all_years:
+    months = cache.setdefault("months", {})
+    changed = False
+    totals = {key: 0 for key, _ in STAT_FIELDS}
+    windows: List[Tuple[str, str, str]] = []
+
+    # Fixed floor at 2020 — see T7 rationale (rolling-window phantom-drop bug + caching).
+    for y in range(2020, current_year):
         entry = cache["years"].get(str(y))
         if entry and is_cache_authoritative(year=y, current_year=current_year, entry=entry):
-            cached_years.append((y, entry))
-        else:
-            fetch_years.append(y)
+            _add(totals, entry)
+            continue
+        year_months = [months.get(month_key(y, m)) for m in range(1, 13)]
+        if all(e and is_month_final(year=y, month=m, entry=e)
+               for m, e in enumerate(year_months, start=1)):
+            entry = {key: 0 for key, _ in STAT_FIELDS}
+            for e in year_months:
+                _add(entry, e)
+            cache["years"][str(y)] = dict(entry, computed_in_year=current_year)
+            _add(totals, entry)
+            changed = True
+            continue
+        windows.append((f"y{y}", f"{y}-01-01T00:00:00Z", f"{y}-12-31T23:59:59Z"))
 
-    totals = {"commits": 0, "code_reviews": 0, "pull_requests": 0, "issues": 0}
-    for _, entry in cached_years:
-        totals["commits"]       += int(entry.get("commits", 0))
-        totals["code_reviews"]  += int(entry.get("code_reviews", 0))
-        totals["pull_requests"] += int(entry.get("pull_requests", 0))
-        totals["issues"]        += int(entry.get("issues", 0))
+    for m in range(1, min(open_month, 13)):
+        entry = months.get(month_key(current_year, m))
+        if entry and is_month_final(year=current_year, month=m, entry=entry):
+            _add(totals, entry)
+        else:
+            windows.append((f"m{current_year}_{m:02d}", *month_window(current_year, m, m)))
+    if open_month <= 12:
+        windows.append((f"y{current_year}", *month_window(current_year, open_month, 12)))
 
-    if not fetch_years:
-        print("[graphql_stats] all years served from cache; 0 API calls", file=sys.stderr)
+    if not windows:
+        print("[graphql_stats] all partitions served from cache; 0 API calls", file=sys.stderr)
+        if changed:
+            _prune_months(cache)
+            save_cache(CACHE_PATH, cache)
         return totals
 
-    query, variables = _build_query(fetch_years)
+    query, variables = _build_query(windows)
     variables["username"] = username
 
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
@@ -107,25 +155,115 @@ def get_github_activity_stats_graphql(
         print("[graphql_stats] empty user payload; returning None", file=sys.stderr)
         return None
 
-    for y in fetch_years:
-        bucket = user.get(f"y{y}")
+    fetched_at = now.astimezone(_dt.timezone.utc).isoformat(timespec="seconds")
+    for alias, _, _ in windows:
+        bucket = user.get(alias)
         if not bucket:
-            print(f"[graphql_stats] missing y{y}; returning None", file=sys.stderr)
+            print(f"[graphql_stats] missing {alias}; returning None", file=sys.stderr)
             return None
-        c = int(bucket.get("totalCommitContributions", 0))
-        r = int(bucket.get("totalPullRequestReviewContributions", 0))
-        p = int(bucket.get("totalPullRequestContributions", 0))
-        i = int(bucket.get("totalIssueContributions", 0))
-        totals["commits"]       += c
-        totals["code_reviews"]  += r
-        totals["pull_requests"] += p
-        totals["issues"]        += i
-        # only past years go into cache; current year is intentionally skipped
-        if y < current_year:
-            cache["years"][str(y)] = {
-                "commits": c, "code_reviews": r, "pull_requests": p, "issues": i,
-                "computed_in_year": current_year,
-            }
+        entry = {key: int(bucket.get(field, 0)) for key, field in STAT_FIELDS}
+        _add(totals, entry)
+        if alias.startswith("m"):
+            # Closed month: final once fetched FINAL_AFTER past its end.
+            months[alias[1:].replace("_", "-")] = dict(entry, fetched_at=fetched_at)
+        elif int(alias[1:]) < current_year:
+            cache["years"][alias[1:]] = dict(entry, computed_in_year=current_year)
+        # the open window is intentionally not cached
 
+    _prune_months(cache)
     save_cache(CACHE_PATH, cache)
     return totals
+
+
+def _prune_months(cache: Dict[str, Any]) -> None:
+    """Drop month partitions of years that are now cached whole."""
+    months = cache["months"]
+    for key in [k for k in months if k[:4] in cache["years"]]:
+        del months[key]
+
+
+def _build_calendar_query(windows: List[Tuple[_dt.date, _dt.date]]):
+    """One aliased contributionCalendar per inclusive KST day window.
+
+    Returns (query_string, variables_dict) with aliases c0..cN-1.
+    """
+    aliases = []
+    variables = {"username": None}
+    var_decls = ["$username: String!"]
+    for i, (first, last) in enumerate(windows):
+        aliases.append(
+            f"      c{i}: contributionsCollection(from: $from{i}, to: $to{i}) {{\n"
+            f"        contributionCalendar {{ weeks {{ contributionDays {{ date contributionCount }} }} }}\n"
+            f"      }}"
+        )
+        start = _dt.datetime.combine(first, _dt.time.min, tzinfo=KST)
+        end = _dt.datetime.combine(last, _dt.time(23, 59, 59), tzinfo=KST)
+        variables[f"from{i}"] = start.isoformat()
+        variables[f"to{i}"] = end.isoformat()
+        var_decls.append(f"$from{i}: DateTime!, $to{i}: DateTime!")
+    query = (
+        f"query({', '.join(var_decls)}) {{\n"
+        f"  user(login: $username) {{\n"
+        + "\n".join(aliases) + "\n"
+        "  }\n"
+        "  rateLimit { cost remaining resetAt }\n"
+        "}\n"
+    )
+    return query, variables
+
+
+def get_contribution_calendar_graphql(
+    username: str,
+    token: str,
+    *,
+    now: Optional[_dt.datetime] = None,
+) -> Optional[Dict[str, Any]]:
+    """Heatmap calendar (see _contribution_calendar), fetching only open days.
+
+    Days before the cached checkpoint are final and served from disk; one
+    request covers checkpoint..today. Returns the calendar dict, or None on
+    any API failure — an unrefreshed calendar would show stale counts.
+    """
+    now = now or _dt.datetime.now(KST)
+    today = now.astimezone(KST).date()
+    calendar = load_calendar(CALENDAR_PATH, grid_start(today))
+    checkpoint = _dt.date.fromisoformat(calendar["checkpoint"])
+
+    if not token:
+        print("[graphql_stats] no token; returning None", file=sys.stderr)
+        return None
+
+    windows = []
+    first = checkpoint
+    while first <= today:
+        last = min(first + _dt.timedelta(days=MAX_WINDOW_DAYS - 1), today)
+        windows.append((first, last))
+        first = last + _dt.timedelta(days=1)
+    if not windows:
+        return calendar
+    print(f"[graphql_stats] heatmap: {(checkpoint - grid_start(today)).days} days cached, "
+          f"fetching {(today - checkpoint).days + 1}", file=sys.stderr)
+
+    query, variables = _build_calendar_query(windows)
+    variables["username"] = username
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    data, err = post_graphql(GRAPHQL_URL, headers, {"query": query, "variables": variables})
+    if err is not None:
+        print(f"[graphql_stats] calendar API failed ({err.value}); returning None", file=sys.stderr)
+        return None
+
+    user = (data or {}).get("data", {}).get("user", {})
+    days: Dict[str, int] = {}
+    for i, (first, last) in enumerate(windows):
+        bucket = (user or {}).get(f"c{i}")
+        if not bucket:
+            print(f"[graphql_stats] missing c{i}; returning None", file=sys.stderr)
+            return None
+        for week in bucket["contributionCalendar"]["weeks"]:
+            for day in week["contributionDays"]:
+                if first.isoformat() <= day["date"] <= last.isoformat():
+                    days[day["date"]] = int(day["contributionCount"])
+
+    apply_days(calendar, days, today, now)
+    save_calendar(CALENDAR_PATH, calendar)
+    return calendar
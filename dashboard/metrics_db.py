@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""SQLite view of the dashboard metrics (stdlib sqlite3, offline).
+
+Every report re-derives its aggregates by walking and re-sorting the
+weeklyHistory dicts. This module loads the same data into indexed tables
+so ranges, cumulative sums and week-over-week trends are single queries:
+
+  weeks          one row per ISO week id (current + hot + archived), the
+                 flattened metrics plus the entry JSON as stored (doc)
+  tokens         weekly token totals, keyed by week
+  daily_metrics  per-day values (commits from the commit calendar)
+  daily_tokens   per-day, per-source tokens from the token ledger
+  week_metrics   view: weeks joined with tokens — what the queries read
+
+data.json stays the source of truth. import_data() rebuilds the tables
+from it (plus the history archive, ledger and commit calendar);
+export_data() turns them back into a data.json document — the stored
+docs make that round trip lossless. The import records a digest of the
+data.json it read, and `export` refuses to overwrite a data.json that has
+moved on since: re-import first.
+
+generate_svg reads its week-over-week trend arrows from an in-memory
+copy (load_memory + current_trends) on every dashboard render.
+
+Usage:
+    python3 dashboard/metrics_db.py import            # data.json → dashboard/metrics.db
+    python3 dashboard/metrics_db.py export            # metrics.db → data.json
+    python3 dashboard/metrics_db.py totals            # all-time sums per metric
+"""
+
+from __future__ import annotations
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from _build_manifest import input_digest
+from _commit_calendar import load_calendar
+from _data_store import get_store
+from _history_archive import HOT_WEEKS, HistoryArchive
+from _token_ledger import TokenLedger
+
+DB_PATH = Path('dashboard/metrics.db')
+CALENDAR_PATH = Path('dashboard/.commit_calendar.json')
+LEDGER_PATH = Path('dashboard/token_ledger.jsonl')
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS weeks (
+    week          TEXT PRIMARY KEY,
+    start_date    TEXT,
+    end_date      TEXT,
+    is_current    INTEGER NOT NULL DEFAULT 0,
+    commits       INTEGER NOT NULL DEFAULT 0,
+    instagram     INTEGER NOT NULL DEFAULT 0,
+    tiktok        INTEGER NOT NULL DEFAULT 0,
+    hellotalk     INTEGER NOT NULL DEFAULT 0,
+    social        INTEGER NOT NULL DEFAULT 0,
+    user_sessions INTEGER NOT NULL DEFAULT 0,
+    cto_meetings  INTEGER NOT NULL DEFAULT 0,
+    blog_posts    INTEGER NOT NULL DEFAULT 0,
+    running       INTEGER NOT NULL DEFAULT 0,
+    gym           INTEGER NOT NULL DEFAULT 0,
+    workouts      INTEGER NOT NULL DEFAULT 0,
+    doc           TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS weeks_by_start ON weeks(start_date);
+CREATE TABLE IF NOT EXISTS tokens (
+    week       TEXT PRIMARY KEY REFERENCES weeks(week),
+    claude     INTEGER NOT NULL DEFAULT 0,
+    codex      INTEGER NOT NULL DEFAULT 0,
+    total      INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS daily_metrics (
+    date   TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value  INTEGER NOT NULL,
+    PRIMARY KEY (date, metric)
+);
+CREATE TABLE IF NOT EXISTS daily_tokens (
+    date        TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    tokens      INTEGER NOT NULL,
+    PRIMARY KEY (date, source)
+);
+CREATE VIEW IF NOT EXISTS week_metrics AS
+    SELECT w.*, COALESCE(t.claude, 0) AS tokens_claude,
+           COALESCE(t.codex, 0) AS tokens_codex, COALESCE(t.total, 0) AS tokens_total
+    FROM weeks w LEFT JOIN tokens t USING (week);
+"""
+
+# Column names double as the public metric names; queries only ever
+# interpolate names from this tuple.
+METRICS = ('commits', 'instagram', 'tiktok', 'hellotalk', 'social', 'user_sessions',
+           'cto_meetings', 'blog_posts', 'running', 'gym', 'workouts',
+           'tokens_claude', 'tokens_codex', 'tokens_total')
+
+
+def connect(path: Path = DB_PATH) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    conn.execute("INSERT OR IGNORE INTO meta VALUES ('schemaVersion', ?)", (str(SCHEMA_VERSION),))
+    return conn
+
+
+def _iso(value: Any) -> Optional[str]:
+    """'YYYY-MM-DD' for ISO or legacy MM/DD/YYYY dates (sortable), else None."""
+    for fmt in ('%Y-%m-%d', '%m/%d/%Y'):
+        try:
+            return datetime.strptime(str(value), fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def _int(value: Any) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _split(value: Any, keys: Tuple[str, ...]) -> Tuple[Dict[str, int], int]:
+    # Legacy update_data.py entries store socialContent/workouts as one int.
+    if isinstance(value, dict):
+        parts = {k: _int(value.get(k)) for k in keys}
+        return parts, sum(parts.values())
+    return {k: 0 for k in keys}, _int(value)
+
+
+def _week_row(entry: Dict[str, Any], is_current: bool) -> Tuple[Any, ...]:
+    m = entry.get('metrics') or {}
+    social, social_total = _split(m.get('socialContent'), ('instagram', 'tiktok', 'hellotalk'))
+    workouts, workouts_total = _split(m.get('workouts'), ('running', 'gym'))
+    return (
+        entry.get('week'), _iso(entry.get('startDate')), _iso(entry.get('endDate')),
+        int(is_current), _int(m.get('commits')),
+        social['instagram'], social['tiktok'], social['hellotalk'], social_total,
+        _int(m.get('userSessions')), _int(m.get('ctoMeetings')), _int(m.get('blogPosts')),
+        workouts['running'], workouts['gym'], workouts_total,
+        json.dumps(entry, separators=(',', ':')),
+    )
+
+
+def _week_id(entry: Dict[str, Any]) -> Optional[str]:
+    if entry.get('week'):
+        return entry['week']
+    start = _iso(entry.get('startDate'))
+    if start is None:
+        return None
+    d = datetime.strptime(start, '%Y-%m-%d')
+    return f"{d.year}-W{d.isocalendar()[1]:02d}"  # check_weekly_reset's id rule
+
+
+def import_data(conn: sqlite3.Connection, data: Dict[str, Any],
+                archive: Optional[HistoryArchive] = None,
+                ledger_path: Optional[Path] = LEDGER_PATH,
+                calendar_path: Optional[Path] = CALENDAR_PATH) -> int:
+    """Replace the tables' contents with `data` (+ archive, ledger, calendar).
+
+    Returns the number of weeks imported.
+    """
+    history = list(data.get('weeklyHistory') or [])
+    hot = {e.get('week') for e in history}
+    if archive is not None:
+        history += [e for e in archive.entries() if e.get('week') not in hot]
+    current = dict(data.get('currentWeek') or {})
+    entries = [(e, False) for e in history]
+    if current:
+        entries.append((current, True))
+
+    with conn:
+        for table in ('tokens', 'weeks', 'daily_metrics', 'daily_tokens', 'meta'):
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("INSERT INTO meta VALUES ('schemaVersion', ?)", (str(SCHEMA_VERSION),))
+        top = {k: v for k, v in data.items() if k not in ('currentWeek', 'weeklyHistory')}
+        conn.execute("INSERT INTO meta VALUES ('document', ?)",
+                     (json.dumps({'keys': list(data), 'values': top}),))
+        conn.execute("INSERT INTO meta VALUES ('sourceDigest', ?)", (input_digest(data),))
+        count = 0
+        for entry, is_current in entries:
+            week = _week_id(entry)
+            if week is None:
+                continue
+            # The current week's doc carries no 'week' key; keep it as stored.
+            row = _week_row(entry, is_current)
+            conn.execute(f"INSERT OR REPLACE INTO weeks VALUES ({','.join('?' * len(row))})",
+                         (week,) + row[1:])
+            tokens = (entry.get('metrics') or {}).get('tokens')
+            if isinstance(tokens, dict):
+                conn.execute("INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?, ?)",
+                             (week, _int(tokens.get('claude')), _int(tokens.get('codex')),
+                              _int(tokens.get('total')), tokens.get('updatedAt')))
+            count += 1
+        if calendar_path is not None:
+            days = load_calendar(calendar_path)['days']
+            conn.executemany("INSERT INTO daily_metrics VALUES (?, 'commits', ?)",
+                             [(d, _int(e.get('commits'))) for d, e in days.items()
+                              if isinstance(e, dict)])
+        if ledger_path is not None and ledger_path.exists():
+            ledger = TokenLedger(ledger_path)
+            conn.executemany("INSERT INTO daily_tokens VALUES (?, ?, ?)",
+                             [(d.isoformat(), source, n) for (d, source), n in ledger.items()])
+    return count
+
+
+def source_digest(conn: sqlite3.Connection) -> Optional[str]:
+    """input_digest of the data.json document the tables were imported from."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'sourceDigest'").fetchone()
+    return row['value'] if row else None
+
+
+def load_memory(data: Dict[str, Any], archive: Optional[HistoryArchive] = None) -> sqlite3.Connection:
+    """Throwaway in-memory database of `data` (no ledger or calendar) for one report."""
+    conn = connect(Path(':memory:'))
+    import_data(conn, data, archive=archive, ledger_path=None, calendar_path=None)
+    return conn
+
+
+def export_data(conn: sqlite3.Connection, hot_weeks: int = HOT_WEEKS) -> Dict[str, Any]:
+    """data.json document: currentWeek plus the newest `hot_weeks` history entries."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'document'").fetchone()
+    document = json.loads(row['value']) if row else {'keys': [], 'values': {}}
+    current = conn.execute("SELECT doc FROM weeks WHERE is_current = 1").fetchone()
+    history = [json.loads(r['doc']) for r in conn.execute(
+        "SELECT doc FROM weeks WHERE is_current = 0 "
+        "ORDER BY start_date DESC, week DESC LIMIT ?", (hot_weeks,))]
+    parts = dict(document['values'])
+    if current is not None:
+        parts['currentWeek'] = json.loads(current['doc'])
+    parts['weeklyHistory'] = history
+    keys = document['keys'] or list(parts)
+    out = {k: parts[k] for k in keys if k in parts}
+    out.update({k: v for k, v in parts.items() if k not in out})
+    return out
+
+
+def _metric(name: str) -> str:
+    if name not in METRICS:
+        raise ValueError(f"unknown metric {name!r}; choose from {', '.join(METRICS)}")
+    return name
+
+
+def weekly_series(conn: sqlite3.Connection, metric: str, start: Optional[str] = None,
+                  end: Optional[str] = None, include_current: bool = True) -> List[Tuple[str, int]]:
+    """[(week, value)] oldest first, for weeks starting within [start, end] (ISO dates)."""
+    col = _metric(metric)
+    sql = f"SELECT week, {col} AS v FROM week_metrics WHERE start_date BETWEEN ? AND ?"
+    if not include_current:
+        sql += " AND is_current = 0"
+    rows = conn.execute(sql + " ORDER BY start_date",
+                        (start or '0000-00-00', end or '9999-99-99'))
+    return [(r['week'], r['v']) for r in rows]
+
+
+def cumulative(conn: sqlite3.Connection, metric: str, start: Optional[str] = None,
+               end: Optional[str] = None) -> List[Tuple[str, int]]:
+    """[(week, running total)] oldest first — a window-function query."""
+    col = _metric(metric)
+    rows = conn.execute(
+        f"SELECT week, SUM({col}) OVER (ORDER BY start_date) AS v FROM week_metrics "
+        "WHERE start_date BETWEEN ? AND ? ORDER BY start_date",
+        (start or '0000-00-00', end or '9999-99-99'))
+    return [(r['week'], r['v']) for r in rows]
+
+
+def trend(conn: sqlite3.Connection, metric: str, week: str) -> Optional[Tuple[int, Optional[int]]]:
+    """(value in `week`, value in the week before it) or None if `week` is unknown."""
+    col = _metric(metric)
+    row = conn.execute(
+        f"SELECT v, prev FROM (SELECT week, {col} AS v, "
+        f"LAG({col}) OVER (ORDER BY start_date) AS prev FROM week_metrics) WHERE week = ?",
+        (week,)).fetchone()
+    return (row['v'], row['prev']) if row else None
+
+
+def current_trends(conn: sqlite3.Connection,
+                   metrics: Iterable[str]) -> Dict[str, Tuple[int, Optional[int]]]:
+    """{metric: (current week's value, the previous week's)} in one LAG query.
+
+    Empty if there is no current week; the previous value is None when no
+    earlier week is stored.
+    """
+    cols = [_metric(m) for m in metrics]
+    lags = ', '.join(f"{c}, LAG({c}) OVER (ORDER BY start_date) AS prev_{c}" for c in cols)
+    row = conn.execute(f"SELECT * FROM (SELECT is_current, {lags} FROM week_metrics) "
+                       "WHERE is_current = 1").fetchone()
+    return {c: (row[c], row[f'prev_{c}']) for c in cols} if row else {}
+
+
+def totals(conn: sqlite3.Connection, start: Optional[str] = None,
+           end: Optional[str] = None) -> Dict[str, int]:
+    """Sum of every metric over weeks starting within [start, end]."""
+    cols = ', '.join(f"COALESCE(SUM({m}), 0) AS {m}" for m in METRICS)
+    row = conn.execute(f"SELECT {cols} FROM week_metrics WHERE start_date BETWEEN ? AND ?",
+                       (start or '0000-00-00', end or '9999-99-99')).fetchone()
+    return {m: row[m] for m in METRICS}
+
+
+def daily_range(conn: sqlite3.Connection, table: str, start: str, end: str) -> Iterable[sqlite3.Row]:
+    if table not in ('daily_metrics', 'daily_tokens'):
+        raise ValueError(f"unknown daily table {table!r}")
+    return conn.execute(f"SELECT * FROM {table} WHERE date BETWEEN ? AND ? ORDER BY date",
+                        (start, end)).fetchall()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in ('import', 'export', 'totals'):
+        print(__doc__.strip().split('Usage:')[1], file=sys.stderr)
+        return 2
+    conn = connect()
+    try:
+        if argv[0] == 'import':
+            n = import_data(conn, get_store().snapshot(), archive=HistoryArchive())
+            print(f"Imported {n} weeks into {DB_PATH}")
+        elif argv[0] == 'export':
+            exported = export_data(conn)
+            with get_store().transaction() as data:
+                if source_digest(conn) != input_digest(data):
+                    print(f"{DB_PATH} was imported from an older data.json; "
+                          "refusing to overwrite it — run `import` first", file=sys.stderr)
+                    return 1
+                data.clear()
+                data.update(exported)
+            with conn:
+                conn.execute("UPDATE meta SET value = ? WHERE key = 'sourceDigest'",
+                             (input_digest(exported),))
+            print(f"Exported {len(exported.get('weeklyHistory', []))} history weeks to data.json")
+        else:
+            for metric, value in totals(conn).items():
+                print(f"{metric:<14} {value:,}")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Run a chain of dashboard scripts as named stages in ONE interpreter.
+
+The workflows used to start a fresh python3 per script, so every step
+re-imported requests, re-parsed data.json and reopened the GraphQL
+connection. Here the stages share the process: one DataStore parse of
+data.json (re-read only if a stage actually wrote it), one pooled GraphQL
+session, one import of each module, and one README.md write — the README
+stages patch their sections in memory and _readme flushes them at the end.
+
+Usage:
+    python3 dashboard/pipeline.py weekly-reset
+    python3 dashboard/pipeline.py dashboard
+    echo "1 0 0 2 0 0 1 1" | python3 dashboard/pipeline.py slack
+    python3 dashboard/pipeline.py --list
+
+Exit codes keep the per-script semantics the workflows branch on:
+  - A gate stage (check_weekly_reset) ends the run with its own code:
+    0 = reset happened → the remaining stages run and the pipeline exits 0,
+    1 = same week → nothing else to do, the pipeline exits 1.
+  - Any other stage failing (returns False / non-zero, or raises) stops
+    the run with STAGE_FAILED, so the workflow can tell "no reset" (1)
+    from "something broke" (2).
+"""
+
+from __future__ import annotations
+import sys
+import time
+import traceback
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from _build_manifest import get_manifest
+from _readme import get_readme
+
+STAGE_FAILED = 2
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[[], object]
+    gate: bool = False  # non-zero exit ends the pipeline with that code
+
+
+def _exit_code(result) -> int:
+    """Map a stage's return value (None/bool/int) to a process exit code."""
+    if result is None or result is True:
+        return 0
+    if result is False:
+        return 1
+    return int(result)
+
+
+def _call_script(fn: Callable[[], object]) -> int:
+    # Several scripts report through sys.exit(); keep that as a code
+    # instead of ending the whole pipeline.
+    try:
+        return _exit_code(fn())
+    except SystemExit as exc:
+        return _exit_code(exc.code)
+
+
+def _check_weekly_reset():
+    from check_weekly_reset import check_and_reset_weekly_data
+    return check_and_reset_weekly_data()
+
+
+def _generate_weekly_history():
+    from generate_weekly_history import generate_all_history_svgs
+    return generate_all_history_svgs()
+
+
+def _update_readme_history():
+    from update_readme_history import update_readme_with_history
+    return update_readme_with_history()
+
+
+def _update_readme_charts():
+    from update_readme_charts import update_readme_with_charts
+    print("📊 Updating README with progress charts...\n")
+    return update_readme_with_charts()
+
+
+def _generate_svg():
+    from generate_svg import generate_dashboard_svg
+    return generate_dashboard_svg()
+
+
+def _slack_update():
+    import slack_update
+    return slack_update.main([])
+
+
+PIPELINES: Dict[str, List[Stage]] = {
+    'weekly-reset': [
+        Stage('check_weekly_reset', _check_weekly_reset, gate=True),
+        Stage('generate_weekly_history', _generate_weekly_history),
+        Stage('update_readme_history', _update_readme_history),
+        Stage('update_readme_charts', _update_readme_charts),
+    ],
+    'dashboard': [
+        Stage('generate_svg', _generate_svg),
+        Stage('update_readme_history', _update_readme_history),
+        Stage('update_readme_charts', _update_readme_charts),
+    ],
+    'slack': [
+        Stage('slack_update', _slack_update),
+        Stage('generate_svg', _generate_svg),
+    ],
+}
+
+
+def run_pipeline(stages: List[Stage]) -> int:
+    """Run stages in order, print per-stage timings, return the exit code."""
+    timings = []
+    code = 0
+    with get_readme().deferred():
+        for stage in stages:
+            print(f"\n▶ [{stage.name}]", flush=True)
+            started = time.perf_counter()
+            try:
+                stage_code = _call_script(stage.run)
+            except Exception:  # noqa: BLE001 — report, then stop with STAGE_FAILED
+                traceback.print_exc()
+                stage_code = STAGE_FAILED
+            timings.append((stage.name, time.perf_counter() - started, stage_code))
+            if stage_code != 0:
+                code = stage_code if stage.gate else STAGE_FAILED
+                break
+
+    print("\n[pipeline] stage timings:", file=sys.stderr)
+    for name, seconds, stage_code in timings:
+        print(f"[pipeline]   {name:<26} {seconds:7.2f}s  exit {stage_code}", file=sys.stderr)
+    skipped = [s.name for s in stages[len(timings):]]
+    if skipped:
+        print(f"[pipeline]   skipped: {', '.join(skipped)}", file=sys.stderr)
+    print(f"[pipeline]   artifacts {get_manifest().report()}", file=sys.stderr)
+    print(f"[pipeline]   total {sum(t for _, t, _ in timings):.2f}s → exit {code}",
+          file=sys.stderr)
+    return code
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] == '--list':
+        for name, stages in PIPELINES.items():
+            print(f"{name}: {' → '.join(s.name for s in stages)}")
+        return 0 if argv else STAGE_FAILED
+    name = argv[0]
+    if name not in PIPELINES:
+        print(f"unknown pipeline {name!r}; choose from {', '.join(PIPELINES)}",
+              file=sys.stderr)
+        return STAGE_FAILED
+    return run_pipeline(PIPELINES[name])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,6 +12,8 @@ from datetime import datetime, timezone, timedelta
 
 import requests
 
+from _data_store import get_store
+
 # KST = UTC + 9 hours
 KST = timezone(timedelta(hours=9))
 
@@ -82,31 +84,29 @@ def parse_metrics(text):
 
 def update_data(metrics):
     """Update data.json by adding new metrics to existing values"""
-    with open('dashboard/data.json', 'r') as f:
-        data = json.load(f)
-
-    # Get current values
-    current = data['currentWeek']['metrics']
-    current_social = current['socialContent']
-    current_workouts = current['workouts']
-
-    # Add new metrics to existing values (additive approach)
-    data['currentWeek']['metrics']['socialContent'] = {
-        'instagram': current_social['instagram'] + metrics['instagram'],
-        'tiktok': current_social['tiktok'] + metrics['tiktok'],
-        'hellotalk': current_social['hellotalk'] + metrics['hellotalk']
-    }
-    data['currentWeek']['metrics']['userSessions'] = current['userSessions'] + metrics['usertalks']
-    data['currentWeek']['metrics']['ctoMeetings'] = current['ctoMeetings'] + metrics['coffeechats']
-    data['currentWeek']['metrics']['blogPosts'] = current['blogPosts'] + metrics['blogposts']
-    data['currentWeek']['metrics']['workouts'] = {
-        'running': current_workouts['running'] + metrics['running'],
-        'gym': current_workouts['gym'] + metrics['gym']
-    }
-    data['lastUpdated'] = datetime.now(KST).strftime("%Y-%m-%d")
-
-    with open('dashboard/data.json', 'w') as f:
-        json.dump(data, f, indent=2)
+    # Locked read-modify-write: the cron dashboard job or the token
+    # wrapper may be rewriting data.json right now — re-read under the
+    # lock so their changes and these increments both survive.
+    with get_store().transaction() as data:
+        # Get current values
+        current = data['currentWeek']['metrics']
+        current_social = current['socialContent']
+        current_workouts = current['workouts']
+
+        # Add new metrics to existing values (additive approach)
+        data['currentWeek']['metrics']['socialContent'] = {
+            'instagram': current_social['instagram'] + metrics['instagram'],
+            'tiktok': current_social['tiktok'] + metrics['tiktok'],
+            'hellotalk': current_social['hellotalk'] + metrics['hellotalk']
+        }
+        data['currentWeek']['metrics']['userSessions'] = current['userSessions'] + metrics['usertalks']
+        data['currentWeek']['metrics']['ctoMeetings'] = current['ctoMeetings'] + metrics['coffeechats']
+        data['currentWeek']['metrics']['blogPosts'] = current['blogPosts'] + metrics['blogposts']
+        data['currentWeek']['metrics']['workouts'] = {
+            'running': current_workouts['running'] + metrics['running'],
+            'gym': current_workouts['gym'] + metrics['gym']
+        }
+        data['lastUpdated'] = datetime.now(KST).strftime("%Y-%m-%d")
 
     # Return both added and new totals for confirmation message
     new_totals = {
@@ -142,9 +142,7 @@ def send_confirmation_message(webhook_url, result):
 
     # Read commits from data.json — never call the API here.
     try:
-        with open('dashboard/data.json', 'r') as f:
-            data = json.load(f)
-        commits = data['currentWeek']['metrics'].get('commits', 0)
+        commits = get_store().current_metrics().get('commits', 0)
     except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
         # Should not happen — update_data() just wrote this file.
         # If it does, log loudly and fall back to 0 so the slack
@@ -185,9 +183,10 @@ Keep building!"""
     except Exception as e:
         print(f"Error sending confirmation: {e}")
 
-if __name__ == "__main__":
+def main(argv=None):
     # Read from stdin or argument
-    text = sys.stdin.read() if not sys.stdin.isatty() else ' '.join(sys.argv[1:])
+    argv = sys.argv[1:] if argv is None else argv
+    text = sys.stdin.read() if not sys.stdin.isatty() else ' '.join(argv)
 
     if text:
         metrics = parse_metrics(text)
@@ -199,3 +198,7 @@ if __name__ == "__main__":
             send_confirmation_message(webhook_url, result)
     else:
         print("Usage: echo '1 0 0 2 0 0 1 1' | python3 slack_update.py")
+    return 0
+
+if __name__ == "__main__":
+    main()
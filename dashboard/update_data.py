@@ -9,6 +9,8 @@ import requests
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
+from _history_archive import HOT_WEEKS, archive_and_trim
+
 # KST = UTC + 9 hours
 KST = timezone(timedelta(hours=9))
 
@@ -182,8 +184,8 @@ def main():
         }
         data['weeklyHistory'].insert(0, history_entry)
 
-        # Keep only last 8 weeks
-        data['weeklyHistory'] = data['weeklyHistory'][:8]
+        # Older weeks move to the history archive instead of being dropped
+        archive_and_trim(data, keep=HOT_WEEKS)
 
     # Save updated data
     collector.save_data(data)
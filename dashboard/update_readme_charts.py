@@ -1,40 +1,33 @@
 #!/usr/bin/env python3
 """
 Update README.md with progress charts
-Inserts cumulative progress charts before Tech Stack section, and a
-weekly Token Usage section between Consistent enough? and Weekly History.
+Fills the README's `charts` section (Consistent enough?) and the weekly
+`tokens` section (Token Usage) that follows it; see _readme for placement.
 """
 
-import json
-import re
-from pathlib import Path
+from _data_store import get_store
+from _build_manifest import get_manifest, input_digest
+from _readme import LAYOUT_VERSION, get_readme
 from generate_progress_chart import (
     load_weekly_data,
-    generate_chart_url,
+    save_progress_chart_svg,
     save_sparklines_svg,
-    generate_tokens_chart_url,
+    save_tokens_chart_svg,
 )
 
+# Bump when the section markup changes so the build manifest re-renders.
+CHARTS_SECTION_TEMPLATE_VERSION = 2
 
-def _insert_or_replace(readme_content, section_text, existing_pattern, anchors):
-    """Replace an existing section matching `existing_pattern`, or insert
-    `section_text` before the first anchor heading that appears in the
-    README. Anchors is a list of heading strings tried in order. Falls
-    back to appending at EOF."""
-    if re.search(existing_pattern, readme_content, re.DOTALL):
-        return re.sub(existing_pattern, section_text, readme_content, flags=re.DOTALL), "replaced"
-    for anchor in anchors:
-        idx = readme_content.find(anchor)
-        if idx != -1:
-            return readme_content[:idx] + section_text + readme_content[idx:], f"inserted before {anchor}"
-    return readme_content + '\n\n' + section_text, "appended"
+RAW_DASHBOARD_URL = "https://raw.githubusercontent.com/Piesson/Piesson/main/dashboard"
+PROGRESS_CHART_URL = f"{RAW_DASHBOARD_URL}/progress_chart.svg"
+TOKENS_CHART_URL = f"{RAW_DASHBOARD_URL}/tokens_chart.svg"
 
 
 def update_readme_with_charts():
     """Update README.md with progress charts"""
-    readme_path = Path('README.md')
+    readme = get_readme()
 
-    if not readme_path.exists():
+    if not readme.exists():
         print("❌ README.md not found")
         return False
 
@@ -44,17 +37,27 @@ def update_readme_with_charts():
         print("❌ No weekly data to generate charts")
         return False
 
-    combined_url = generate_chart_url(data)
+    combined_url = PROGRESS_CHART_URL if save_progress_chart_svg(data) else None
     save_sparklines_svg(data)
 
-    raw_path = Path('dashboard/data.json')
-    raw_data = json.loads(raw_path.read_text()) if raw_path.exists() else None
-    tokens_url = generate_tokens_chart_url(raw_data) if raw_data else None
+    store = get_store()
+    raw_data = store.data if store.exists() else None
+    tokens_url = TOKENS_CHART_URL if raw_data and save_tokens_chart_svg(raw_data) else None
 
     from datetime import datetime, timedelta, timezone
     KST = timezone(timedelta(hours=9))
     current_date = datetime.now(KST).strftime('%m/%d/%y')
 
+    # The two sections are fully determined by the chart URLs + date label;
+    # the charts themselves are static files the URLs point at.
+    manifest = get_manifest()
+    digest = input_digest(CHARTS_SECTION_TEMPLATE_VERSION, LAYOUT_VERSION,
+                          combined_url, tokens_url, current_date)
+    if manifest.is_fresh('README.md#charts', digest, readme.path,
+                         readme.part('charts', 'tokens')):
+        print("✓ Chart sections unchanged, skipped")
+        return True
+
     charts_section = f"""# Consistent enough?
 
 <p align="center">
@@ -71,38 +74,10 @@ def update_readme_with_charts():
 </details>
 
 <div align="right"><sub>updated at {current_date}</sub></div>
-
 """
-
-    with open(readme_path, 'r') as f:
-        readme_content = f.read()
-
-    old_pattern = r'# Cumulative Progress\n\n.*?(?=\n# Tech Stack)'
-    readme_content = re.sub(old_pattern, '', readme_content, flags=re.DOTALL)
-
-    old_pattern2 = r'## Individual Metrics\n\n.*?(?=\n# Tech Stack)'
-    readme_content = re.sub(old_pattern2, '', readme_content, flags=re.DOTALL)
-
-    charts_pattern = r'# Consistent enough\?\n\n.*?</details>\n\n<div align="right"><sub>updated at \d{2}/\d{2}/\d{2}</sub></div>\n\n'
-
-    readme_content, charts_action = _insert_or_replace(
-        readme_content,
-        section_text=charts_section,
-        existing_pattern=charts_pattern,
-        anchors=['# Token Usage', '# AI Tokens', '# Weekly History', '# Tech Stack'],
-    )
+    charts_action = "updated" if readme.set_section('charts', charts_section) else "unchanged"
     print(f"✅ Consistent enough? section: {charts_action}")
 
-    # Migration: strip the legacy '# AI Tokens' heading so the renamed
-    # '# Token Usage' section takes its place. Safe to run every time —
-    # the regex simply matches nothing once the section is renamed.
-    legacy_tokens_pattern = r'# AI Tokens\n\n.*?</p>\n\n<div align="right"><sub>updated at \d{2}/\d{2}/\d{2}</sub></div>\n\n'
-    if re.search(legacy_tokens_pattern, readme_content, re.DOTALL):
-        readme_content = re.sub(legacy_tokens_pattern, '', readme_content, flags=re.DOTALL)
-        print("✅ Legacy AI Tokens section: removed (renamed to Token Usage)")
-
-    tokens_pattern = r'# Token Usage\n\n.*?</p>\n\n<div align="right"><sub>updated at \d{2}/\d{2}/\d{2}</sub></div>\n\n'
-
     if tokens_url:
         tokens_section = f"""# Token Usage
 
@@ -111,25 +86,16 @@ def update_readme_with_charts():
 </p>
 
 <div align="right"><sub>updated at {current_date}</sub></div>
-
 """
-        readme_content, tokens_action = _insert_or_replace(
-            readme_content,
-            section_text=tokens_section,
-            existing_pattern=tokens_pattern,
-            anchors=['# Weekly History', '# Tech Stack'],
-        )
+        tokens_action = "updated" if readme.set_section('tokens', tokens_section) else "unchanged"
         print(f"✅ Token Usage section: {tokens_action}")
+    elif readme.set_section('tokens', ''):
+        # No tracked weeks yet — empty any stale section so the README stays clean.
+        print("✅ Token Usage section: removed (no tracked weeks)")
     else:
-        # No tracked weeks yet — strip any stale section so the README stays clean.
-        if re.search(tokens_pattern, readme_content, re.DOTALL):
-            readme_content = re.sub(tokens_pattern, '', readme_content, flags=re.DOTALL)
-            print("✅ Token Usage section: removed (no tracked weeks)")
-        else:
-            print("ℹ️  Token Usage section skipped (no tracked weeks yet)")
-
-    with open(readme_path, 'w') as f:
-        f.write(readme_content)
+        print("ℹ️  Token Usage section skipped (no tracked weeks yet)")
+
+    readme.save(manifest, 'README.md#charts', digest, ('charts', 'tokens'))
 
     return True
 
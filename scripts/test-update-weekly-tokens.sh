@@ -53,6 +53,7 @@ setup() {
     && mkdir -p dashboard scripts \
     && printf '{"lastUpdated":"2026-01-01","currentWeek":{"startDate":"%s","endDate":"%s","metrics":{"commits":0,"socialContent":{"instagram":0,"tiktok":0,"hellotalk":0},"userSessions":0,"ctoMeetings":0,"blogPosts":0,"workouts":{"running":0,"gym":0},"tokens":{"claude":0,"codex":0,"total":0,"updatedAt":null}}},"weeklyHistory":[]}\n' "$MONDAY" "$SUNDAY" > dashboard/data.json \
     && cp "$TOKENS_PY" dashboard/get_weekly_tokens.py \
+    && cp "$(dirname "$TOKENS_PY")"/_*.py "$(dirname "$TOKENS_PY")"/ccusage_tool.py dashboard/ \
     && cp "$WRAPPER_SRC" scripts/update-weekly-tokens.sh \
     && git add -A && git commit -qm up-init \
     && git push -q ../up.git HEAD:refs/heads/main)
@@ -76,6 +77,8 @@ run_wrapper() {
     PIESSON_LOG_DIR="$T/logs" \
     PIESSON_CACHE_DIR="$T/cache" \
     PIESSON_PATH_PREFIX="$SHIM" \
+    TOKENS_READER=cli \
+    CCUSAGE_CACHE_DIR= \
     bash "$T/vault/apps/piesson/scripts/update-weekly-tokens.sh" > "$T/run.log" 2>&1)
   echo $?
 }
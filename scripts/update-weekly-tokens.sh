@@ -7,7 +7,8 @@
 #      subtree reflects upstream's latest reset state
 #   3. run dashboard/get_weekly_tokens.py which reads currentWeek dates
 #      from data.json and writes claude/codex/total tokens back to it
-#   4. commit only dashboard/data.json (never sweeps other dirty files)
+#   4. commit only dashboard/data.json + token_ledger.jsonl (never sweeps
+#      other dirty files)
 #   5. subtree-deploy.sh to push vault -> Piesson/Piesson
 
 # ── Self-update preamble ──────────────────────────────────────────────────
@@ -407,10 +408,12 @@ if [ "${pull_rc}" -ne 0 ]; then
     #   - dashboard/data.json               (slack_response.yml, update_dashboard.yml)
     #   - dashboard/weekly_dashboard.svg    (generate_svg.py)
     #   - dashboard/progress_sparklines.svg (generate_progress_chart.py)
+    #   - dashboard/progress_chart.svg      (generate_progress_chart.py)
+    #   - dashboard/tokens_chart.svg        (generate_progress_chart.py)
     #   - dashboard/history/**              (generate_weekly_history.py on weekly reset)
     #   - profile-summary-card-output/**    (vn7n24fzkq action + generate_profile_card.py)
     #   - README.md                         (update_readme_*.py)
-    whitelist_re='^apps/piesson/(dashboard/(data\.json$|weekly_dashboard\.svg$|progress_sparklines\.svg$|history/)|profile-summary-card-output/|README\.md$)'
+    whitelist_re='^apps/piesson/(dashboard/(data\.json$|weekly_dashboard\.svg$|progress_sparklines\.svg$|progress_chart\.svg$|tokens_chart\.svg$|history/)|profile-summary-card-output/|README\.md$)'
     unexpected=$(printf '%s\n' "${unresolved}" | grep -v -E "${whitelist_re}" || true)
 
     if [ -n "${unexpected}" ]; then
@@ -437,12 +440,23 @@ fi
 
 echo "[$(ts)] step 3: run dashboard/get_weekly_tokens.py"
 cd "${VAULT}/apps/piesson"
-python3 dashboard/get_weekly_tokens.py
+# The usage-log checkpoint and the managed ccusage install live with the
+# wrapper's cache, outside the worktree that gets reset/cleaned above.
+mkdir -p "${CACHE_ROOT}"
+USAGE_CHECKPOINT_PATH="${CACHE_ROOT}/usage-checkpoint.json" \
+CCUSAGE_CACHE_DIR="${CCUSAGE_CACHE_DIR-${CACHE_ROOT}/ccusage}" \
+    python3 dashboard/get_weekly_tokens.py
 
-echo "[$(ts)] step 4: scoped commit of data.json (if changed)"
+echo "[$(ts)] step 4: scoped commit of data.json + token ledger (if changed)"
 cd "${VAULT}"
-if ! git diff --quiet -- apps/piesson/dashboard/data.json; then
-    git commit --only apps/piesson/dashboard/data.json \
+TOKEN_FILES=(apps/piesson/dashboard/data.json)
+# The ledger is created on the first run; stage it so a new file commits too.
+if [ -f apps/piesson/dashboard/token_ledger.jsonl ]; then
+    TOKEN_FILES+=(apps/piesson/dashboard/token_ledger.jsonl)
+    git add -- apps/piesson/dashboard/token_ledger.jsonl
+fi
+if ! git diff --quiet HEAD -- "${TOKEN_FILES[@]}"; then
+    git commit --only "${TOKEN_FILES[@]}" \
         -m "chore(piesson): update weekly token usage"
     echo "[$(ts)] committed"
 else
@@ -1 +1,26 @@
-# Empty - marks tests/ as a package
+"""Test package setup, run before any test module under pytest or unittest.
+
+Puts dashboard/ on sys.path and sets env defaults that keep tests away
+from the committed caches. Shared helpers live in conftest.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Make dashboard/ importable from tests/
+_DASHBOARD = str(Path(__file__).resolve().parent.parent / "dashboard")
+if _DASHBOARD not in sys.path:
+    sys.path.insert(0, _DASHBOARD)
+
+# Keep the GraphQL rate-limit budget in memory so tests never write
+# dashboard/.graphql_budget.json.
+os.environ.setdefault("GRAPHQL_BUDGET_PATH", "")
+# Disable the GraphQL response cache: every mocked call must reach Session.post.
+os.environ.setdefault("GRAPHQL_CACHE_PATH", "")
+# Keep the usage-log byte-offset checkpoint in memory.
+os.environ.setdefault("USAGE_CHECKPOINT_PATH", "")
+# Each TokenLedger starts empty and never touches dashboard/token_ledger.jsonl.
+os.environ.setdefault("TOKEN_LEDGER_PATH", "")
+# No managed ccusage install: CLI commands keep their PATH/npx form.
+os.environ.setdefault("CCUSAGE_CACHE_DIR", "")
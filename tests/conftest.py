@@ -1,20 +1,40 @@
-"""Shared test helpers: fake HTTP responses + dashboard sys.path injection."""
+"""Shared test helpers: fake HTTP responses and temp dirs.
+
+sys.path and env setup live in tests/__init__.py, which runs first.
+"""
 
 import json
-import sys
+import os
+import shutil
+import tempfile
+import unittest
 from pathlib import Path
 from unittest.mock import MagicMock
 
-# Make dashboard/ importable from tests/
 DASHBOARD_DIR = Path(__file__).resolve().parent.parent / "dashboard"
-if str(DASHBOARD_DIR) not in sys.path:
-    sys.path.insert(0, str(DASHBOARD_DIR))
 
 
-def fake_http_response(status: int, body):
+def fake_http_response(status: int, body, headers=None):
     """Build a fake requests.Response-like object."""
     r = MagicMock()
     r.status_code = status
+    r.headers = dict(headers or {})
     r.json.return_value = body
     r.text = json.dumps(body) if isinstance(body, (dict, list)) else str(body)
     return r
+
+
+def enter_dir(case: unittest.TestCase, path: Path) -> None:
+    """chdir into `path` for the rest of `case` (scripts use relative paths)."""
+    cwd = os.getcwd()
+    os.chdir(path)
+    case.addCleanup(os.chdir, cwd)
+
+
+def tmp_dir(case: unittest.TestCase, chdir: bool = False) -> Path:
+    """Fresh temp dir removed after `case`; with chdir, also the cwd until then."""
+    tmp = Path(tempfile.mkdtemp())
+    case.addCleanup(shutil.rmtree, tmp)
+    if chdir:
+        enter_dir(case, tmp)
+    return tmp
@@ -0,0 +1,120 @@
+"""Build manifest: skip rendering/writing when an artifact's inputs are unchanged."""
+
+import json
+import os
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+from tests.test_caller_fallbacks import SAMPLE_DATA
+
+import _build_manifest
+import _data_store
+from _build_manifest import BuildManifest, get_manifest, input_digest
+
+
+class TmpTree(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self, chdir=True)
+        (self.tmp / "dashboard").mkdir()
+        for mod, name in ((_build_manifest, "_manifests"), (_data_store, "_stores")):
+            p = patch.object(mod, name, {})
+            p.start()
+            self.addCleanup(p.stop)
+
+
+class Digest(unittest.TestCase):
+    def test_key_order_does_not_matter(self):
+        self.assertEqual(input_digest({"a": 1, "b": [1, 2]}, "W29"),
+                         input_digest({"b": [1, 2], "a": 1}, "W29"))
+
+    def test_any_input_change_changes_digest(self):
+        base = input_digest(1, {"commits": 5}, "07/14/26")
+        self.assertNotEqual(base, input_digest(2, {"commits": 5}, "07/14/26"))
+        self.assertNotEqual(base, input_digest(1, {"commits": 6}, "07/14/26"))
+        self.assertNotEqual(base, input_digest(1, {"commits": 5}, "07/15/26"))
+
+
+class Freshness(TmpTree):
+    def test_fresh_only_after_write_with_same_digest(self):
+        m = BuildManifest("dashboard/.build_manifest.json")
+        out = Path("dashboard/card.svg")
+        self.assertFalse(m.is_fresh("card", "d1", out))
+        self.assertTrue(m.write("card", "d1", out, "<svg/>"))
+        self.assertTrue(m.is_fresh("card", "d1", out))
+        self.assertFalse(m.is_fresh("card", "d2", out))
+        # Survives a new process
+        self.assertTrue(BuildManifest("dashboard/.build_manifest.json").is_fresh("card", "d1", out))
+
+    def test_hand_edited_or_deleted_output_is_rebuilt(self):
+        m = BuildManifest("dashboard/.build_manifest.json")
+        out = Path("dashboard/card.svg")
+        m.write("card", "d1", out, "<svg/>")
+        out.write_text("<svg>edited</svg>")
+        self.assertFalse(m.is_fresh("card", "d1", out))
+        out.unlink()
+        self.assertFalse(m.is_fresh("card", "d1", out))
+
+    def test_identical_bytes_are_not_rewritten(self):
+        m = BuildManifest("dashboard/.build_manifest.json")
+        out = Path("dashboard/card.svg")
+        out.write_text("<svg/>")
+        with patch("_build_manifest.atomic_write_text",
+                   side_effect=_build_manifest.atomic_write_text) as write:
+            self.assertFalse(m.write("card", "d1", out, "<svg/>"))
+        written = [c.args[0] for c in write.call_args_list]
+        self.assertNotIn(out, written)
+
+    def test_sections_sharing_an_output_stay_fresh(self):
+        m = BuildManifest("dashboard/.build_manifest.json")
+        other = BuildManifest("dashboard/.build_manifest.other.json")
+        readme = Path("README.md")
+        readme.write_text("# A\nold\n# B\nold\n")
+        m.write("README.md#a", "a1", readme, "# A\nnew\n# B\nold\n", part="# A\nnew\n")
+        # Another workflow, with its own manifest, rewrites section B.
+        other.write("README.md#b", "b1", readme, "# A\nnew\n# B\nnew\n", part="# B\nnew\n")
+        self.assertTrue(m.is_fresh("README.md#a", "a1", readme, part="# A\nnew\n"))
+        self.assertTrue(other.is_fresh("README.md#b", "b1", readme, part="# B\nnew\n"))
+        self.assertFalse(m.is_fresh("README.md#a", "a1", readme, part="# A\nedited\n"))
+
+    def test_unchanged_rebuild_leaves_manifest_untouched(self):
+        m = BuildManifest("dashboard/.build_manifest.json")
+        out = Path("dashboard/card.svg")
+        m.write("card", "d1", out, "<svg/>")
+        saved = Path("dashboard/.build_manifest.json").read_text()
+        self.assertNotIn("builtAt", saved)
+        with patch.object(m, "save") as save:
+            m.write("card", "d1", out, "<svg/>")
+        save.assert_not_called()
+        m.write("card", "d2", out, "<svg/>")
+        self.assertNotEqual(Path("dashboard/.build_manifest.json").read_text(), saved)
+
+    def test_workflow_picks_its_manifest(self):
+        with patch.dict(os.environ, {"BUILD_MANIFEST_PATH": "dashboard/.build_manifest.slack.json"}):
+            self.assertEqual(get_manifest().path.name, ".build_manifest.slack.json")
+        with patch.dict(os.environ, {"BUILD_MANIFEST_PATH": ""}):
+            self.assertEqual(get_manifest().path.name, ".build_manifest.json")
+
+
+class DashboardSvgSkipsUnchangedRun(TmpTree):
+    def test_second_run_skips_render(self):
+        (self.tmp / "dashboard" / "data.json").write_text(json.dumps(SAMPLE_DATA, indent=2))
+        for m in ("generate_svg", "get_weekly_commits"):
+            sys.modules.pop(m, None)
+        with patch("get_weekly_commits.get_weekly_commits", return_value=42):
+            import generate_svg
+            generate_svg.generate_dashboard_svg()
+            svg = self.tmp / "dashboard" / "weekly_dashboard.svg"
+            first = svg.stat().st_mtime_ns
+            with patch.object(generate_svg, "get_progress_bar") as render:
+                generate_svg.generate_dashboard_svg()
+            render.assert_not_called()
+        self.assertEqual(svg.stat().st_mtime_ns, first)
+        self.assertIn("weekly_dashboard.svg", get_manifest().unchanged)
+        self.assertEqual(get_manifest().rebuilt, ["weekly_dashboard.svg"])
+
+
+if __name__ == "__main__":
+    unittest.main()
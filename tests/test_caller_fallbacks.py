@@ -252,6 +252,16 @@ class ProfileCardKeepsPreviousSvgOnGraphqlFailure(unittest.TestCase):
         self.assertEqual(self.card.read_text(), self.SENTINEL)
         self.assertEqual((self.tmp / "README.md").read_text(), "# readme\n")
 
+    def test_low_budget_defers_and_leaves_card_untouched(self):
+        import sys
+        sys.modules.pop("generate_profile_card", None)
+        import generate_profile_card as gpc
+        with patch.object(gpc, "has_budget", return_value=False), \
+             patch.object(gpc, "get_github_activity_stats_graphql") as stats:
+            gpc.generate_profile_card()
+        stats.assert_not_called()
+        self.assertEqual(self.card.read_text(), self.SENTINEL)
+
     def test_graphql_success_regenerates_card(self):
         import sys
         sys.modules.pop("generate_profile_card", None)
@@ -0,0 +1,107 @@
+"""Managed ccusage install: resolve once, refresh on schedule, fall back to npx."""
+
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+
+import ccusage_tool
+import get_weekly_tokens as gwt
+
+NOW = 1_800_000_000.0
+
+
+class ToolCase(unittest.TestCase):
+    def setUp(self):
+        self.root = tmp_dir(self)
+        env = patch.dict(os.environ, {"CCUSAGE_CACHE_DIR": str(self.root)})
+        env.start()
+        self.addCleanup(env.stop)
+        os.environ.pop("CCUSAGE_VERSION", None)
+        self.installs = []
+
+    def fake_install(self, root, version):
+        self.installs.append(version)
+        binary = root / f"ccusage-{version}" / "node_modules" / ".bin" / "ccusage"
+        binary.parent.mkdir(parents=True)
+        binary.write_text("#!/bin/sh\n")
+        return binary
+
+    def resolve(self, latest="17.1.0", now=NOW):
+        with patch.object(ccusage_tool, "latest_version", return_value=latest) as lookup, \
+             patch.object(ccusage_tool, "install", side_effect=self.fake_install):
+            return ccusage_tool.resolve(now=now), lookup
+
+
+class Resolve(ToolCase):
+    def test_installs_once_then_reuses_without_lookup(self):
+        first, _ = self.resolve()
+        second, lookup = self.resolve(now=NOW + 3600)
+        self.assertEqual(first, second)
+        self.assertEqual(self.installs, ["17.1.0"])
+        lookup.assert_not_called()
+        manifest = json.loads((self.root / "tool.json").read_text())
+        self.assertEqual(manifest["version"], "17.1.0")
+
+    def test_refresh_after_schedule_installs_newer_and_drops_old(self):
+        self.resolve()
+        later = NOW + ccusage_tool.REFRESH_SECONDS + 1
+        binary, lookup = self.resolve(latest="17.2.0", now=later)
+        lookup.assert_called_once()
+        self.assertEqual(self.installs, ["17.1.0", "17.2.0"])
+        self.assertIn("ccusage-17.2.0", str(binary))
+        self.assertFalse((self.root / "ccusage-17.1.0").exists())
+
+    def test_refresh_same_version_only_restamps(self):
+        self.resolve()
+        later = NOW + ccusage_tool.REFRESH_SECONDS + 1
+        self.resolve(now=later)
+        self.assertEqual(self.installs, ["17.1.0"])
+        self.assertEqual(json.loads((self.root / "tool.json").read_text())["checkedAt"], later)
+
+    def test_offline_keeps_installed_copy(self):
+        first, _ = self.resolve()
+        binary, _ = self.resolve(latest=None, now=NOW + ccusage_tool.REFRESH_SECONDS + 1)
+        self.assertEqual(binary, first)
+
+    def test_pinned_version_skips_registry(self):
+        with patch.dict(os.environ, {"CCUSAGE_VERSION": "16.0.0"}):
+            binary, lookup = self.resolve()
+        lookup.assert_not_called()
+        self.assertIn("ccusage-16.0.0", str(binary))
+
+    def test_disabled_or_unavailable_falls_back(self):
+        binary, _ = self.resolve(latest=None)
+        self.assertIsNone(binary)
+        with patch.dict(os.environ, {"CCUSAGE_CACHE_DIR": ""}):
+            self.assertIsNone(ccusage_tool.resolve())
+
+
+class Commands(ToolCase):
+    def test_codex_uses_cached_bin_for_both_attempts(self):
+        binary, _ = self.resolve()
+        with patch.object(ccusage_tool, "resolve", return_value=binary):
+            online, offline = gwt._codex_cmds("2026-05-04", "2026-05-10")
+        self.assertEqual(online[:4], [str(binary), "codex", "daily", "--json"])
+        self.assertIn("--offline", offline)
+        self.assertNotIn("npx", online + offline)
+
+    def test_codex_without_install_uses_npx(self):
+        with patch.object(ccusage_tool, "resolve", return_value=None):
+            online, _ = gwt._codex_cmds("2026-05-04", "2026-05-10")
+            claude, _ = gwt._claude_cmds("2026-05-04", "2026-05-10")
+        self.assertEqual(online[:5], ["npx", "-y", "ccusage@latest", "codex", "daily"])
+        self.assertEqual(claude[:3], ["ccusage", "daily", "--json"])
+
+    def test_lock_timeout_or_unwritable_cache_falls_back(self):
+        for error in (ccusage_tool.LockTimeout("tool.json"), PermissionError("read-only")):
+            with patch.object(ccusage_tool, "file_lock", side_effect=error):
+                online, offline = gwt._codex_cmds("2026-05-04", "2026-05-10")
+            self.assertEqual(online[:3], ccusage_tool.NPX_CMD)
+            self.assertEqual(offline[:3], ccusage_tool.NPX_CMD)
+
+
+if __name__ == "__main__":
+    unittest.main()
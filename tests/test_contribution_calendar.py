@@ -0,0 +1,117 @@
+"""Profile-card heatmap: cached day array, checkpointed fetches, grid fill."""
+
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.conftest import fake_http_response
+
+import _contribution_calendar as cc
+
+KST = timezone(timedelta(hours=9))
+NOW = datetime(2026, 10, 14, 10, 0, tzinfo=KST)  # a Wednesday
+
+
+def calendar_body(variables, count=2):
+    """contributionCalendar payload with `count` for every day of every window."""
+    user = {}
+    i = 0
+    while f"from{i}" in variables:
+        first = datetime.fromisoformat(variables[f"from{i}"]).date()
+        last = datetime.fromisoformat(variables[f"to{i}"]).date()
+        days = [{"date": (first + timedelta(days=n)).isoformat(), "contributionCount": count}
+                for n in range((last - first).days + 1)]
+        user[f"c{i}"] = {"contributionCalendar": {"weeks": [{"contributionDays": days}]}}
+        i += 1
+    return {"data": {"user": user}}
+
+
+class Cache(unittest.TestCase):
+    def test_grid_starts_on_sunday_53_weeks_back(self):
+        start = cc.grid_start(NOW.date())
+        self.assertEqual(start.weekday(), 6)
+        self.assertEqual((NOW.date() - start).days // 7, cc.GRID_WEEKS - 1)
+
+    def test_rebase_drops_old_week_keeps_checkpoint(self):
+        start = cc.grid_start(NOW.date())
+        cal = cc.empty_calendar(start)
+        cal["counts"] = list(range(cc.GRID_DAYS))
+        cal["checkpoint"] = "2026-10-13"
+        moved = cc.rebase(cal, start + timedelta(weeks=1))
+        self.assertEqual(moved["counts"][:2], [7, 8])
+        self.assertEqual(moved["counts"][-7:], [0] * 7)
+        self.assertEqual(moved["checkpoint"], "2026-10-13")
+
+    def test_checkpoint_stops_at_first_open_day(self):
+        cal = cc.empty_calendar(cc.grid_start(NOW.date()))
+        cc.apply_days(cal, {"2026-10-12": 4}, NOW.date(), NOW)
+        self.assertEqual(cal["checkpoint"], "2026-10-13")
+        self.assertEqual(cc.day_count(cal, date(2026, 10, 12)), 4)
+
+
+class Fetch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        import graphql_stats
+        self.gs = graphql_stats
+        path = patch.object(graphql_stats, "CALENDAR_PATH", self.tmp / "calendar.json")
+        path.start()
+        self.addCleanup(path.stop)
+
+    def fetch(self, now, count=2, body=None):
+        bodies = []
+
+        def post(url, json=None, **kwargs):
+            bodies.append(json)
+            return fake_http_response(200, body or calendar_body(json["variables"], count))
+
+        with patch("_graphql_client.requests.Session.post", side_effect=post):
+            cal = self.gs.get_contribution_calendar_graphql("Piesson", "tok", now=now)
+        return cal, bodies
+
+    def test_cold_then_incremental(self):
+        cal, bodies = self.fetch(NOW)
+        self.assertEqual(len(bodies), 1, "one request even when the grid spans > 1 year")
+        self.assertIn("c1:", bodies[0]["query"])
+        self.assertEqual(cc.day_count(cal, cc.grid_start(NOW.date())), 2)
+
+        later = NOW + timedelta(days=3)
+        cal, bodies = self.fetch(later, count=5)
+        variables = bodies[0]["variables"]
+        self.assertEqual(variables["from0"][:10], "2026-10-13")  # checkpoint, not the grid start
+        self.assertNotIn("from1", variables)
+        self.assertEqual(cc.day_count(cal, date(2026, 10, 12)), 2)  # final: never refetched
+        self.assertEqual(cc.day_count(cal, date(2026, 10, 13)), 5)
+        saved = json.loads((self.tmp / "calendar.json").read_text())
+        self.assertEqual(saved["checkpoint"], "2026-10-16")
+
+    def test_api_failure_returns_none_and_keeps_cache(self):
+        self.fetch(NOW)
+        before = (self.tmp / "calendar.json").read_text()
+        cal, _ = self.fetch(NOW + timedelta(days=1),
+                            body={"errors": [{"type": "RATE_LIMIT", "message": "..."}]})
+        self.assertIsNone(cal)
+        self.assertEqual((self.tmp / "calendar.json").read_text(), before)
+
+
+class Render(unittest.TestCase):
+    def test_grid_fill_up_to_today(self):
+        import generate_profile_card as gpc
+        today = NOW.date()
+        cal = cc.empty_calendar(cc.grid_start(today))
+        cal["counts"][0] = 8
+        cal["counts"][8] = 1
+        cells, total = gpc.generate_contribution_heatmap(cal, today)
+        self.assertEqual(total, 9)
+        self.assertEqual(cells.count("<rect"), (today - cc.grid_start(today)).days + 1)
+        self.assertIn(f'x="0" y="0" width="7" height="7" rx="1.5" fill="{gpc.HEATMAP_COLORS[4]}"', cells)
+        self.assertIn(f'x="8" y="8" width="7" height="7" rx="1.5" fill="{gpc.HEATMAP_COLORS[1]}"', cells)
+
+
+if __name__ == "__main__":
+    unittest.main()
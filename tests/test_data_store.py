@@ -0,0 +1,118 @@
+"""DataStore: data.json parsed once per process, written only when changed."""
+
+import json
+import unittest
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+
+import _data_store
+from _data_store import DataStore, get_store
+
+
+SAMPLE = {
+    "lastUpdated": "2026-07-14",
+    "currentWeek": {
+        "startDate": "2026-07-13",
+        "endDate": "2026-07-19",
+        "metrics": {"commits": 5, "workouts": {"running": 1, "gym": 0}},
+    },
+    "weeklyHistory": [{"week": "2026-W28", "metrics": {"commits": 40}}],
+    "goals": {"weeklyCommits": 140},
+}
+
+
+class StoreCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self, chdir=True)
+        (self.tmp / "dashboard").mkdir()
+        self.path = self.tmp / "dashboard" / "data.json"
+        self.path.write_text(json.dumps(SAMPLE, indent=2))
+        stores = patch.object(_data_store, "_stores", {})
+        stores.start()
+        self.addCleanup(stores.stop)
+
+
+class Accessors(StoreCase):
+    def test_typed_sections(self):
+        store = get_store()
+        self.assertEqual(store.current_week()["startDate"], "2026-07-13")
+        self.assertEqual(store.current_metrics()["commits"], 5)
+        self.assertEqual(store.weekly_history()[0]["week"], "2026-W28")
+        self.assertEqual(store.goals(), {"weeklyCommits": 140})
+
+    def test_missing_file(self):
+        self.path.unlink()
+        store = get_store()
+        self.assertFalse(store.exists())
+        with self.assertRaises(FileNotFoundError):
+            store.data
+
+
+class SingleLoad(StoreCase):
+    def test_one_parse_shared_across_callers(self):
+        with patch("_data_store.json.loads", side_effect=json.loads) as loads:
+            get_store().current_metrics()
+            get_store("dashboard/data.json").weekly_history()
+            get_store(self.path).goals()
+        self.assertEqual(loads.call_count, 1)
+
+    def test_progress_chart_parses_once(self):
+        import generate_progress_chart as gpc
+        with patch("_data_store.json.loads", side_effect=json.loads) as loads:
+            gpc.load_weekly_data()
+            get_store().data  # the tokens chart reads the same store
+        self.assertEqual(loads.call_count, 1)
+
+    def test_external_rewrite_is_picked_up(self):
+        store = get_store()
+        self.assertEqual(store.current_metrics()["commits"], 5)
+        changed = json.loads(json.dumps(SAMPLE))
+        changed["currentWeek"]["metrics"]["commits"] = 9
+        self.path.write_text(json.dumps(changed, indent=2) + "\n")
+        self.assertEqual(store.current_metrics()["commits"], 9)
+
+
+class DirtyTracking(StoreCase):
+    def test_unchanged_store_does_not_write(self):
+        store = get_store()
+        store.data
+        before = self.path.stat().st_mtime_ns
+        with patch("_data_store.atomic_write_text") as write:
+            self.assertFalse(store.save())
+        write.assert_not_called()
+        self.assertEqual(self.path.stat().st_mtime_ns, before)
+
+    def test_changed_store_writes_once(self):
+        store = get_store()
+        store.current_metrics()["commits"] = 42
+        self.assertTrue(store.is_dirty())
+        self.assertTrue(store.save())
+        self.assertFalse(store.save())
+        on_disk = json.loads(self.path.read_text())
+        self.assertEqual(on_disk["currentWeek"]["metrics"]["commits"], 42)
+
+    def test_deferred_coalesces_saves(self):
+        store = get_store()
+        with patch("_data_store.atomic_write_text",
+                   side_effect=_data_store.atomic_write_text) as write:
+            with store.deferred():
+                store.current_metrics()["commits"] = 6
+                store.save()
+                with store.deferred():
+                    store.current_metrics()["commits"] = 7
+                    store.save()
+                self.assertEqual(write.call_count, 0)
+        self.assertEqual(write.call_count, 1)
+        self.assertEqual(json.loads(self.path.read_text())["currentWeek"]["metrics"]["commits"], 7)
+
+    def test_separate_paths_get_separate_stores(self):
+        other = self.tmp / "other.json"
+        other.write_text(json.dumps({"currentWeek": {"metrics": {"commits": 1}}}))
+        self.assertIsNot(get_store(), get_store(other))
+        self.assertIsInstance(get_store(other), DataStore)
+        self.assertEqual(get_store(other).current_metrics()["commits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Atomic writes and the data.json advisory lock."""
+
+import json
+import os
+import threading
+import unittest
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+
+import _fileio
+from _data_store import DataStore, StaleStore
+from _fileio import LockTimeout, atomic_write_text, file_lock
+
+
+class TmpDir(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self)
+        self.path = self.tmp / "data.json"
+
+
+class AtomicWrite(TmpDir):
+    def test_replaces_content_and_leaves_no_temp(self):
+        self.path.write_text("old")
+        atomic_write_text(self.path, "new")
+        self.assertEqual(self.path.read_text(), "new")
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir()), ["data.json"])
+
+    def test_crash_mid_write_keeps_old_file(self):
+        self.path.write_text('{"commits": 23}')
+        with patch("_fileio.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                atomic_write_text(self.path, '{"commits": 0')
+        self.assertEqual(self.path.read_text(), '{"commits": 23}')
+        self.assertEqual(sorted(p.name for p in self.tmp.iterdir()), ["data.json"])
+
+    def test_keeps_file_mode(self):
+        self.path.write_text("x")
+        os.chmod(self.path, 0o640)
+        atomic_write_text(self.path, "y")
+        self.assertEqual(self.path.stat().st_mode & 0o777, 0o640)
+
+
+class AdvisoryLock(TmpDir):
+    def test_times_out_while_another_writer_holds_it(self):
+        held, release = threading.Event(), threading.Event()
+
+        def holder():
+            with file_lock(self.path):
+                held.set()
+                release.wait(5)
+
+        t = threading.Thread(target=holder)
+        t.start()
+        self.addCleanup(t.join)
+        self.addCleanup(release.set)
+        held.wait(5)
+        with patch.object(_fileio, "_POLL_SECONDS", 0.01):
+            with self.assertRaises(LockTimeout):
+                with file_lock(self.path, timeout=0.1):
+                    pass
+
+    def test_nested_lock_in_same_thread_does_not_deadlock(self):
+        with file_lock(self.path, timeout=0.5):
+            with file_lock(self.path, timeout=0.5):
+                pass
+        with file_lock(self.path, timeout=0.5):  # released afterwards
+            pass
+
+
+class ConcurrentTransactions(TmpDir):
+    def test_no_lost_increments(self):
+        """Separate stores stand in for separate jobs (Slack, cron, launchd)."""
+        self.path.write_text(json.dumps({"currentWeek": {"metrics": {"userSessions": 0}}}))
+        workers, rounds = 4, 25
+
+        def job():
+            store = DataStore(self.path)
+            for _ in range(rounds):
+                with store.transaction() as data:
+                    data["currentWeek"]["metrics"]["userSessions"] += 1
+
+        threads = [threading.Thread(target=job) for _ in range(workers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        final = json.loads(self.path.read_text())
+        self.assertEqual(final["currentWeek"]["metrics"]["userSessions"], workers * rounds)
+
+    def test_failed_transaction_writes_nothing(self):
+        self.path.write_text(json.dumps({"currentWeek": {"metrics": {"commits": 23}}}, indent=2))
+        store = DataStore(self.path)
+        with self.assertRaises(KeyError):
+            with store.transaction() as data:
+                data["currentWeek"]["metrics"]["commits"] = 0
+                data["missing"]
+        self.assertEqual(json.loads(self.path.read_text())["currentWeek"]["metrics"]["commits"], 23)
+        self.assertEqual(store.current_metrics()["commits"], 23)
+
+    def test_unsaved_edits_never_overwrite_a_newer_file(self):
+        self.path.write_text(json.dumps({"currentWeek": {"metrics": {"commits": 1,
+                                                                     "userSessions": 0}}}))
+        store = DataStore(self.path)
+        store.current_metrics()["commits"] = 2  # edited, not saved
+        other = DataStore(self.path)
+        with other.transaction() as data:
+            data["currentWeek"]["metrics"]["userSessions"] = 5
+        with self.assertRaises(StaleStore):
+            with store.transaction() as data:
+                data["currentWeek"]["metrics"]["commits"] += 1
+        self.assertEqual(json.loads(self.path.read_text())["currentWeek"]["metrics"],
+                         {"commits": 1, "userSessions": 5})
+
+    def test_unsaved_edits_on_an_unchanged_file_are_written(self):
+        self.path.write_text(json.dumps({"currentWeek": {"metrics": {"commits": 1}}}))
+        store = DataStore(self.path)
+        store.current_metrics()["commits"] = 2
+        with store.transaction() as data:
+            data["currentWeek"]["metrics"]["commits"] += 1
+        self.assertEqual(json.loads(self.path.read_text())["currentWeek"]["metrics"]["commits"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
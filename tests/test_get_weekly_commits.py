@@ -1,49 +1,81 @@
 import os
+import shutil
+import tempfile
 import unittest
+from datetime import datetime
+from pathlib import Path
 from unittest.mock import patch
 from tests.conftest import fake_http_response
 
 import get_weekly_commits as gwc
 from _graphql_client import ErrorKind
 
+# Tue 2026-07-14 22:50 KST — Mon..Tue of that week are "up to today".
+NOW = datetime(2026, 7, 14, 22, 50, 0, tzinfo=gwc.KST)
+
+
+def per_day_response(counts_by_from):
+    """side_effect answering each aliased day window from a {from_iso: n} map
+    (missing windows → 0) and recording every request body."""
+    def respond(*args, **kwargs):
+        variables = kwargs["json"]["variables"]
+        respond.bodies.append(kwargs["json"])
+        n = sum(1 for k in variables if k.startswith("from"))
+        return fake_http_response(200, {"data": {"user": {
+            f"r{i}": {"totalCommitContributions": counts_by_from.get(variables[f"from{i}"], 0)}
+            for i in range(n)
+        }}})
+    respond.bodies = []
+    return respond
+
+
+class CalendarIsolation(unittest.TestCase):
+    """Points CALENDAR_PATH at a tempdir so tests never touch the committed cache."""
 
-class GetWeeklyCommitsReturnsOptionalInt(unittest.TestCase):
     def setUp(self):
         os.environ["GITHUB_TOKEN"] = "x"
         os.environ["USERNAME"] = "Piesson"
+        self.tmp = Path(tempfile.mkdtemp())
+        self.calendar = patch.object(gwc, "CALENDAR_PATH", self.tmp / ".commit_calendar.json")
+        self.calendar.start()
 
     def tearDown(self):
+        self.calendar.stop()
+        shutil.rmtree(self.tmp)
         os.environ.pop("GITHUB_TOKEN", None)
         os.environ.pop("USERNAME", None)
 
+
+class GetWeeklyCommitsReturnsOptionalInt(CalendarIsolation):
     def test_returns_int_on_success(self):
-        body = {"data": {"user": {"contributionsCollection": {"totalCommitContributions": 23}}}}
-        with patch("_graphql_client.requests.post",
-                   return_value=fake_http_response(200, body)):
-            self.assertEqual(gwc.get_weekly_commits(), 23)
+        # Mon 2026-07-13 00:00 KST == 2026-07-12 15:00 UTC
+        respond = per_day_response({"2026-07-12T15:00:00Z": 20, "2026-07-13T15:00:00Z": 3})
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            self.assertEqual(gwc.get_weekly_commits(now=NOW), 23)
+        self.assertEqual(len(respond.bodies), 1)
 
     def test_returns_none_on_rate_limit(self):
         body = {"errors": [{"type": "RATE_LIMIT", "message": "..."}]}
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(200, body)):
-            self.assertIsNone(gwc.get_weekly_commits())
+            self.assertIsNone(gwc.get_weekly_commits(now=NOW))
 
     def test_returns_none_on_missing_token(self):
         os.environ.pop("GITHUB_TOKEN", None)
         os.environ.pop("SUMMARY_CARDS_TOKEN", None)
-        self.assertIsNone(gwc.get_weekly_commits())
+        self.assertIsNone(gwc.get_weekly_commits(now=NOW))
 
     def test_returns_none_on_network_error(self):
         import requests
-        with patch("_graphql_client.requests.post",
-                   side_effect=requests.ConnectionError("boom")):
-            self.assertIsNone(gwc.get_weekly_commits())
+        with patch("_graphql_client.requests.Session.post",
+                   side_effect=requests.ConnectionError("boom")), \
+             patch("_graphql_client.time.sleep"):
+            self.assertIsNone(gwc.get_weekly_commits(now=NOW))
 
     def test_zero_commits_is_int_zero_not_none(self):
-        body = {"data": {"user": {"contributionsCollection": {"totalCommitContributions": 0}}}}
-        with patch("_graphql_client.requests.post",
-                   return_value=fake_http_response(200, body)):
-            v = gwc.get_weekly_commits()
+        with patch("_graphql_client.requests.Session.post",
+                   side_effect=per_day_response({})):
+            v = gwc.get_weekly_commits(now=NOW)
         self.assertEqual(v, 0)
         self.assertIsNotNone(v)  # CRITICAL: real 0 must NOT collapse to None
 
@@ -61,30 +93,115 @@ class WeekWindowStartsAtMidnight(unittest.TestCase):
         self.assertEqual(to_iso, "2026-07-19T14:59:59Z")
 
 
-class GetCommitsForRange(unittest.TestCase):
-    def setUp(self):
-        os.environ["GITHUB_TOKEN"] = "x"
-        os.environ["USERNAME"] = "Piesson"
-
-    def tearDown(self):
-        os.environ.pop("GITHUB_TOKEN", None)
-        os.environ.pop("USERNAME", None)
-
-    def test_range_converts_kst_dates_to_utc_window(self):
-        body = {"data": {"user": {"contributionsCollection": {"totalCommitContributions": 174}}}}
-        with patch("_graphql_client.requests.post",
-                   return_value=fake_http_response(200, body)) as mock_post:
-            v = gwc.get_commits_for_range("2026-07-06", "2026-07-12")
+class GetCommitsForRange(CalendarIsolation):
+    def test_range_converts_kst_dates_to_utc_day_windows(self):
+        respond = per_day_response({"2026-07-05T15:00:00Z": 170, "2026-07-11T15:00:00Z": 4})
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            v = gwc.get_commits_for_range("2026-07-06", "2026-07-12", now=NOW)
         self.assertEqual(v, 174)
-        variables = mock_post.call_args.kwargs.get("json", mock_post.call_args.args[-1])["variables"]
+        variables = respond.bodies[0]["variables"]
         # 2026-07-06 00:00 KST == 2026-07-05 15:00 UTC
-        self.assertEqual(variables["from"], "2026-07-05T15:00:00Z")
+        self.assertEqual(variables["from0"], "2026-07-05T15:00:00Z")
+        self.assertEqual(variables["to0"], "2026-07-06T14:59:59Z")
         # 2026-07-12 23:59:59 KST == 2026-07-12 14:59:59 UTC
-        self.assertEqual(variables["to"], "2026-07-12T14:59:59Z")
+        self.assertEqual(variables["to6"], "2026-07-12T14:59:59Z")
 
     def test_bad_dates_return_none(self):
-        self.assertIsNone(gwc.get_commits_for_range("not-a-date", "2026-07-12"))
-        self.assertIsNone(gwc.get_commits_for_range("2026-07-06", None))
+        self.assertIsNone(gwc.get_commits_for_range("not-a-date", "2026-07-12", now=NOW))
+        self.assertIsNone(gwc.get_commits_for_range("2026-07-06", None, now=NOW))
+
+
+class GetCommitsForRanges(CalendarIsolation):
+    def test_all_days_in_one_aliased_request(self):
+        respond = per_day_response({"2026-06-28T15:00:00Z": 174})
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            v = gwc.get_commits_for_ranges([("2026-06-29", "2026-07-01"),
+                                            ("2026-07-02", "2026-07-03")], now=NOW)
+        self.assertEqual(v, [174, 0])
+        self.assertEqual(len(respond.bodies), 1)
+        variables = respond.bodies[0]["variables"]
+        self.assertEqual(variables["from0"], "2026-06-28T15:00:00Z")
+        self.assertEqual(variables["to4"], "2026-07-03T14:59:59Z")
+
+    def test_chunks_above_alias_limit(self):
+        respond = per_day_response({})
+        days = gwc.MAX_RANGES_PER_QUERY + 1
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            v = gwc.get_commits_for_ranges([("2026-06-01", f"2026-06-{days:02d}")], now=NOW)
+        self.assertEqual(len(respond.bodies), 2)
+        self.assertEqual(v, [0])
+
+    def test_missing_alias_and_bad_range_map_to_none(self):
+        body = {"data": {"user": {"r0": {"totalCommitContributions": 5}, "r1": None}}}
+        with patch("_graphql_client.requests.Session.post",
+                   return_value=fake_http_response(200, body)):
+            v = gwc.get_commits_for_ranges([("2026-07-06", "2026-07-06"),
+                                            ("bad", "2026-07-12"),
+                                            ("2026-07-07", "2026-07-07")], now=NOW)
+        self.assertEqual(v, [5, None, None])
+
+    def test_failing_alias_only_nulls_its_own_range(self):
+        body = {"data": {"user": {"r0": {"totalCommitContributions": 5}, "r1": None}},
+                "errors": [{"type": "SERVICE_UNAVAILABLE", "path": ["user", "r1"]}]}
+        with patch("_graphql_client.requests.Session.post",
+                   return_value=fake_http_response(200, body)):
+            v = gwc.get_commits_for_ranges([("2026-07-06", "2026-07-06"),
+                                            ("2026-07-07", "2026-07-07")], now=NOW)
+        self.assertEqual(v, [5, None])
+
+    def test_request_failure_maps_every_range_to_none(self):
+        body = {"errors": [{"type": "RATE_LIMIT", "message": "..."}]}
+        with patch("_graphql_client.requests.Session.post",
+                   return_value=fake_http_response(200, body)):
+            v = gwc.get_commits_for_ranges([("2026-07-06", "2026-07-12"),
+                                            ("2026-07-13", "2026-07-19")], now=NOW)
+        self.assertEqual(v, [None, None])
+
+
+class CommitCalendarCache(CalendarIsolation):
+    def test_final_days_are_not_refetched(self):
+        respond = per_day_response({"2026-07-05T15:00:00Z": 7})
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            first = gwc.get_commits_for_range("2026-07-06", "2026-07-12", now=NOW)
+            second = gwc.get_commits_for_range("2026-07-06", "2026-07-12", now=NOW)
+        self.assertEqual((first, second), (7, 7))
+        self.assertEqual(len(respond.bodies), 1, "closed week must be a local sum on re-query")
+
+    def test_only_non_final_days_are_refetched(self):
+        respond = per_day_response({"2026-07-12T15:00:00Z": 2})
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            gwc.get_weekly_commits(now=NOW)
+            gwc.get_weekly_commits(now=NOW)
+        # Mon 07-13 and Tue 07-14 were fetched on Tue — neither is final yet.
+        self.assertEqual(len(respond.bodies), 2)
+        refetched = respond.bodies[1]["variables"]
+        self.assertEqual(sum(1 for k in refetched if k.startswith("from")), 2)
+
+    def test_future_days_are_not_queried(self):
+        respond = per_day_response({})
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            gwc.get_weekly_commits(now=NOW)
+        variables = respond.bodies[0]["variables"]
+        self.assertEqual(sum(1 for k in variables if k.startswith("from")), 2)
+
+    def test_failed_refetch_of_non_final_day_returns_none(self):
+        with patch("_graphql_client.requests.Session.post",
+                   side_effect=per_day_response({"2026-07-12T15:00:00Z": 2})):
+            self.assertEqual(gwc.get_weekly_commits(now=NOW), 2)
+        body = {"errors": [{"type": "RATE_LIMIT", "message": "..."}]}
+        with patch("_graphql_client.requests.Session.post",
+                   return_value=fake_http_response(200, body)):
+            self.assertIsNone(gwc.get_weekly_commits(now=NOW))
+
+
+class DayFinality(unittest.TestCase):
+    def test_day_fetched_after_grace_is_final(self):
+        from datetime import date
+        from _commit_calendar import is_day_final
+        day = date(2026, 7, 13)
+        self.assertFalse(is_day_final(day, {"fetched_at": "2026-07-14T23:59:00+09:00"}))
+        self.assertTrue(is_day_final(day, {"fetched_at": "2026-07-15T00:00:00+09:00"}))
+        self.assertFalse(is_day_final(day, {}))
 
 
 if __name__ == "__main__":
@@ -1,3 +1,4 @@
+import os
 import unittest
 from unittest.mock import patch
 from tests.conftest import fake_http_response
@@ -11,7 +12,7 @@ class PostGraphqlClassifiesErrors(unittest.TestCase):
     BODY = {"query": "query { viewer { login } }"}
 
     def test_success_returns_data(self):
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(200, {"data": {"viewer": {"login": "Piesson"}}})):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
         self.assertIsNone(err)
@@ -19,21 +20,21 @@ class PostGraphqlClassifiesErrors(unittest.TestCase):
 
     def test_rate_limit_returns_kind(self):
         body = {"errors": [{"type": "RATE_LIMIT", "message": "..."}]}
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(200, body)):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
         self.assertIsNone(data)
         self.assertEqual(err, ErrorKind.RATE_LIMIT)
 
     def test_http_500_returns_network(self):
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(500, {"message": "boom"})):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
         self.assertIsNone(data)
         self.assertEqual(err, ErrorKind.NETWORK)
 
     def test_http_401_returns_auth(self):
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(401, {"message": "Bad credentials"})):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
         self.assertIsNone(data)
@@ -41,22 +42,32 @@ class PostGraphqlClassifiesErrors(unittest.TestCase):
 
     def test_other_graphql_error_returns_unknown(self):
         body = {"errors": [{"type": "FORBIDDEN", "message": "..."}]}
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(200, body)):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
         self.assertIsNone(data)
         self.assertEqual(err, ErrorKind.UNKNOWN)
 
+    def test_partial_errors_keep_resolved_fields(self):
+        body = {"data": {"user": {"r0": {"totalCommitContributions": 4}, "r1": None}},
+                "errors": [{"type": "SERVICE_UNAVAILABLE", "path": ["user", "r1"]}]}
+        with patch("_graphql_client.requests.Session.post",
+                   return_value=fake_http_response(200, body)) as post:
+            data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
+        self.assertEqual(err, ErrorKind.PARTIAL)
+        self.assertEqual(data["data"]["user"]["r0"]["totalCommitContributions"], 4)
+        self.assertEqual(post.call_count, 1, "partial responses are not retried")
+
     def test_request_exception_returns_network(self):
         import requests
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    side_effect=requests.ConnectionError("boom")):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
         self.assertIsNone(data)
         self.assertEqual(err, ErrorKind.NETWORK)
 
     def test_http_429_returns_rate_limit(self):
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(429, {"message": "rate limited"})):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
         self.assertIsNone(data)
@@ -72,7 +83,7 @@ class PostGraphqlRetries(unittest.TestCase):
         from _graphql_client import post_graphql
         import requests as _r
         good = fake_http_response(200, {"data": {"ok": 1}})
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    side_effect=[_r.ConnectionError("blip"), good]) as p, \
              patch("_graphql_client.time.sleep"):  # don't actually sleep in tests
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
@@ -83,7 +94,7 @@ class PostGraphqlRetries(unittest.TestCase):
     def test_retries_5xx_max_3_times_then_gives_up(self):
         from _graphql_client import post_graphql, ErrorKind
         bad = fake_http_response(503, {"message": "down"})
-        with patch("_graphql_client.requests.post", return_value=bad) as p, \
+        with patch("_graphql_client.requests.Session.post", return_value=bad) as p, \
              patch("_graphql_client.time.sleep"):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
         self.assertIsNone(data)
@@ -93,7 +104,7 @@ class PostGraphqlRetries(unittest.TestCase):
     def test_does_not_retry_on_rate_limit(self):
         from _graphql_client import post_graphql, ErrorKind
         body = {"errors": [{"type": "RATE_LIMIT", "message": "..."}]}
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(200, body)) as p, \
              patch("_graphql_client.time.sleep"):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
@@ -102,7 +113,7 @@ class PostGraphqlRetries(unittest.TestCase):
 
     def test_does_not_retry_on_auth(self):
         from _graphql_client import post_graphql, ErrorKind
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(401, {"message": "Bad"})) as p, \
              patch("_graphql_client.time.sleep"):
             data, err = post_graphql(self.URL, self.HEADERS, self.BODY)
@@ -110,5 +121,354 @@ class PostGraphqlRetries(unittest.TestCase):
         self.assertEqual(p.call_count, 1)
 
 
+class PooledSessionReusesConnections(unittest.TestCase):
+    """Every post_graphql call in a process shares one keep-alive session."""
+
+    def setUp(self):
+        import json
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                payload = json.dumps({"data": {"ok": 1}}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/graphql"
+
+    def tearDown(self):
+        import _graphql_client
+        self.server.shutdown()
+        self.server.server_close()
+        _graphql_client.configure_session()
+
+    def test_three_calls_open_one_connection(self):
+        import _graphql_client
+        _graphql_client.configure_session(pool_size=2)
+        for _ in range(3):
+            data, err = post_graphql(self.url, {}, {"query": "{ ok }"})
+            self.assertIsNone(err)
+            self.assertEqual(data["data"]["ok"], 1)
+        stats = _graphql_client.connection_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["new"], 1)
+        self.assertEqual(stats["reused"], 2)
+
+    def test_bad_pool_size_env_falls_back_to_default(self):
+        import _graphql_client
+        for raw in ("lots", "0", ""):
+            with patch.dict(os.environ, {"GRAPHQL_POOL_SIZE": raw}):
+                _graphql_client.configure_session()
+            self.assertEqual(_graphql_client._pool_size, _graphql_client._DEFAULT_POOL_SIZE, raw)
+        with patch.dict(os.environ, {"GRAPHQL_POOL_SIZE": "8"}):
+            _graphql_client.configure_session()
+        self.assertEqual(_graphql_client._pool_size, 8)
+
+    def test_session_is_shared_across_calls(self):
+        import _graphql_client
+        self.assertIs(_graphql_client.get_session(), _graphql_client.get_session())
+
+
+class PostGraphqlMany(unittest.TestCase):
+    URL = "https://api.github.com/graphql"
+    HEADERS = {"Authorization": "Bearer x", "Content-Type": "application/json"}
+
+    def test_results_in_input_order_with_per_query_errors(self):
+        from _graphql_client import post_graphql_many
+
+        def respond(url, headers=None, json=None, timeout=None):
+            n = json["variables"]["n"]
+            if n == 1:
+                return fake_http_response(200, {"errors": [{"type": "RATE_LIMIT"}]})
+            return fake_http_response(200, {"data": {"n": n}})
+
+        bodies = [{"query": "q", "variables": {"n": n}} for n in range(4)]
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            results = post_graphql_many(self.URL, self.HEADERS, bodies)
+        self.assertEqual([d and d["data"]["n"] for d, _ in results], [0, None, 2, 3])
+        self.assertEqual([e for _, e in results],
+                         [None, ErrorKind.RATE_LIMIT, None, None])
+
+    def test_concurrency_limit_is_respected(self):
+        import threading
+        import time as _time
+        from _graphql_client import post_graphql_many
+        lock = threading.Lock()
+        state = {"in_flight": 0, "peak": 0}
+
+        def respond(*args, **kwargs):
+            with lock:
+                state["in_flight"] += 1
+                state["peak"] = max(state["peak"], state["in_flight"])
+            _time.sleep(0.05)
+            with lock:
+                state["in_flight"] -= 1
+            return fake_http_response(200, {"data": {}})
+
+        bodies = [{"query": "q"}] * 8
+        with patch("_graphql_client.requests.Session.post", side_effect=respond):
+            results = post_graphql_many(self.URL, self.HEADERS, bodies, concurrency=3)
+        self.assertEqual(len(results), 8)
+        self.assertLessEqual(state["peak"], 3)
+        self.assertGreater(state["peak"], 1, "queries must actually overlap")
+
+    def test_async_retries_network_with_async_backoff(self):
+        import asyncio
+        import requests as _r
+        from unittest.mock import AsyncMock
+        from _graphql_client import post_graphql_async
+        good = fake_http_response(200, {"data": {"ok": 1}})
+        with patch("_graphql_client.requests.Session.post",
+                   side_effect=[_r.ConnectionError("blip"), good]) as p, \
+             patch("_graphql_client.asyncio.sleep", new_callable=AsyncMock) as sleep, \
+             patch("_graphql_client.time.sleep") as blocking_sleep:
+            data, err = asyncio.run(post_graphql_async(self.URL, self.HEADERS, {"query": "q"}))
+        self.assertIsNone(err)
+        self.assertEqual(p.call_count, 2)
+        sleep.assert_awaited_once()
+        blocking_sleep.assert_not_called()
+
+    def test_async_does_not_retry_auth(self):
+        import asyncio
+        from _graphql_client import post_graphql_async
+        with patch("_graphql_client.requests.Session.post",
+                   return_value=fake_http_response(401, {"message": "Bad"})) as p:
+            data, err = asyncio.run(post_graphql_async(self.URL, self.HEADERS, {"query": "q"}))
+        self.assertEqual(err, ErrorKind.AUTH)
+        self.assertEqual(p.call_count, 1)
+
+
+class RateLimitBudget(unittest.TestCase):
+    URL = "https://api.github.com/graphql"
+    HEADERS = {"Authorization": "Bearer x", "Content-Type": "application/json"}
+    BODY = {"query": "query { viewer { login } }"}
+
+    def setUp(self):
+        import _graphql_client
+        _graphql_client._budget = None
+
+    def tearDown(self):
+        import _graphql_client
+        _graphql_client._budget = None
+
+    def test_headers_feed_the_budget(self):
+        from datetime import datetime, timezone
+        import _graphql_client
+        r = fake_http_response(200, {"data": {}}, headers={
+            "x-ratelimit-remaining": "4321", "x-ratelimit-limit": "5000",
+            "x-ratelimit-reset": "1784419200"})
+        with patch("_graphql_client.requests.Session.post", return_value=r):
+            post_graphql(self.URL, self.HEADERS, self.BODY)
+        before_reset = datetime(2026, 7, 18, 23, 0, tzinfo=timezone.utc)
+        self.assertEqual(_graphql_client.remaining_budget(now=before_reset), 4321)
+        self.assertEqual(_graphql_client.budget_snapshot()["limit"], 5000)
+
+    def test_graphql_ratelimit_block_wins_and_records_cost(self):
+        from datetime import datetime, timezone
+        import _graphql_client
+        body = {"data": {"rateLimit": {"cost": 3, "remaining": 120,
+                                       "resetAt": "2026-07-19T01:00:00Z"}}}
+        r = fake_http_response(200, body, headers={"x-ratelimit-remaining": "125"})
+        with patch("_graphql_client.requests.Session.post", return_value=r):
+            post_graphql(self.URL, self.HEADERS, self.BODY)
+        now = datetime(2026, 7, 19, 0, 30, tzinfo=timezone.utc)
+        self.assertEqual(_graphql_client.remaining_budget(now=now), 120)
+        self.assertEqual(_graphql_client.budget_snapshot()["last_cost"], 3)
+        self.assertFalse(_graphql_client.has_budget(500, now=now))
+        self.assertTrue(_graphql_client.has_budget(100, now=now))
+
+    def test_exhausted_403_is_recorded(self):
+        import _graphql_client
+        r = fake_http_response(403, {"message": "rate limit"}, headers={
+            "x-ratelimit-remaining": "0", "x-ratelimit-reset": "4102444800"})
+        with patch("_graphql_client.requests.Session.post", return_value=r):
+            _, err = post_graphql(self.URL, self.HEADERS, self.BODY)
+        self.assertEqual(err, ErrorKind.RATE_LIMIT)
+        self.assertEqual(_graphql_client.remaining_budget(), 0)
+        self.assertFalse(_graphql_client.has_budget(1))
+
+    def test_unknown_or_reset_budget_is_not_a_blocker(self):
+        from datetime import datetime, timezone
+        import _graphql_client
+        self.assertIsNone(_graphql_client.remaining_budget())
+        self.assertTrue(_graphql_client.has_budget(10_000))
+        _graphql_client._budget = {"remaining": 0, "reset_at": "2026-07-19T01:00:00+00:00"}
+        after_reset = datetime(2026, 7, 19, 2, 0, tzinfo=timezone.utc)
+        self.assertIsNone(_graphql_client.remaining_budget(now=after_reset))
+
+    def test_unknown_budget_is_seeded_from_rate_limit_query(self):
+        from datetime import datetime, timezone
+        import _graphql_client
+        body = {"data": {"rateLimit": {"cost": 0, "remaining": 40,
+                                       "resetAt": "2026-07-19T01:00:00Z"}}}
+        now = datetime(2026, 7, 19, 0, 30, tzinfo=timezone.utc)
+        with patch("_graphql_client.requests.Session.post",
+                   return_value=fake_http_response(200, body)) as post:
+            self.assertEqual(_graphql_client.seed_budget(self.URL, self.HEADERS, now=now), 40)
+            self.assertFalse(_graphql_client.has_budget(100, now=now))
+            # Known now: a second gate costs no request.
+            self.assertEqual(_graphql_client.seed_budget(self.URL, self.HEADERS, now=now), 40)
+        self.assertEqual(post.call_count, 1)
+        self.assertIn("rateLimit", post.call_args.kwargs["json"]["query"])
+
+    def test_seed_without_token_or_on_failure_stays_unknown(self):
+        import requests
+        import _graphql_client
+        with patch("_graphql_client.requests.Session.post") as post:
+            self.assertIsNone(_graphql_client.seed_budget(self.URL, {}))
+        post.assert_not_called()
+        with patch("_graphql_client.requests.Session.post",
+                   side_effect=requests.ConnectionError("boom")):
+            self.assertIsNone(_graphql_client.seed_budget(self.URL, self.HEADERS))
+        self.assertTrue(_graphql_client.has_budget(10_000))
+
+    def test_budget_persists_between_runs(self):
+        import shutil
+        import tempfile
+        from pathlib import Path
+        import _graphql_client
+        tmp = Path(tempfile.mkdtemp())
+        try:
+            with patch.dict("os.environ", {"GRAPHQL_BUDGET_PATH": str(tmp / "budget.json")}):
+                r = fake_http_response(200, {"data": {}}, headers={
+                    "x-ratelimit-remaining": "77", "x-ratelimit-reset": "4102444800"})
+                with patch("_graphql_client.requests.Session.post", return_value=r):
+                    post_graphql(self.URL, self.HEADERS, self.BODY)
+                _graphql_client._budget = None  # simulate a fresh process
+                self.assertEqual(_graphql_client.remaining_budget(), 77)
+        finally:
+            shutil.rmtree(tmp)
+
+
+class ResponseCache(unittest.TestCase):
+    URL = "https://api.github.com/graphql"
+    HEADERS = {"Authorization": "Bearer x", "Content-Type": "application/json"}
+    BODY = {"query": "query($u: String!) { user(login: $u) { id } }",
+            "variables": {"u": "Piesson"}}
+
+    def setUp(self):
+        import shutil
+        import tempfile
+        from pathlib import Path
+        import _graphql_client
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp)
+        env = patch.dict("os.environ", {"GRAPHQL_CACHE_PATH": str(self.tmp / "cache.json")})
+        env.start()
+        self.addCleanup(env.stop)
+        for name, value in (("_cache", None), ("_cache_hits", 0), ("_cache_misses", 0),
+                            ("_cache_loaded_from", None), ("_cache_dirty", False)):
+            p = patch.object(_graphql_client, name, value)
+            p.start()
+            self.addCleanup(p.stop)
+
+    def _ok(self):
+        return fake_http_response(200, {"data": {"user": {"id": "U1"}}})
+
+    def test_repeat_inside_ttl_costs_no_request(self):
+        import _graphql_client
+        with patch("_graphql_client.requests.Session.post", return_value=self._ok()) as m:
+            first = post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+            second = post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+        self.assertEqual(m.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(_graphql_client.cache_stats(),
+                         {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_key_ignores_query_whitespace_but_not_variables_or_token(self):
+        from _graphql_client import _cache_key
+        reformatted = {"query": "query($u: String!) {\n  user(login: $u) {\n    id\n  }\n}",
+                       "variables": {"u": "Piesson"}}
+        self.assertEqual(_cache_key(self.URL, self.HEADERS, self.BODY),
+                         _cache_key(self.URL, self.HEADERS, reformatted))
+        other_user = {**self.BODY, "variables": {"u": "someone"}}
+        self.assertNotEqual(_cache_key(self.URL, self.HEADERS, self.BODY),
+                            _cache_key(self.URL, self.HEADERS, other_user))
+        other_token = {**self.HEADERS, "Authorization": "Bearer y"}
+        self.assertNotEqual(_cache_key(self.URL, self.HEADERS, self.BODY),
+                            _cache_key(self.URL, other_token, self.BODY))
+
+    def test_expired_entry_is_refetched(self):
+        with patch("_graphql_client.requests.Session.post", return_value=self._ok()) as m, \
+             patch("_graphql_client.time.time", side_effect=[1000.0, 1000.0, 1100.0, 1100.0]):
+            post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+            post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+        self.assertEqual(m.call_count, 2)
+
+    def test_failures_are_not_cached(self):
+        with patch("_graphql_client.requests.Session.post",
+                   side_effect=[fake_http_response(401, {}), self._ok()]) as m:
+            _, err = post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+            data, err2 = post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+        self.assertEqual(err, ErrorKind.AUTH)
+        self.assertIsNone(err2)
+        self.assertEqual(m.call_count, 2)
+
+    def test_no_ttl_bypasses_cache(self):
+        with patch("_graphql_client.requests.Session.post", return_value=self._ok()) as m:
+            post_graphql(self.URL, self.HEADERS, self.BODY)
+            post_graphql(self.URL, self.HEADERS, self.BODY)
+        self.assertEqual(m.call_count, 2)
+
+    def test_cache_survives_a_new_process(self):
+        import _graphql_client
+        with patch("_graphql_client.requests.Session.post", return_value=self._ok()):
+            post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+        _graphql_client._cache = None  # simulate the next script in the job
+        with patch("_graphql_client.requests.Session.post") as m:
+            data, err = post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+        m.assert_not_called()
+        self.assertEqual(data["data"]["user"]["id"], "U1")
+
+    def test_hits_defer_the_write_until_flush(self):
+        import json
+        import _graphql_client
+        clock = iter(range(100, 200))
+        with patch("_graphql_client.time.time", side_effect=lambda: float(next(clock))), \
+             patch("_graphql_client.requests.Session.post", return_value=self._ok()):
+            post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+        on_disk = (self.tmp / "cache.json").read_text()
+        with patch("_graphql_client.time.time", side_effect=lambda: float(next(clock))), \
+             patch.object(_graphql_client, "_save_cache", wraps=_graphql_client._save_cache) as save:
+            for _ in range(3):
+                post_graphql(self.URL, self.HEADERS, self.BODY, ttl=60)
+            save.assert_not_called()
+            self.assertEqual((self.tmp / "cache.json").read_text(), on_disk)
+            _graphql_client._flush_cache()
+            _graphql_client._flush_cache()
+        self.assertEqual(save.call_count, 1)
+        entry, = json.loads((self.tmp / "cache.json").read_text())["entries"].values()
+        self.assertGreater(entry["used_at"], entry["stored_at"])
+
+    def test_lru_eviction_keeps_recently_used(self):
+        import _graphql_client
+        bodies = [{"query": "q", "variables": {"i": i}} for i in range(3)]
+        clock = iter(range(100, 200))
+        with patch.object(_graphql_client, "_CACHE_MAX_ENTRIES", 2), \
+             patch("_graphql_client.time.time", side_effect=lambda: float(next(clock))), \
+             patch("_graphql_client.requests.Session.post", return_value=self._ok()) as m:
+            post_graphql(self.URL, self.HEADERS, bodies[0], ttl=600)
+            post_graphql(self.URL, self.HEADERS, bodies[1], ttl=600)
+            post_graphql(self.URL, self.HEADERS, bodies[0], ttl=600)  # touch 0
+            post_graphql(self.URL, self.HEADERS, bodies[2], ttl=600)  # evicts 1
+            self.assertEqual(m.call_count, 3)
+            post_graphql(self.URL, self.HEADERS, bodies[0], ttl=600)
+            self.assertEqual(m.call_count, 3)
+            post_graphql(self.URL, self.HEADERS, bodies[1], ttl=600)
+            self.assertEqual(m.call_count, 4)
+
+
 if __name__ == "__main__":
     unittest.main()
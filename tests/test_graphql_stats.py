@@ -3,10 +3,14 @@
 import shutil
 import tempfile
 import unittest
+from datetime import datetime, timezone
 from pathlib import Path
 from unittest.mock import patch
 from tests.conftest import fake_http_response
 
+# No closed months yet: the current year is still one open window.
+JANUARY = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
 
 class GraphqlStatsAliasedQuery(unittest.TestCase):
     def setUp(self):
@@ -29,12 +33,12 @@ class GraphqlStatsAliasedQuery(unittest.TestCase):
                 "totalIssueContributions": 3,
             } for y in range(2020, 2027)
         }}}
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(200, body)) as p:
             import graphql_stats
             with patch.object(graphql_stats, "CACHE_PATH", self.cache_path):
                 stats = graphql_stats.get_github_activity_stats_graphql(
-                    "Piesson", "tok", current_year=2026)
+                    "Piesson", "tok", current_year=2026, now=JANUARY)
         self.assertEqual(p.call_count, 1, "must use a single aliased GraphQL request")
         # 7 years x 10 commits each
         self.assertEqual(stats["commits"], 70)
@@ -45,12 +49,12 @@ class GraphqlStatsAliasedQuery(unittest.TestCase):
     def test_returns_none_on_api_failure(self):
         body = {"errors": [{"type": "RATE_LIMIT", "message": "..."}]}
         # RATE_LIMIT does not retry, so no need to patch time.sleep
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(200, body)):
             import graphql_stats
             with patch.object(graphql_stats, "CACHE_PATH", self.cache_path):
                 self.assertIsNone(graphql_stats.get_github_activity_stats_graphql(
-                    "Piesson", "tok", current_year=2026))
+                    "Piesson", "tok", current_year=2026, now=JANUARY))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,98 @@
+"""History archive: indexed lookups, append-only upserts, hot-window trimming."""
+
+import json
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.conftest import enter_dir, tmp_dir
+
+import _history_archive
+from _history_archive import HistoryArchive, archive_and_trim, full_history
+
+
+def week(n, commits=0):
+    return {"week": f"2026-W{n:02d}", "startDate": "", "endDate": "",
+            "metrics": {"commits": commits}}
+
+
+class ArchiveCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self)
+        self.path = self.tmp / "history" / "archive.jsonl"
+        self.archive = HistoryArchive(self.path)
+
+
+class Lookups(ArchiveCase):
+    def test_get_uses_index_not_scan(self):
+        self.archive.put_many([week(n, n) for n in range(1, 30)])
+        fresh = HistoryArchive(self.path)
+        with patch.object(HistoryArchive, "_rebuild") as rebuild:
+            self.assertEqual(fresh.get("2026-W17")["metrics"]["commits"], 17)
+        rebuild.assert_not_called()
+        self.assertIsNone(fresh.get("2026-W40"))
+        self.assertEqual(fresh.weeks()[0], "2026-W29")
+
+    def test_unchanged_put_appends_nothing(self):
+        self.archive.put(week(1, 5))
+        size = self.path.stat().st_size
+        self.assertFalse(self.archive.put(week(1, 5)))
+        self.assertEqual(self.path.stat().st_size, size)
+
+    def test_updated_week_latest_wins(self):
+        self.archive.put(week(1, 5))
+        self.assertTrue(self.archive.put(week(1, 9)))
+        self.assertEqual(HistoryArchive(self.path).get("2026-W01")["metrics"]["commits"], 9)
+        self.assertEqual(len(list(self.archive.entries())), 1)
+
+    def test_stale_index_is_rebuilt(self):
+        self.archive.put(week(1, 5))
+        with open(self.path, "a") as f:  # e.g. a merge appended a line
+            f.write(json.dumps(week(2, 7)) + "\n")
+        self.assertEqual(HistoryArchive(self.path).get("2026-W02")["metrics"]["commits"], 7)
+
+    def test_compaction_drops_superseded_lines(self):
+        for commits in range(5):
+            self.archive.put(week(1, commits))
+        self.assertLessEqual(self.path.read_text().count("\n"), 2)
+        self.assertEqual(self.archive.get("2026-W01")["metrics"]["commits"], 4)
+
+    def test_reading_missing_archive_writes_nothing(self):
+        self.assertEqual(self.archive.weeks(), [])
+        self.assertFalse(self.path.parent.exists())
+
+
+class HotWindow(ArchiveCase):
+    def test_trim_keeps_hot_window_and_archives_everything(self):
+        data = {"weeklyHistory": [week(n) for n in range(20, 0, -1)]}
+        archive_and_trim(data, self.archive, keep=12)
+        self.assertEqual(len(data["weeklyHistory"]), 12)
+        self.assertEqual(len(self.archive.weeks()), 20)
+        merged = full_history(data, self.archive)
+        self.assertEqual([e["week"] for e in merged],
+                         [f"2026-W{n:02d}" for n in range(20, 0, -1)])
+
+    def test_hot_copy_wins_over_archive(self):
+        data = {"weeklyHistory": [week(2, 1), week(1, 1)]}
+        archive_and_trim(data, self.archive)
+        data["weeklyHistory"][0]["metrics"]["commits"] = 99  # backfilled since
+        self.assertEqual(full_history(data, self.archive)[0]["metrics"]["commits"], 99)
+
+    def test_weekly_reset_archives_the_week_it_drops(self):
+        import check_weekly_reset as cwr
+        enter_dir(self, self.tmp)
+        data = {
+            "currentWeek": {"startDate": "2026-04-06", "endDate": "2026-04-12",
+                            "metrics": {"commits": 3}},
+            "weeklyHistory": [week(n) for n in range(14, 2, -1)],
+        }
+        cwr.save_to_history(data, cwr.get_current_week_info())
+        self.assertEqual(len(data["weeklyHistory"]), _history_archive.HOT_WEEKS)
+        self.assertEqual(data["weeklyHistory"][0]["week"], "2026-W15")
+        archive = HistoryArchive(Path("dashboard/history/archive.jsonl"))
+        self.assertIn("2026-W03", archive)  # left the hot window, kept here
+        self.assertEqual(archive.get("2026-W15")["metrics"]["commits"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+"""SQLite metrics view: lossless import/export and indexed week queries."""
+
+import io
+import json
+import sys
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.conftest import DASHBOARD_DIR, tmp_dir
+
+import _build_manifest
+import _data_store
+import metrics_db
+from _history_archive import HistoryArchive
+from _token_ledger import TokenLedger
+
+KST = timezone(timedelta(hours=9))
+REPO_DATA = DASHBOARD_DIR / "data.json"
+
+
+def entry(week, start, commits, tokens=None, **extra):
+    metrics = {"commits": commits,
+               "socialContent": {"instagram": 1, "tiktok": 0, "hellotalk": 2},
+               "userSessions": 0, "ctoMeetings": 1, "blogPosts": 0,
+               "workouts": {"running": 1, "gym": 1}}
+    metrics.update(extra)
+    if tokens is not None:
+        metrics["tokens"] = {"claude": tokens, "codex": 0, "total": tokens, "updatedAt": None}
+    end = (datetime.strptime(start, "%Y-%m-%d") + timedelta(days=6)).strftime("%Y-%m-%d")
+    return {"week": week, "startDate": start, "endDate": end, "metrics": metrics}
+
+
+def sample():
+    current = entry(None, "2026-05-18", 9, tokens=50)
+    del current["week"]
+    return {
+        "lastUpdated": "2026-05-19",
+        "currentWeek": current,
+        "weeklyHistory": [
+            entry("2026-W20", "2026-05-11", 30, tokens=200),
+            entry("2026-W19", "2026-05-04", 20, tokens=100),
+            entry("2026-W18", "2026-04-27", 10),
+        ],
+        "goals": {"weeklyCommits": 140},
+    }
+
+
+class DbCase(unittest.TestCase):
+    def setUp(self):
+        self.conn = metrics_db.connect(Path(":memory:"))
+        self.addCleanup(self.conn.close)
+
+    def load(self, data, **kwargs):
+        kwargs.setdefault("ledger_path", None)
+        kwargs.setdefault("calendar_path", None)
+        return metrics_db.import_data(self.conn, data, **kwargs)
+
+
+class RoundTrip(DbCase):
+    def test_repo_data_json_round_trips(self):
+        data = json.loads(REPO_DATA.read_text())
+        self.load(data)
+        self.assertEqual(metrics_db.export_data(self.conn), data)
+
+    def test_reimport_replaces_rows(self):
+        self.load(sample())
+        self.load(sample())
+        self.assertEqual(self.conn.execute("SELECT COUNT(*) FROM weeks").fetchone()[0], 4)
+
+    def test_export_keeps_hot_window_only(self):
+        data = sample()
+        self.load(data)
+        out = metrics_db.export_data(self.conn, hot_weeks=2)
+        self.assertEqual([e["week"] for e in out["weeklyHistory"]], ["2026-W20", "2026-W19"])
+        self.assertEqual(list(out), list(data))
+
+    def test_legacy_int_rollups(self):
+        data = sample()
+        data["weeklyHistory"][2]["metrics"].update(socialContent=5, workouts=3)
+        self.load(data)
+        row = self.conn.execute("SELECT social, instagram, workouts FROM weeks "
+                                "WHERE week = '2026-W18'").fetchone()
+        self.assertEqual(tuple(row), (5, 0, 3))
+
+
+class Queries(DbCase):
+    def setUp(self):
+        super().setUp()
+        self.load(sample())
+
+    def test_series_and_cumulative(self):
+        self.assertEqual(metrics_db.weekly_series(self.conn, "commits"),
+                         [("2026-W18", 10), ("2026-W19", 20), ("2026-W20", 30), ("2026-W21", 9)])
+        self.assertEqual(metrics_db.cumulative(self.conn, "commits", "2026-05-01")[-1], ("2026-W21", 59))
+        self.assertEqual(metrics_db.weekly_series(self.conn, "tokens_total", include_current=False),
+                         [("2026-W18", 0), ("2026-W19", 100), ("2026-W20", 200)])
+
+    def test_trend_and_totals(self):
+        self.assertEqual(metrics_db.trend(self.conn, "commits", "2026-W20"), (30, 20))
+        self.assertEqual(metrics_db.trend(self.conn, "commits", "2026-W18"), (10, None))
+        self.assertIsNone(metrics_db.trend(self.conn, "commits", "2020-W01"))
+        totals = metrics_db.totals(self.conn)
+        self.assertEqual((totals["commits"], totals["social"], totals["tokens_total"]), (69, 12, 350))
+
+    def test_current_trends(self):
+        self.assertEqual(metrics_db.current_trends(self.conn, ["commits", "social"]),
+                         {"commits": (9, 30), "social": (3, 3)})
+        self.load({"weeklyHistory": sample()["weeklyHistory"]})
+        self.assertEqual(metrics_db.current_trends(self.conn, ["commits"]), {})
+
+    def test_unknown_metric_rejected(self):
+        with self.assertRaises(ValueError):
+            metrics_db.weekly_series(self.conn, "commits; DROP TABLE weeks")
+
+
+class Sources(DbCase):
+    def setUp(self):
+        super().setUp()
+        self.tmp = tmp_dir(self)
+
+    def test_archive_ledger_and_calendar(self):
+        archive = HistoryArchive(self.tmp / "archive.jsonl")
+        archive.put(entry("2026-W10", "2026-03-02", 7))
+        ledger_path = self.tmp / "ledger.jsonl"
+        TokenLedger(ledger_path).record("claude", {date(2026, 5, 4): 40}, date(2026, 5, 4),
+                                        date(2026, 5, 4), datetime(2026, 5, 6, tzinfo=KST))
+        calendar_path = self.tmp / "calendar.json"
+        calendar_path.write_text(json.dumps({"version": 1, "days": {
+            "2026-05-04": {"commits": 3, "fetched_at": "2026-05-06T00:00:00+09:00"}}}))
+        self.load(sample(), archive=archive, ledger_path=ledger_path, calendar_path=calendar_path)
+
+        self.assertEqual(metrics_db.weekly_series(self.conn, "commits")[0], ("2026-W10", 7))
+        tokens = metrics_db.daily_range(self.conn, "daily_tokens", "2026-05-01", "2026-05-31")
+        self.assertEqual([tuple(r) for r in tokens], [("2026-05-04", "claude", 40)])
+        commits = metrics_db.daily_range(self.conn, "daily_metrics", "2026-05-04", "2026-05-04")
+        self.assertEqual([tuple(r) for r in commits], [("2026-05-04", "commits", 3)])
+        # Older archived weeks stay out of the exported hot window.
+        hot = metrics_db.export_data(self.conn, hot_weeks=3)["weeklyHistory"]
+        self.assertNotIn("2026-W10", [e["week"] for e in hot])
+
+
+class Consumers(unittest.TestCase):
+    """The CLI and generate_svg against a temp checkout (relative paths)."""
+
+    def setUp(self):
+        self.tmp = tmp_dir(self, chdir=True)
+        (self.tmp / "dashboard").mkdir()
+        self.data_path = self.tmp / "dashboard" / "data.json"
+        self.data_path.write_text(json.dumps(sample(), indent=2))
+        for mod, name in ((_build_manifest, "_manifests"), (_data_store, "_stores")):
+            p = patch.object(mod, name, {})
+            p.start()
+            self.addCleanup(p.stop)
+
+    def run_cli(self, *argv):
+        err = io.StringIO()
+        with redirect_stdout(io.StringIO()), redirect_stderr(err):
+            code = metrics_db.main(list(argv))
+        return code, err.getvalue()
+
+    def test_export_refuses_a_moved_on_data_json(self):
+        self.assertEqual(self.run_cli("import"), (0, ""))
+        data = json.loads(self.data_path.read_text())
+        data["currentWeek"]["metrics"]["commits"] = 99
+        self.data_path.write_text(json.dumps(data, indent=2))
+        code, err = self.run_cli("export")
+        self.assertEqual(code, 1)
+        self.assertIn("run `import` first", err)
+        self.assertEqual(json.loads(self.data_path.read_text()), data)
+        # Re-importing clears the way, and an export keeps the db in step.
+        self.assertEqual(self.run_cli("import")[0], 0)
+        self.assertEqual(self.run_cli("export"), (0, ""))
+        self.assertEqual(self.run_cli("export"), (0, ""))
+        self.assertEqual(json.loads(self.data_path.read_text()), data)
+
+    def test_dashboard_trends_come_from_the_db(self):
+        data = sample()
+        # Legacy int rollups in last week's entry still give a social trend.
+        data["weeklyHistory"][0]["metrics"].update(socialContent=1, workouts=1)
+        self.data_path.write_text(json.dumps(data, indent=2))
+        for m in ("generate_svg", "get_weekly_commits"):
+            sys.modules.pop(m, None)
+        with patch("get_weekly_commits.get_weekly_commits", return_value=None):
+            import generate_svg
+            with patch.object(generate_svg.metrics_db, "current_trends",
+                              wraps=metrics_db.current_trends) as trends:
+                generate_svg.generate_dashboard_svg()
+        trends.assert_called_once()
+        svg = (self.tmp / "dashboard" / "weekly_dashboard.svg").read_text()
+        self.assertIn("▼ -70%", svg)   # commits 9 vs 30
+        self.assertIn("▲ +200%", svg)  # social 3 vs 1
+        self.assertIn("▲ +100%", svg)  # workouts 2 vs 1
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""pipeline.py: stage ordering, exit-code semantics, one data.json parse."""
+
+import io
+import json
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+
+from tests.conftest import tmp_dir
+from tests.test_caller_fallbacks import SAMPLE_DATA
+
+import _data_store
+import pipeline
+from pipeline import STAGE_FAILED, Stage, run_pipeline
+
+
+def _exits(code):
+    def run():
+        sys.exit(code)
+    return run
+
+
+class ExitCodes(unittest.TestCase):
+    def test_gate_no_reset_skips_rest_and_exits_1(self):
+        after = MagicMock()
+        code = run_pipeline([Stage('gate', _exits(1), gate=True), Stage('after', after)])
+        self.assertEqual(code, 1)
+        after.assert_not_called()
+
+    def test_gate_reset_runs_everything_and_exits_0(self):
+        calls = []
+        code = run_pipeline([
+            Stage('gate', lambda: calls.append('gate') or sys.exit(0), gate=True),
+            Stage('a', lambda: calls.append('a')),
+            Stage('b', lambda: calls.append('b') or True),
+        ])
+        self.assertEqual(code, 0)
+        self.assertEqual(calls, ['gate', 'a', 'b'])
+
+    def test_failing_stage_is_distinct_from_no_reset(self):
+        after = MagicMock()
+        self.assertEqual(run_pipeline([Stage('a', lambda: False), Stage('b', after)]),
+                         STAGE_FAILED)
+        after.assert_not_called()
+
+    def test_exception_is_reported_as_stage_failure(self):
+        def boom():
+            raise RuntimeError("boom")
+        self.assertEqual(run_pipeline([Stage('gate', boom, gate=True)]), STAGE_FAILED)
+
+    def test_unknown_pipeline(self):
+        self.assertEqual(pipeline.main(['nope']), STAGE_FAILED)
+        self.assertEqual(pipeline.main(['--list']), 0)
+
+
+class SlackPipelineSharesState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self, chdir=True)
+        (self.tmp / "dashboard").mkdir()
+        (self.tmp / "dashboard" / "data.json").write_text(json.dumps(SAMPLE_DATA, indent=2))
+        stores = patch.object(_data_store, "_stores", {})
+        stores.start()
+        self.addCleanup(stores.stop)
+
+    def test_slack_then_svg_parse_data_json_once(self):
+        for m in ("slack_update", "generate_svg", "get_weekly_commits"):
+            sys.modules.pop(m, None)
+        with patch("get_weekly_commits.get_weekly_commits", return_value=42), \
+             patch("sys.stdin", io.StringIO("1 0 0 2 0 0 1 1")), \
+             patch.dict("os.environ", {}, clear=False), \
+             patch("_data_store.json.loads", side_effect=json.loads) as loads:
+            os.environ.pop("SLACK_WEBHOOK_URL", None)
+            code = pipeline.main(['slack'])
+        self.assertEqual(code, 0)
+        self.assertEqual(loads.call_count, 1)
+        d = json.loads((self.tmp / "dashboard" / "data.json").read_text())
+        self.assertEqual(d["currentWeek"]["metrics"]["userSessions"], 3)
+        self.assertEqual(d["currentWeek"]["metrics"]["commits"], 42)
+        self.assertTrue((self.tmp / "dashboard" / "weekly_dashboard.svg").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+"""Local SVG line charts: axes, null gaps, data labels, README wiring."""
+
+import json
+import shutil
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.conftest import DASHBOARD_DIR, tmp_dir
+
+import generate_progress_chart as gpc
+
+SVG = "{http://www.w3.org/2000/svg}"
+
+
+def parse(svg):
+    return ET.fromstring(svg)
+
+
+def texts(root):
+    return [t.text for t in root.iter(f"{SVG}text")]
+
+
+class LineChart(unittest.TestCase):
+    def test_nice_axis(self):
+        self.assertEqual(gpc._y_axis([0, 87]), (100, [0, 20, 40, 60, 80, 100]))
+        self.assertEqual(gpc._y_axis([0.4, 1.3])[0], 1.5)
+        self.assertEqual(gpc._y_axis([None, 0]), (1, [0, 1]))
+
+    def test_null_gap_splits_the_line(self):
+        svg = gpc.render_line_chart(
+            ["W1", "W2", "W3", "W4", "W5"],
+            [{"label": "A", "data": [1, 2, None, 4, 5], "color": "#111111", "axis": "y1"}],
+            title="T")
+        root = parse(svg)
+        self.assertEqual(len(list(root.iter(f"{SVG}polyline"))), 2)
+        self.assertEqual(len(list(root.iter(f"{SVG}circle"))), 4)
+
+    def test_dual_axis_ticks_and_titles(self):
+        root = parse(gpc.render_line_chart(
+            ["W1", "W2"],
+            [{"label": "Big", "data": [100, 900], "color": "#111111", "axis": "y1"},
+             {"label": "Small", "data": [1, 3], "color": "#222222", "axis": "y2"}],
+            title="T", axis_titles={"y1": "Left", "y2": "Right"}))
+        labels = texts(root)
+        self.assertIn("1000", labels)  # y1 ticks
+        self.assertIn("3", labels)     # y2 ticks
+        self.assertIn("Left", labels)
+        self.assertIn("Right", labels)
+
+    def test_overlapping_data_labels_are_dropped(self):
+        root = parse(gpc.render_line_chart(
+            ["W1", "W2"],
+            [{"label": "A", "data": [5, 5], "color": "#111111", "axis": "y1"},
+             {"label": "B", "data": [5, 5], "color": "#222222", "axis": "y1"}],
+            title="T"))
+        point_labels = [t for t in root.iter(f"{SVG}text") if t.get("font-size") == "9"]
+        self.assertEqual(len(point_labels), 2)
+        self.assertEqual({t.get("fill") for t in point_labels}, {"#111111"})
+
+    def test_long_series_thinned_to_plot_width(self):
+        n = 5000
+        data = [i % 50 for i in range(n)]
+        data[2500] = 400
+        data[4000:4010] = [None] * 10
+        root = parse(gpc.render_line_chart(
+            [f"W{i}" for i in range(n)],
+            [{"label": "A", "data": data, "color": "#111111", "axis": "y1"}], title="T"))
+        lines = list(root.iter(f"{SVG}polyline"))
+        self.assertEqual(len(lines), 2)  # the gap survives thinning
+        vertices = sum(len(line.get("points").split()) for line in lines)
+        self.assertLessEqual(vertices, 900 - gpc.LC_LEGEND_W - gpc.LC_AXIS_W - 20)
+        self.assertIn("400", texts(root))  # the peak is kept and labelled
+        self.assertEqual(list(root.iter(f"{SVG}circle")), [])
+
+    def test_sparkline_thinned_to_card_width(self):
+        values = list(range(3000))
+        points, _, kept = gpc._scale_points(values, gpc.CHART_W, gpc.CHART_H)
+        self.assertEqual(len(points), gpc.CHART_W)
+        self.assertEqual(kept[-1], 2999)
+        self.assertEqual(points[-1][0], gpc.CHART_W)
+
+
+class Charts(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self, chdir=True)
+        Path("dashboard").mkdir()
+        shutil.copy(DASHBOARD_DIR / "data.json", "dashboard/data.json")
+        self.raw = json.loads(Path("dashboard/data.json").read_text())
+        gpc.get_store().reload()
+
+    def test_progress_and_tokens_charts_written(self):
+        data = gpc.load_weekly_data()
+        self.assertEqual(gpc.save_progress_chart_svg(data), str(gpc.PROGRESS_CHART_PATH))
+        root = parse(gpc.PROGRESS_CHART_PATH.read_text())
+        self.assertIn("Progress Tracker", texts(root))
+        self.assertIn(data["weeks"][-1], texts(root))
+        self.assertEqual(gpc.save_tokens_chart_svg(self.raw), str(gpc.TOKENS_CHART_PATH))
+        self.assertIn("Claude Code", texts(parse(gpc.TOKENS_CHART_PATH.read_text())))
+
+    def test_archived_weeks_feed_every_series(self):
+        from _history_archive import HistoryArchive
+        old = {"week": "2024-W10", "startDate": "2024-03-04", "endDate": "2024-03-10",
+               "metrics": {"commits": 1000, "tokens": {"claude": 2_000_000_000, "codex": 0,
+                                                       "total": 2_000_000_000}}}
+        untracked = {"week": "2024-W09", "startDate": "2024-02-26", "endDate": "2024-03-03",
+                     "metrics": {"commits": 7}}
+        HistoryArchive().put_many([untracked, old])
+        hot = len(self.raw["weeklyHistory"])
+        data = gpc.load_weekly_data()
+        self.assertEqual(data["weeks"][:2], ["W09", "W10"])
+        self.assertEqual(len(data["weeks"]), hot + 2)
+        self.assertEqual(data["commits"][1], 1007)  # cumulative from the archive on
+        tokens = gpc.load_tokens_series(self.raw)
+        self.assertEqual(tokens["weeks"][0], "W10")  # untracked W09 is not a leading gap
+        self.assertEqual(tokens["claude"][0], 2.0)
+
+    def test_archive_length_history_is_thinned_end_to_end(self):
+        """Years of archived weeks go through update_readme_charts and come
+        out LTTB-thinned: one vertex per pixel, first and last week kept."""
+        import update_readme_charts
+        from _history_archive import HistoryArchive
+        weeks = [f"{2010 + n // 52}-W{n % 52 + 1:02d}" for n in range(700)]
+        HistoryArchive().put_many([
+            {"week": w, "metrics": {"commits": (n * 37) % 90, "userSessions": n % 5,
+                                    "tokens": {"claude": n * 10_000_000, "codex": 0,
+                                               "total": n * 10_000_000}}}
+            for n, w in enumerate(weeks)])
+        Path("README.md").write_text("# Weekly History\n\n# Tech Stack\n")
+        with patch.object(gpc, "lttb", wraps=gpc.lttb) as thin:
+            self.assertTrue(update_readme_charts.update_readme_with_charts())
+        self.assertTrue(any(len(c.args[0]) > c.args[2] for c in thin.call_args_list))
+
+        plot_w = 900 - gpc.LC_LEGEND_W - gpc.LC_AXIS_W - 20  # widest: single-axis chart
+        for path in (gpc.PROGRESS_CHART_PATH, gpc.TOKENS_CHART_PATH):
+            root = parse(path.read_text())
+            labels = texts(root)
+            self.assertIn("W01", labels, path)  # first archived week
+            for line in root.iter(f"{SVG}polyline"):
+                self.assertLessEqual(len(line.get("points").split()), plot_w, path)
+            self.assertEqual(list(root.iter(f"{SVG}circle")), [], path)
+
+        root = parse(Path("dashboard/progress_sparklines.svg").read_text())
+        cards = [line for line in root.iter(f"{SVG}polyline")]
+        self.assertEqual(len(cards), len(gpc.METRICS))
+        for line in cards:
+            self.assertLessEqual(len(line.get("points").split()), gpc.CHART_W)
+        self.assertIn("W01", texts(root))
+
+    def test_no_tokens_chart_before_tracking(self):
+        for entry in self.raw["weeklyHistory"] + [self.raw["currentWeek"]]:
+            entry["metrics"].pop("tokens", None)
+        self.assertIsNone(gpc.generate_tokens_chart_svg(self.raw))
+        self.assertIsNone(gpc.save_tokens_chart_svg(self.raw))
+        self.assertFalse(gpc.TOKENS_CHART_PATH.exists())
+
+    def test_readme_embeds_static_files(self):
+        import update_readme_charts
+        Path("README.md").write_text("# Weekly History\n\n# Tech Stack\n")
+        self.assertTrue(update_readme_charts.update_readme_with_charts())
+        readme = Path("README.md").read_text()
+        self.assertIn(update_readme_charts.PROGRESS_CHART_URL, readme)
+        self.assertIn(update_readme_charts.TOKENS_CHART_URL, readme)
+        self.assertNotIn("quickchart.io", readme)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,171 @@
+"""README model: marker sections, one-time migration, one write per run."""
+
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+
+import _readme
+from _build_manifest import BuildManifest
+from _readme import Readme, get_readme
+
+UPDATED = '<div align="right"><sub>updated at 08/22/26</sub></div>'
+
+LEGACY = f"""# Intro
+
+<p align="center">
+  <img src="https://example.com/0-profile-details.svg" alt="Profile Details">
+</p>
+
+{UPDATED}
+
+# Grinding enough?
+
+<p align="center">
+  <img src="https://example.com/weekly_dashboard.svg" alt="Weekly Dashboard">
+</p>
+
+{UPDATED}
+
+# Consistent enough?
+
+<p align="center">
+  <img src="https://example.com/chart.svg" alt="Consistent enough?">
+</p>
+
+<details>
+<summary><strong>More details</strong></summary>
+
+</details>
+
+{UPDATED}
+
+# AI Tokens
+
+<p align="center">
+  <img src="https://example.com/tokens.svg" alt="AI Tokens">
+</p>
+
+{UPDATED}
+
+# Weekly History
+
+| Week | Commits |
+|------|---------|
+| W34 | 80 |
+
+{UPDATED}
+
+# Tech Stack
+
+- python
+"""
+
+
+class ReadmeCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self, chdir=True)
+        self.path = self.tmp / "README.md"
+        readmes = patch.object(_readme, "_readmes", {})
+        readmes.start()
+        self.addCleanup(readmes.stop)
+
+
+class Migration(ReadmeCase):
+    def test_legacy_blocks_fenced_in_place(self):
+        self.path.write_text(LEGACY)
+        readme = Readme(self.path)
+        text = readme.text()
+        self.assertEqual([l for l in text.splitlines() if not l.startswith("<!-- ")],
+                         LEGACY.splitlines())
+        for name in _readme.SPECS:
+            self.assertIsNotNone(readme.section(name), name)
+        self.assertTrue(readme.section("tokens").startswith("# AI Tokens\n"))
+        # Re-parsing migrated text is a fixed point and needs no regexes.
+        self.path.write_text(text)
+        with patch.object(_readme.re, "compile") as compile_:
+            self.assertEqual(Readme(self.path).text(), text)
+        compile_.assert_not_called()
+
+    def test_retired_sections_dropped(self):
+        self.path.write_text("# Cumulative Progress\n\nold\n\n# Tech Stack\n")
+        self.assertEqual(Readme(self.path).text(), "\n# Tech Stack\n")
+
+    def test_unterminated_marker_is_plain_text(self):
+        self.path.write_text("<!-- readme:charts -->\nhello\n")
+        readme = Readme(self.path)
+        self.assertIsNone(readme.section("charts"))
+        self.assertEqual(readme.text(), "<!-- readme:charts -->\nhello\n")
+
+
+class Sections(ReadmeCase):
+    def test_missing_sections_placed_like_before(self):
+        self.path.write_text("# Weekly History\n\n# Tech Stack\n")
+        readme = Readme(self.path)
+        readme.set_section("weekly-history", "# Weekly History\n\n| a |\n|---|\n")
+        readme.set_section("charts", "# Consistent enough?\n")
+        readme.set_section("tokens", "# Token Usage\n")
+        text = readme.text()
+        order = [text.index(f"<!-- readme:{n} -->") for n in ("charts", "tokens", "weekly-history")]
+        self.assertEqual(order, sorted(order))
+        self.assertLess(order[-1], text.index("# Tech Stack"))
+
+    def test_timestamp_sections_never_inserted(self):
+        self.path.write_text("# readme\n")
+        readme = Readme(self.path)
+        self.assertFalse(readme.set_section("dashboard", "# Grinding enough?\n"))
+        self.assertFalse(readme.save())
+        self.assertEqual(self.path.read_text(), "# readme\n")
+
+    def test_empty_body_keeps_markers(self):
+        self.path.write_text(LEGACY)
+        readme = Readme(self.path)
+        self.assertTrue(readme.set_section("tokens", ""))
+        self.assertEqual(readme.section("tokens"), "")
+        self.assertNotIn("# AI Tokens", readme.text())
+        self.assertIn("<!-- readme:tokens -->\n<!-- /readme:tokens -->\n", readme.text())
+
+
+class Writes(ReadmeCase):
+    def test_deferred_saves_write_once_and_record_every_artifact(self):
+        self.path.write_text(LEGACY)
+        manifest = BuildManifest(self.tmp / "manifest.json")
+        readme = get_readme()
+        with patch.object(_readme, "atomic_write_text", wraps=_readme.atomic_write_text), \
+             patch("_build_manifest.atomic_write_text", wraps=_readme.atomic_write_text) as write:
+            with readme.deferred():
+                readme.set_section("charts", "# Consistent enough?\n\nnew\n")
+                readme.save(manifest, "README.md#charts", "c1", ("charts",))
+                readme.set_section("weekly-history", "# Weekly History\n\nnew\n")
+                readme.save(manifest, "README.md#weekly-history", "h1", ("weekly-history",))
+                self.assertEqual(self.path.read_text(), LEGACY)
+        readme_writes = [c for c in write.call_args_list if Path(c.args[0]) == self.path]
+        self.assertEqual(len(readme_writes), 1)
+        self.assertIn("\nnew\n", self.path.read_text())
+        self.assertTrue(manifest.is_fresh("README.md#charts", "c1", self.path,
+                                          readme.part("charts")))
+        self.assertTrue(manifest.is_fresh("README.md#weekly-history", "h1", self.path,
+                                          readme.part("weekly-history")))
+
+    def test_unchanged_bytes_not_written(self):
+        self.path.write_text(LEGACY)
+        readme = get_readme()
+        readme.save()  # migration alone is written...
+        before = self.path.stat().st_mtime_ns
+        readme.set_section("charts", readme.section("charts"))
+        with patch.object(_readme, "atomic_write_text") as write:
+            self.assertFalse(readme.save())  # ...but an identical render is not
+        write.assert_not_called()
+        self.assertEqual(self.path.stat().st_mtime_ns, before)
+
+    def test_reloads_after_external_write(self):
+        self.path.write_text("# one\n")
+        readme = get_readme()
+        self.assertEqual(readme.text(), "# one\n")
+        self.path.write_text("# two, longer\n")
+        self.assertEqual(readme.text(), "# two, longer\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Columnar series builder: one pass, cached by content, numpy optional."""
+
+import unittest
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+
+import _series
+
+
+def entry(week, commits, social=None, workouts=None, tokens=None):
+    metrics = {"commits": commits, "userSessions": 1, "ctoMeetings": 0, "blogPosts": 2,
+               "socialContent": social if social is not None else {"instagram": 1, "tiktok": 2},
+               "workouts": workouts if workouts is not None else {"running": 1, "gym": 0}}
+    if tokens is not None:
+        metrics["tokens"] = {"claude": tokens, "codex": 0, "total": tokens}
+    return {"week": week, "metrics": metrics}
+
+
+class BuildSeries(unittest.TestCase):
+    def setUp(self):
+        _series.clear_cache()
+
+    def test_sorted_weekly_and_cumulative_columns(self):
+        series = _series.build_series([
+            entry("2026-W20", 5, tokens=300),
+            entry("2026-W18", 10, social=4, workouts=3),  # legacy plain numbers
+            entry("2026-W19", 1),
+        ])
+        self.assertEqual(series["weeks"], ["2026-W18", "2026-W19", "2026-W20"])
+        self.assertEqual(series["labels"], ["W18", "W19", "W20"])
+        self.assertEqual(series["weekly"]["social_posts"], [4, 3, 3])
+        self.assertEqual(series["cumulative"]["commits"], [10, 11, 16])
+        self.assertEqual(series["cumulative"]["workouts"], [3, 4, 5])
+        self.assertEqual(series["tokens"]["total"], [None, None, 300])
+
+    def test_empty_and_malformed_history(self):
+        series = _series.build_series([{"week": "", "metrics": {}}])
+        self.assertEqual(series["weeks"], [])
+        self.assertEqual(series["cumulative"]["commits"], [])
+        self.assertEqual(_series.cumulative_view(series)["weeks"], [])
+
+    def test_cached_by_content(self):
+        history = [entry("2026-W18", 1)]
+        with patch.object(_series, "_build", wraps=_series._build) as build:
+            first = _series.build_series(history)
+            self.assertIs(_series.build_series([entry("2026-W18", 1)]), first)
+            _series.build_series([entry("2026-W18", 2)])
+        self.assertEqual(build.call_count, 2)
+
+    def test_pure_python_fallback_matches(self):
+        history = [entry(f"{2000 + n // 52}-W{n % 52 + 1:02d}", n) for n in range(3000)]
+        with patch.object(_series, "np", None):
+            pure = _series._build(history)
+        self.assertEqual(pure["cumulative"]["commits"][-1], sum(range(3000)))
+        self.assertEqual(_series._build(history), pure)
+
+    def test_float_values_keep_each_column_type(self):
+        history = [entry("2026-W17", 1, social=1), entry("2026-W18", 2, social=1.5)]
+        with patch.object(_series, "np", None):
+            pure = _series._build(history)["cumulative"]
+        built = _series._build(history)["cumulative"]
+        self.assertEqual(built, pure)
+        self.assertEqual([type(v) for v in built["commits"]], [int, int])
+        self.assertEqual([type(v) for v in built["social_posts"]], [int, float])
+
+    def test_cumulative_view_is_a_copy(self):
+        series = _series.build_series([entry("2026-W18", 1)])
+        view = _series.cumulative_view(series)
+        view["commits"].append(99)
+        self.assertEqual(series["cumulative"]["commits"], [1])
+        self.assertEqual(set(view), {"weeks", *_series.METRIC_KEYS})
+
+
+class HistorySeries(unittest.TestCase):
+    def setUp(self):
+        from _history_archive import HistoryArchive
+        _series.clear_cache()
+        self.archive = HistoryArchive(tmp_dir(self) / "archive.jsonl")
+
+    def test_archive_weeks_included_and_read_once(self):
+        self.archive.put_many([entry("2026-W01", 4), entry("2026-W18", 0)])
+        data = {"weeklyHistory": [entry("2026-W18", 10)]}
+        with patch.object(self.archive, "entries", wraps=self.archive.entries) as scan:
+            series = _series.history_series(data, self.archive)
+            self.assertIs(_series.history_series(data, self.archive), series)
+        self.assertEqual(scan.call_count, 1)
+        self.assertEqual(series["weeks"], ["2026-W01", "2026-W18"])
+        self.assertEqual(series["cumulative"]["commits"], [4, 14])  # hot copy wins
+
+    def test_new_archive_line_rebuilds(self):
+        data = {"weeklyHistory": [entry("2026-W18", 10)]}
+        self.assertEqual(_series.history_series(data, self.archive)["weeks"], ["2026-W18"])
+        self.archive.put(entry("2026-W02", 1))
+        self.assertEqual(_series.history_series(data, self.archive)["weeks"],
+                         ["2026-W02", "2026-W18"])
+
+class Lttb(unittest.TestCase):
+    def test_short_series_untouched(self):
+        self.assertEqual(_series.lttb(range(5), [1, 2, 3, 4, 5], 10), [0, 1, 2, 3, 4])
+
+    def test_caps_points_and_keeps_peaks(self):
+        ys = [0] * 1000
+        ys[123], ys[777] = 50, -40
+        keep = _series.lttb(range(1000), ys, 100)
+        self.assertEqual(len(keep), 100)
+        self.assertEqual((keep[0], keep[-1]), (0, 999))
+        self.assertEqual(keep, sorted(keep))
+        self.assertIn(123, keep)
+        self.assertIn(777, keep)
+
+    def test_pure_python_matches(self):
+        xs = list(range(0, 3000, 3))
+        ys = [(i * 7919) % 101 for i in range(len(xs))]
+        with patch.object(_series, "np", None):
+            pure = _series.lttb(xs, ys, 64)
+        self.assertEqual(_series.lttb(xs, ys, 64), pure)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""SVG template layer: parse-once templates and the shared card grid."""
+
+import unittest
+
+import _svg_templates
+from _svg_templates import SvgTemplate, render_card_grid
+
+
+class Template(unittest.TestCase):
+    def test_render_fields_specs_and_escapes(self):
+        t = SvgTemplate('<text x="{x}">{total:,}</text>{{literal}}')
+        self.assertEqual(t.fields, {"x", "total"})
+        self.assertEqual(t.render(x=3, total=12345), '<text x="3">12,345</text>{literal}')
+        self.assertEqual(t.render({"x": 1}, total=2), '<text x="1">2</text>{literal}')
+
+    def test_render_many(self):
+        t = SvgTemplate("<g>{v}</g>")
+        self.assertEqual(t.render_many([{"v": 1}, {"v": 2}]), ["<g>1</g>", "<g>2</g>"])
+
+    def test_rejects_expressions(self):
+        for text in ("{a.b}", "{a[0]}", "{}", "{a!r}"):
+            with self.assertRaises(ValueError, msg=text):
+                SvgTemplate(text)
+
+    def test_missing_field_raises(self):
+        with self.assertRaises(KeyError):
+            SvgTemplate("{a}").render()
+
+    def test_defs_indent(self):
+        self.assertTrue(_svg_templates.defs("  ").startswith("  <defs>\n    <linearGradient"))
+        self.assertTrue(_svg_templates.defs().endswith("\n    </defs>"))
+
+
+class CardGrid(unittest.TestCase):
+    def test_grid_positions_and_row_comments(self):
+        values = {key: {"value": i, "note": "n"}
+                  for i, (key, _, _) in enumerate(_svg_templates.METRIC_CARDS)}
+        svg = render_card_grid(_svg_templates.HISTORY_CARD, values, top=75)
+        self.assertTrue(svg.startswith("    <!-- Row 1: Commits, User Talks, Social Posts -->\n"))
+        self.assertIn("<!-- Row 2: Coffee Chats, Workouts, Blog Posts -->", svg)
+        self.assertEqual(svg.count("<g transform="), 6)
+        self.assertIn('translate(340, 190)', svg)
+
+    def test_history_svg_from_legacy_entry(self):
+        import generate_weekly_history
+        svg = generate_weekly_history.generate_history_svg({
+            "week": "2025-W01", "startDate": "2025-01-01", "endDate": "2025-01-07",
+            "metrics": {"commits": 12, "socialContent": 7, "workouts": 3},
+        })
+        self.assertTrue(svg.startswith('<svg width="520" height="330"'))
+        self.assertIn("Week 01 Archive", svg)
+        self.assertIn("IG:2 TT:2 HT:3", svg)
+        self.assertIn("Run:1 Gym:2", svg)
+        self.assertTrue(svg.endswith("    </g>\n\n</svg>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+"""Per-day token ledger: max-wins rows, completeness, backfill without re-query."""
+
+import json
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+
+import get_weekly_tokens as gwt
+from _token_ledger import TokenLedger
+
+KST = timezone(timedelta(hours=9))
+MON = date(2026, 5, 4)
+SUN = date(2026, 5, 10)
+AFTER_WEEK = datetime(2026, 5, 11, 0, 5, tzinfo=KST)
+
+
+class LedgerCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self)
+        self.path = self.tmp / "token_ledger.jsonl"
+
+
+class Rows(LedgerCase):
+    def test_round_trip_and_completeness(self):
+        ledger = TokenLedger(self.path)
+        ledger.record("claude", {MON: 100, SUN: 5}, MON, SUN, captured_at=AFTER_WEEK)
+        reloaded = TokenLedger(self.path)
+        self.assertEqual(reloaded.tokens(MON, "claude"), 100)
+        self.assertEqual(reloaded.tokens(date(2026, 5, 5), "claude"), 0)
+        self.assertEqual(reloaded.week_total("claude", MON, SUN), 105)
+        self.assertIsNone(reloaded.week_total("codex", MON, SUN))
+
+    def test_mid_week_capture_is_not_complete(self):
+        ledger = TokenLedger(self.path)
+        wed_noon = datetime(2026, 5, 6, 12, 0, tzinfo=KST)
+        ledger.record("claude", {MON: 100, date(2026, 5, 6): 7}, MON, SUN, captured_at=wed_noon)
+        self.assertTrue(ledger.is_complete(MON, "claude"))
+        self.assertFalse(ledger.is_complete(date(2026, 5, 6), "claude"))
+        self.assertIsNone(ledger.tokens(date(2026, 5, 7), "claude"))  # future: no row
+        self.assertIsNone(ledger.week_total("claude", MON, SUN))
+
+    def test_lower_capture_never_lowers_and_appends_nothing(self):
+        ledger = TokenLedger(self.path)
+        ledger.record("claude", {MON: 100}, MON, SUN, captured_at=AFTER_WEEK)
+        rows = self.path.read_text().count("\n")
+        # Logs pruned: a later read sees less.
+        later = AFTER_WEEK + timedelta(days=40)
+        self.assertEqual(ledger.record("claude", {MON: 3}, MON, SUN, captured_at=later), 0)
+        self.assertEqual(self.path.read_text().count("\n"), rows)
+        self.assertEqual(TokenLedger(self.path).week_total("claude", MON, SUN), 100)
+
+    def test_days_before_first_returned_row_are_not_covered(self):
+        ledger = TokenLedger(self.path)
+        # Captured long after the logs for Mon..Wed were pruned.
+        later = AFTER_WEEK + timedelta(days=40)
+        ledger.record("claude", {date(2026, 5, 7): 9}, MON, SUN, captured_at=later)
+        self.assertIsNone(ledger.tokens(MON, "claude"))
+        self.assertFalse(ledger.is_complete(MON, "claude"))
+        self.assertTrue(ledger.is_complete(SUN, "claude"))
+        self.assertIsNone(ledger.week_total("claude", MON, SUN))
+        self.assertEqual(ledger.record("codex", {}, MON, SUN, captured_at=later), 0)
+        self.assertFalse(ledger.is_complete(SUN, "codex"))
+
+    def test_torn_tail_is_skipped_and_not_glued(self):
+        self.path.write_text(json.dumps({"date": "2026-05-04", "source": "claude",
+                                         "tokens": 9, "capturedAt": AFTER_WEEK.isoformat()})
+                             + '\n{"date": "2026-05-0')
+        ledger = TokenLedger(self.path)
+        self.assertEqual(ledger.tokens(MON, "claude"), 9)
+        ledger.record("codex", {MON: 4}, MON, MON, captured_at=AFTER_WEEK)
+        self.assertEqual(TokenLedger(self.path).tokens(MON, "codex"), 4)
+
+
+class Backfill(LedgerCase):
+    def stale_data(self):
+        return {"weeklyHistory": [{
+            "week": "2026-W19", "startDate": "2026-05-04", "endDate": "2026-05-10",
+            "metrics": {"tokens": {"claude": 50, "codex": 0, "total": 50,
+                                   "updatedAt": "2026-05-06T00:05:20+09:00"}},
+        }]}
+
+    def test_covered_week_needs_no_query(self):
+        ledger = TokenLedger(self.path)
+        ledger.record("claude", {MON: 300}, MON, SUN, captured_at=AFTER_WEEK)
+        ledger.record("codex", {MON: 5, SUN: 20}, MON, SUN, captured_at=AFTER_WEEK)
+        data = self.stale_data()
+        with patch.object(gwt, "fetch_claude_daily") as mc, \
+             patch.object(gwt, "fetch_codex_daily") as mx:
+            self.assertEqual(gwt.backfill_weekly_history(data, ledger), 1)
+        mc.assert_not_called()
+        mx.assert_not_called()
+        tokens = data["weeklyHistory"][0]["metrics"]["tokens"]
+        self.assertEqual((tokens["claude"], tokens["codex"], tokens["total"]), (300, 25, 325))
+
+    def test_pruned_logs_keep_ledger_days(self):
+        """Only Monday is still in the logs; the other days come from the ledger."""
+        ledger = TokenLedger(self.path)
+        ledger.record("claude", {MON: 100, date(2026, 5, 8): 400}, MON, SUN,
+                      captured_at=datetime(2026, 5, 9, 0, 5, tzinfo=KST))
+        data = self.stale_data()
+        with patch.object(gwt, "fetch_claude_daily", return_value=({MON: 100}, True)), \
+             patch.object(gwt, "fetch_codex_daily", return_value=({}, True)):
+            gwt.backfill_weekly_history(data, ledger)
+        self.assertEqual(data["weeklyHistory"][0]["metrics"]["tokens"]["claude"], 500)
+
+    def test_pruned_week_is_queried_again(self):
+        """An empty answer doesn't settle the week: the next run asks again."""
+        ledger = TokenLedger(self.path)
+        data = self.stale_data()
+        with patch.object(gwt, "fetch_claude_daily", return_value=({}, True)), \
+             patch.object(gwt, "fetch_codex_daily", return_value=({}, True)):
+            gwt.backfill_weekly_history(data, ledger)
+        self.assertEqual(data["weeklyHistory"][0]["metrics"]["tokens"]["claude"], 50)
+        data = self.stale_data()
+        with patch.object(gwt, "fetch_claude_daily", return_value=({MON: 80}, True)) as mc, \
+             patch.object(gwt, "fetch_codex_daily", return_value=({}, True)):
+            gwt.backfill_weekly_history(data, ledger)
+        mc.assert_called_once()
+        self.assertEqual(data["weeklyHistory"][0]["metrics"]["tokens"]["claude"], 80)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+"""Native usage-log reader: KST day sums, dedup, byte-offset checkpoints."""
+
+import json
+import os
+import shutil
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+
+import _usage_logs
+import get_weekly_tokens as gwt
+
+
+def claude_line(ts, msg_id, req_id, inp=10, out=5, create=0, read=0):
+    return json.dumps({
+        "type": "assistant", "timestamp": ts, "requestId": req_id,
+        "message": {"id": msg_id, "usage": {
+            "input_tokens": inp, "output_tokens": out,
+            "cache_creation_input_tokens": create, "cache_read_input_tokens": read,
+        }},
+    }) + "\n"
+
+
+def codex_line(ts, last=None, running=None):
+    info = {}
+    if last is not None:
+        info["last_token_usage"] = {"total_tokens": last}
+    if running is not None:
+        info["total_token_usage"] = {"total_tokens": running}
+    return json.dumps({"timestamp": ts, "type": "event_msg",
+                       "payload": {"type": "token_count", "info": info}}) + "\n"
+
+
+class LogCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self)
+        self.claude = self.tmp / "claude" / "projects" / "proj"
+        self.codex = self.tmp / "codex" / "sessions" / "2026" / "05" / "04"
+        self.claude.mkdir(parents=True)
+        self.codex.mkdir(parents=True)
+        self.checkpoint = self.tmp / "checkpoint.json"
+        env = patch.dict(os.environ, {
+            "CLAUDE_CONFIG_DIR": str(self.tmp / "claude"),
+            "CODEX_HOME": str(self.tmp / "codex"),
+            "USAGE_CHECKPOINT_PATH": str(self.checkpoint),
+        })
+        env.start()
+        self.addCleanup(env.stop)
+        state = patch.multiple(_usage_logs, _checkpoint=None, _checkpoint_from=None)
+        state.start()
+        self.addCleanup(state.stop)
+
+    def forget_memory(self):
+        """Next read comes from the checkpoint file, as in a new process."""
+        _usage_logs._checkpoint = None
+
+
+class ClaudeLogs(LogCase):
+    def test_sums_per_kst_day_and_dedups(self):
+        (self.claude / "a.jsonl").write_text(
+            claude_line("2026-05-03T14:59:59Z", "m1", "r1", inp=100)   # 23:59 KST
+            + claude_line("2026-05-03T15:00:00Z", "m2", "r2", create=7, read=3)  # 00:00 KST
+            + json.dumps({"type": "user", "timestamp": "2026-05-03T15:01:00Z"}) + "\n"
+            + "not json\n"
+        )
+        # A resumed session repeats m2 in a new file.
+        (self.claude / "b.jsonl").write_text(claude_line("2026-05-03T15:00:00Z", "m2", "r2"))
+        days = _usage_logs.read_daily("claude")
+        self.assertEqual(days, {date(2026, 5, 3): 105, date(2026, 5, 4): 25})
+
+    def test_only_appended_bytes_are_parsed(self):
+        log = self.claude / "a.jsonl"
+        log.write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        self.assertEqual(_usage_logs.fetch_total("claude", "2026-05-04", "2026-05-10"), (15, True))
+        self.forget_memory()
+
+        partial = claude_line("2026-05-04T02:00:00Z", "m3", "r3")
+        with open(log, "a") as f:
+            f.write(claude_line("2026-05-04T01:30:00Z", "m2", "r2"))
+            f.write(partial[:20])  # still being written
+        with patch("_usage_logs.json.loads", side_effect=json.loads) as loads:
+            self.assertEqual(_usage_logs.fetch_total("claude", "2026-05-04", "2026-05-10"), (30, True))
+        # The checkpoint itself, then only the one new complete line.
+        self.assertEqual(loads.call_count, 2)
+
+        with open(log, "a") as f:
+            f.write(partial[20:])
+        self.assertEqual(_usage_logs.fetch_total("claude", "2026-05-04", "2026-05-10"), (45, True))
+
+    def test_truncated_file_is_reread(self):
+        log = self.claude / "a.jsonl"
+        log.write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1", inp=1000)
+                       + claude_line("2026-05-04T01:00:01Z", "m2", "r2"))
+        _usage_logs.read_daily("claude")
+        log.write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        self.assertEqual(_usage_logs.read_daily("claude"), {date(2026, 5, 4): 15})
+
+    def test_deleted_file_drops_out(self):
+        (self.claude / "a.jsonl").write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        (self.claude / "b.jsonl").write_text(claude_line("2026-05-04T01:00:00Z", "m2", "r2"))
+        _usage_logs.read_daily("claude")
+        (self.claude / "a.jsonl").unlink()
+        self.assertEqual(_usage_logs.read_daily("claude"), {date(2026, 5, 4): 15})
+
+
+    def test_dedup_keys_kept_only_for_recent_days(self):
+        (self.claude / "a.jsonl").write_text(
+            claude_line("2026-03-01T01:00:00Z", "old", "r0")
+            + claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        _usage_logs.read_daily("claude")
+        rec, = json.loads(self.checkpoint.read_text())["sources"]["claude"]["files"].values()
+        self.assertEqual(rec["keys"], {"2026-05-04": ["m1:r1"]})
+        # A resumed session repeating a recent message is still deduplicated.
+        (self.claude / "b.jsonl").write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        self.assertEqual(_usage_logs.read_daily("claude")[date(2026, 5, 4)], 15)
+
+    def test_unchanged_logs_do_not_rewrite_checkpoint(self):
+        (self.claude / "a.jsonl").write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        _usage_logs.read_daily("claude")
+        with patch.object(_usage_logs, "_save_checkpoint") as save:
+            self.assertEqual(_usage_logs.read_daily("claude"), {date(2026, 5, 4): 15})
+        save.assert_not_called()
+
+class CodexLogs(LogCase):
+    def test_last_usage_and_running_total_delta(self):
+        (self.codex / "rollout-1.jsonl").write_text(
+            codex_line("2026-05-04T01:00:00Z", last=100, running=100)
+            + codex_line("2026-05-04T02:00:00Z", last=50, running=150)
+            + codex_line("2026-05-04T03:00:00Z", running=180)    # no per-turn block
+            + json.dumps({"timestamp": "2026-05-04T04:00:00Z", "type": "event_msg",
+                          "payload": {"type": "token_count", "info": None}}) + "\n"
+        )
+        self.assertEqual(_usage_logs.read_daily("codex"), {date(2026, 5, 4): 180})
+
+    def test_running_total_survives_checkpoint(self):
+        log = self.codex / "rollout-1.jsonl"
+        log.write_text(codex_line("2026-05-04T01:00:00Z", running=100))
+        _usage_logs.read_daily("codex")
+        self.forget_memory()
+        with open(log, "a") as f:
+            f.write(codex_line("2026-05-04T02:00:00Z", running=130))
+        self.assertEqual(_usage_logs.read_daily("codex"), {date(2026, 5, 4): 130})
+
+
+class Concurrent(LogCase):
+    def test_both_sources_share_one_checkpoint(self):
+        (self.claude / "a.jsonl").write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        (self.codex / "rollout-1.jsonl").write_text(codex_line("2026-05-04T01:00:00Z", last=9))
+        claude, codex = gwt.fetch_parallel(
+            (_usage_logs.fetch_total, "claude", "2026-05-04", "2026-05-10"),
+            (_usage_logs.fetch_total, "codex", "2026-05-04", "2026-05-10"),
+        )
+        self.assertEqual((claude, codex), ((15, True), (9, True)))
+        saved = json.loads(self.checkpoint.read_text())
+        self.assertEqual(set(saved["sources"]), {"claude", "codex"})
+
+
+class Fallback(LogCase):
+    def test_missing_log_dir_is_not_ok(self):
+        shutil.rmtree(self.tmp / "codex")
+        self.assertEqual(_usage_logs.fetch_total("codex", "2026-05-04", "2026-05-10"), (0, False))
+
+    def test_native_result_skips_cli(self):
+        (self.claude / "a.jsonl").write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        with patch.object(gwt.subprocess, "run") as run:
+            self.assertEqual(gwt.fetch_claude("2026-05-04", "2026-05-10"), (15, True))
+        run.assert_not_called()
+
+    def test_no_logs_falls_back_to_cli(self):
+        shutil.rmtree(self.tmp / "codex")
+        proc = type("Proc", (), {"returncode": 0, "stderr": "",
+                                 "stdout": '{"daily":[{"date":"2026-05-04","totalTokens":7}]}'})
+        with patch.object(gwt.subprocess, "run", return_value=proc) as run:
+            self.assertEqual(gwt.fetch_codex("2026-05-04", "2026-05-10"), (7, True))
+        run.assert_called_once()
+
+    def test_tokens_reader_cli_forces_cli(self):
+        (self.claude / "a.jsonl").write_text(claude_line("2026-05-04T01:00:00Z", "m1", "r1"))
+        proc = type("Proc", (), {"returncode": 0, "stderr": "", "stdout": '{"daily":[]}'})
+        with patch.dict(os.environ, {"TOKENS_READER": "cli"}), \
+             patch.object(gwt.subprocess, "run", return_value=proc) as run:
+            self.assertEqual(gwt.fetch_claude("2026-05-04", "2026-05-10"), (0, True))
+        run.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -37,6 +37,14 @@ def make_entry(week, start, end, tokens=None, **metric_overrides):
     return {"week": week, "startDate": start, "endDate": end, "metrics": metrics}
 
 
+def daily(day, total):
+    """A successful fetch_*_daily result with `total` tokens on one KST day."""
+    return {datetime.strptime(day, "%Y-%m-%d").date(): total}, True
+
+
+FAILED = ({}, False)
+
+
 class TestStaleDetection(unittest.TestCase):
     """Entries are stale when updatedAt < endDate + 1 day @ 00:00 KST."""
 
@@ -105,14 +113,14 @@ class TestStaleDetection(unittest.TestCase):
 
 
 class TestBackfill(unittest.TestCase):
-    """The actual re-query loop. Mock fetch_claude / fetch_codex."""
+    """The actual re-query loop. Mock fetch_claude_daily / fetch_codex_daily."""
 
     def _mk_data(self, entries):
         return {"weeklyHistory": entries}
 
     def test_no_entries_no_calls(self):
-        with patch.object(gwt, "fetch_claude") as mc, \
-             patch.object(gwt, "fetch_codex") as mx:
+        with patch.object(gwt, "fetch_claude_daily") as mc, \
+             patch.object(gwt, "fetch_codex_daily") as mx:
             data = self._mk_data([])
             self.assertEqual(gwt.backfill_weekly_history(data), 0)
             mc.assert_not_called()
@@ -120,8 +128,8 @@ class TestBackfill(unittest.TestCase):
 
     def test_complete_entries_skipped(self):
         """Idempotency: complete entries don't trigger ccusage."""
-        with patch.object(gwt, "fetch_claude") as mc, \
-             patch.object(gwt, "fetch_codex") as mx:
+        with patch.object(gwt, "fetch_claude_daily") as mc, \
+             patch.object(gwt, "fetch_codex_daily") as mx:
             data = self._mk_data([
                 make_entry(
                     "2026-W17", "2026-04-20", "2026-04-26",
@@ -138,8 +146,8 @@ class TestBackfill(unittest.TestCase):
 
     def test_stale_entry_gets_updated(self):
         """The W19 real-world scenario: stale entry re-queried + updated."""
-        with patch.object(gwt, "fetch_claude", return_value=(1_098_135_370, True)) as mc, \
-             patch.object(gwt, "fetch_codex", return_value=(36_474_284, True)) as mx:
+        with patch.object(gwt, "fetch_claude_daily", return_value=daily("2026-05-04", 1_098_135_370)) as mc, \
+             patch.object(gwt, "fetch_codex_daily", return_value=daily("2026-05-04", 36_474_284)) as mx:
             data = self._mk_data([
                 make_entry(
                     "2026-W19", "2026-05-04", "2026-05-10",
@@ -165,8 +173,8 @@ class TestBackfill(unittest.TestCase):
         days, so re-querying an old week under-counts. W22 was overwritten
         442,985,037 → 83,765,464 from a 4-day log remnant. A backfill must
         never LOWER a live-recorded value."""
-        with patch.object(gwt, "fetch_claude", return_value=(83_765_464, True)), \
-             patch.object(gwt, "fetch_codex", return_value=(0, True)):
+        with patch.object(gwt, "fetch_claude_daily", return_value=daily("2026-05-25", 83_765_464)), \
+             patch.object(gwt, "fetch_codex_daily", return_value=daily("2026-05-25", 0)):
             data = self._mk_data([
                 make_entry(
                     "2026-W22", "2026-05-25", "2026-05-31",
@@ -184,8 +192,8 @@ class TestBackfill(unittest.TestCase):
     def test_higher_requery_still_updates(self):
         """The guard only blocks decreases — a higher re-query (more complete
         local logs) must still win."""
-        with patch.object(gwt, "fetch_claude", return_value=(600_000_000, True)), \
-             patch.object(gwt, "fetch_codex", return_value=(1_000, True)):
+        with patch.object(gwt, "fetch_claude_daily", return_value=daily("2026-06-08", 600_000_000)), \
+             patch.object(gwt, "fetch_codex_daily", return_value=daily("2026-06-08", 1_000)):
             data = self._mk_data([
                 make_entry(
                     "2026-W24", "2026-06-08", "2026-06-14",
@@ -204,8 +212,8 @@ class TestBackfill(unittest.TestCase):
     def test_zero_query_preserves_nonzero(self):
         """Defensive: if ccusage returns 0 for an entry that had non-zero,
         KEEP the existing value. Could be transient ccusage breakage."""
-        with patch.object(gwt, "fetch_claude", return_value=(0, True)), \
-             patch.object(gwt, "fetch_codex", return_value=(0, True)):
+        with patch.object(gwt, "fetch_claude_daily", return_value=daily("2026-05-04", 0)), \
+             patch.object(gwt, "fetch_codex_daily", return_value=daily("2026-05-04", 0)):
             data = self._mk_data([
                 make_entry(
                     "2026-W19", "2026-05-04", "2026-05-10",
@@ -224,8 +232,8 @@ class TestBackfill(unittest.TestCase):
     def test_zero_query_ok_for_zero_entry(self):
         """Edge: if existing was 0 (e.g., Mac off that week) and re-query
         returns 0, accept the 0 (it's real)."""
-        with patch.object(gwt, "fetch_claude", return_value=(0, True)), \
-             patch.object(gwt, "fetch_codex", return_value=(0, True)):
+        with patch.object(gwt, "fetch_claude_daily", return_value=daily("2026-04-06", 0)), \
+             patch.object(gwt, "fetch_codex_daily", return_value=daily("2026-04-06", 0)):
             data = self._mk_data([
                 make_entry(
                     "2026-W15", "2026-04-06", "2026-04-12",
@@ -241,8 +249,8 @@ class TestBackfill(unittest.TestCase):
 
     def test_partial_failure_uses_existing(self):
         """If claude succeeds but codex fails, keep codex's previous value."""
-        with patch.object(gwt, "fetch_claude", return_value=(1_000_000_000, True)), \
-             patch.object(gwt, "fetch_codex", return_value=(0, False)):
+        with patch.object(gwt, "fetch_claude_daily", return_value=daily("2026-05-04", 1_000_000_000)), \
+             patch.object(gwt, "fetch_codex_daily", return_value=FAILED):
             data = self._mk_data([
                 make_entry(
                     "2026-W19", "2026-05-04", "2026-05-10",
@@ -260,8 +268,8 @@ class TestBackfill(unittest.TestCase):
 
     def test_both_sources_fail_skips_entry(self):
         """If both ccusage CLIs fail (e.g., offline), don't touch the entry."""
-        with patch.object(gwt, "fetch_claude", return_value=(0, False)), \
-             patch.object(gwt, "fetch_codex", return_value=(0, False)):
+        with patch.object(gwt, "fetch_claude_daily", return_value=FAILED), \
+             patch.object(gwt, "fetch_codex_daily", return_value=FAILED):
             data = self._mk_data([
                 make_entry(
                     "2026-W19", "2026-05-04", "2026-05-10",
@@ -277,9 +285,9 @@ class TestBackfill(unittest.TestCase):
             self.assertEqual(tokens["claude"], 800_000_000)  # preserved
 
     def test_multiple_entries_mixed(self):
-        """One stale, one complete → 1 call set, 1 skip."""
-        with patch.object(gwt, "fetch_claude", return_value=(500, True)) as mc, \
-             patch.object(gwt, "fetch_codex", return_value=(100, True)) as mx:
+        """One stale, one complete → one call per source, covering only the stale week."""
+        with patch.object(gwt, "fetch_claude_daily", return_value=daily("2026-05-04", 500)) as mc, \
+             patch.object(gwt, "fetch_codex_daily", return_value=daily("2026-05-04", 100)) as mx:
             data = self._mk_data([
                 # Stale (W19)
                 make_entry(
@@ -307,8 +315,8 @@ class TestBackfill(unittest.TestCase):
 
     def test_mm_dd_yyyy_dates_normalized_for_ccusage(self):
         """Legacy MM/DD/YYYY entries get normalized before ccusage call."""
-        with patch.object(gwt, "fetch_claude", return_value=(100, True)) as mc, \
-             patch.object(gwt, "fetch_codex", return_value=(0, True)):
+        with patch.object(gwt, "fetch_claude_daily", return_value=daily("2025-10-20", 100)) as mc, \
+             patch.object(gwt, "fetch_codex_daily", return_value=daily("2025-10-20", 0)):
             data = self._mk_data([
                 make_entry(
                     "2025-W43", "10/20/2025", "10/26/2025",
@@ -318,6 +326,100 @@ class TestBackfill(unittest.TestCase):
             gwt.backfill_weekly_history(data)
             mc.assert_called_once_with("2025-10-20", "2025-10-26")
 
+    def test_one_call_per_source_bucketed_into_weeks(self):
+        """Three stale weeks → one daily query per source spanning all of
+        them; each week gets only its own days (KST, inclusive)."""
+        from datetime import date
+        claude_days = {
+            date(2026, 5, 3): 7,       # W18 Sunday
+            date(2026, 5, 4): 100,     # W19 Monday
+            date(2026, 5, 10): 20,     # W19 Sunday
+            date(2026, 5, 18): 5_000,  # W21
+            date(2026, 5, 11): 999,    # W20 — not stale, must not leak in
+        }
+        with patch.object(gwt, "fetch_claude_daily", return_value=(claude_days, True)) as mc, \
+             patch.object(gwt, "fetch_codex_daily", return_value=({}, True)) as mx:
+            data = self._mk_data([
+                make_entry("2026-W18", "2026-04-27", "2026-05-03", tokens=None),
+                make_entry("2026-W19", "2026-05-04", "2026-05-10", tokens=None),
+                make_entry(
+                    "2026-W20", "2026-05-11", "2026-05-17",
+                    tokens={
+                        "claude": 999, "codex": 0, "total": 999,
+                        "updatedAt": "2026-05-18T09:00:00+09:00",
+                    },
+                ),
+                make_entry("2026-W21", "2026-05-18", "2026-05-24", tokens=None),
+            ])
+            self.assertEqual(gwt.backfill_weekly_history(data), 3)
+            mc.assert_called_once_with("2026-04-27", "2026-05-24")
+            mx.assert_called_once_with("2026-04-27", "2026-05-24")
+            claude = [e["metrics"]["tokens"]["claude"] for e in data["weeklyHistory"]]
+            self.assertEqual(claude, [7, 120, 999, 5_000])
+
+
+class TestDailyRows(unittest.TestCase):
+    """fetch_source_daily: ccusage daily rows → {KST date: tokens}."""
+
+    def _run(self, payload):
+        proc = type("Proc", (), {"returncode": 0, "stdout": json.dumps(payload), "stderr": ""})
+        with patch.object(gwt.subprocess, "run", return_value=proc):
+            return gwt.fetch_source_daily("claude", ["ccusage"], ["ccusage", "--offline"])
+
+    def test_rows_keyed_by_date(self):
+        days, ok = self._run({"daily": [
+            {"date": "2026-05-04", "totalTokens": 10},
+            {"date": "May 05, 2026", "totalTokens": 5},
+        ]})
+        self.assertTrue(ok)
+        self.assertEqual({d.isoformat(): n for d, n in days.items()},
+                         {"2026-05-04": 10, "2026-05-05": 5})
+
+    def test_undated_row_is_skipped(self):
+        days, ok = self._run({"daily": [
+            {"totalTokens": 10},
+            {"date": "05/04/2026?", "totalTokens": 3},
+            {"date": "2026-05-04", "totalTokens": 7},
+        ]})
+        self.assertTrue(ok)
+        self.assertEqual({d.isoformat(): n for d, n in days.items()}, {"2026-05-04": 7})
+
+
+class TestParallelFetch(unittest.TestCase):
+    """Claude and Codex are fetched side by side, results kept per source."""
+
+    def test_sources_overlap(self):
+        import threading
+        barrier = threading.Barrier(2, timeout=5)  # breaks if run one after another
+
+        def claude(start, end):
+            barrier.wait()
+            return daily(start, 300)
+
+        def codex(start, end):
+            barrier.wait()
+            return FAILED
+
+        with patch.object(gwt, "fetch_claude_daily", side_effect=claude), \
+             patch.object(gwt, "fetch_codex_daily", side_effect=codex):
+            data = {"weeklyHistory": [
+                make_entry(
+                    "2026-W19", "2026-05-04", "2026-05-10",
+                    tokens={
+                        "claude": 100, "codex": 40, "total": 140,
+                        "updatedAt": "2026-05-06T00:05:20+09:00",
+                    },
+                ),
+            ]}
+            self.assertEqual(gwt.backfill_weekly_history(data), 1)
+        tokens = data["weeklyHistory"][0]["metrics"]["tokens"]
+        self.assertEqual((tokens["claude"], tokens["codex"]), (300, 40))
+
+    def test_unexpected_error_propagates(self):
+        with self.assertRaises(RuntimeError):
+            gwt.fetch_parallel((lambda: daily("2026-05-04", 1),),
+                               (lambda: (_ for _ in ()).throw(RuntimeError("boom")),))
+
 
 if __name__ == "__main__":
     unittest.main()
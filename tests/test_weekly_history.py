@@ -0,0 +1,88 @@
+"""Weekly history SVG batch: change-only writes, --force, process pool."""
+
+import json
+import os
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from tests.conftest import tmp_dir
+
+import generate_weekly_history as gwh
+from _history_archive import HistoryArchive
+
+
+def week(n, commits=1):
+    return {"week": f"2026-W{n:02d}", "startDate": "2026-01-05", "endDate": "2026-01-11",
+            "metrics": {"commits": commits}}
+
+
+class HistoryCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tmp_dir(self, chdir=True)
+        self.history_dir = Path("dashboard/history")
+
+    def write_data(self, history):
+        Path("dashboard").mkdir(exist_ok=True)
+        Path("dashboard/data.json").write_text(json.dumps({"weeklyHistory": history}))
+        gwh.get_store().reload()
+
+    def svg(self, n):
+        return self.history_dir / f"weekly_history_2026-W{n:02d}.svg"
+
+
+class GenerateAll(HistoryCase):
+    def test_skips_existing_unless_forced(self):
+        self.write_data([week(2), week(1)])
+        gwh.generate_all_history_svgs()
+        self.svg(1).write_text("stale")
+        gwh.generate_all_history_svgs()
+        self.assertEqual(self.svg(1).read_text(), "stale")
+        gwh.generate_all_history_svgs(force=True)
+        self.assertEqual(self.svg(1).read_text(), gwh.generate_history_svg(week(1)))
+
+    def test_force_leaves_unchanged_files_alone(self):
+        self.write_data([week(1)])
+        gwh.generate_all_history_svgs()
+        with patch.object(gwh, "atomic_write_text") as write:
+            gwh.generate_all_history_svgs(force=True)
+        write.assert_not_called()
+
+    def test_archived_weeks_are_rendered(self):
+        HistoryArchive().put(week(1, 5))
+        self.write_data([week(2)])
+        gwh.generate_all_history_svgs()
+        self.assertIn(">\n            5\n", self.svg(1).read_text())
+
+
+class Batch(HistoryCase):
+    def test_pool_matches_in_process(self):
+        entries = [week(n, n) for n in range(1, gwh.PARALLEL_MIN_WEEKS + 1)]
+        self.assertEqual(gwh.pool_size(len(entries), 2), 2)
+        parallel = gwh.render_history_batch(entries, self.tmp / "a", workers=2)
+        serial = gwh.render_history_batch(entries, self.tmp / "b", workers=1)
+        self.assertEqual(parallel, serial)
+        self.assertTrue(all(written for _, written in parallel))
+        for n in (1, gwh.PARALLEL_MIN_WEEKS):
+            name = f"weekly_history_2026-W{n:02d}.svg"
+            self.assertEqual((self.tmp / "a" / name).read_text(), (self.tmp / "b" / name).read_text())
+
+    def test_small_batches_stay_in_process(self):
+        self.assertEqual(gwh.pool_size(3, 8), 1)
+        with patch.object(gwh, "ProcessPoolExecutor") as pool:
+            gwh.render_history_batch([week(1)], self.history_dir, workers=8)
+        pool.assert_not_called()
+
+    def test_pool_failure_falls_back(self):
+        entries = [week(n) for n in range(1, gwh.PARALLEL_MIN_WEEKS + 1)]
+        with patch.object(gwh, "ProcessPoolExecutor", side_effect=OSError("no fork")):
+            results = gwh.render_history_batch(entries, self.history_dir, workers=4)
+        self.assertEqual(len(results), len(entries))
+
+    def test_workers_env(self):
+        with patch.dict(os.environ, {"HISTORY_RENDER_WORKERS": "3"}):
+            self.assertEqual(gwh.pool_size(100), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
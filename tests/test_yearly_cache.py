@@ -5,11 +5,15 @@ import shutil
 import sys
 import tempfile
 import unittest
+from datetime import datetime, timezone
 from pathlib import Path
 
 DASHBOARD = Path(__file__).resolve().parent.parent / "dashboard"
 sys.path.insert(0, str(DASHBOARD))
 
+# No closed months yet: the current year is still one open window.
+JANUARY = datetime(2026, 1, 15, tzinfo=timezone.utc)
+
 
 class YearlyCacheBehavior(unittest.TestCase):
     def setUp(self):
@@ -87,16 +91,91 @@ class GraphqlStatsUsesCache(unittest.TestCase):
         }}}
         for m in ("graphql_stats",):
             sys.modules.pop(m, None)
-        with patch("_graphql_client.requests.post",
+        with patch("_graphql_client.requests.Session.post",
                    return_value=fake_http_response(200, body)) as p:
             import graphql_stats
             with patch.object(graphql_stats, "CACHE_PATH", self.cache_path):
                 stats = graphql_stats.get_github_activity_stats_graphql(
-                    "Piesson", "tok", current_year=2026)
+                    "Piesson", "tok", current_year=2026, now=JANUARY)
         self.assertEqual(p.call_count, 1)
         # 6 cached years x 10 + current year 99 = 159
         self.assertEqual(stats["commits"], 159)
 
 
+class MonthlyCheckpoints(unittest.TestCase):
+    """Current year = cached final months + one open window (current month → Dec 31)."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.cache_path = self.tmp / ".stats_cache.json"
+        self.cache_path.write_text(json.dumps({"version": 1, "years": {
+            str(y): {"commits": 10, "code_reviews": 0, "pull_requests": 0, "issues": 0,
+                     "computed_in_year": 2026} for y in range(2020, 2026)}}))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def run_stats(self, now, current_year=2026):
+        """Answer every alias with 1 commit; return (stats, [aliases per request])."""
+        from unittest.mock import patch
+        from tests.conftest import fake_http_response
+        import graphql_stats
+        requests = []
+
+        def post(url, json=None, **kwargs):
+            aliases = sorted(k[len("from_"):] for k in json["variables"] if k.startswith("from_"))
+            requests.append(aliases)
+            return fake_http_response(200, {"data": {"user": {
+                a: {"totalCommitContributions": 1} for a in aliases}}})
+
+        with patch("_graphql_client.requests.Session.post", side_effect=post), \
+             patch.object(graphql_stats, "CACHE_PATH", self.cache_path):
+            stats = graphql_stats.get_github_activity_stats_graphql(
+                "Piesson", "tok", current_year=current_year, now=now)
+        return stats, requests
+
+    def test_month_finality_and_windows(self):
+        from _yearly_cache import is_month_final, month_window
+        self.assertFalse(is_month_final(year=2026, month=9,
+                                        entry={"fetched_at": "2026-10-01T12:00:00+00:00"}))
+        self.assertTrue(is_month_final(year=2026, month=9,
+                                       entry={"fetched_at": "2026-10-02T00:00:00+00:00"}))
+        self.assertEqual(month_window(2026, 10, 12), ("2026-10-01T00:00:00Z", "2026-12-31T23:59:59Z"))
+        self.assertEqual(month_window(2026, 2, 2), ("2026-02-01T00:00:00Z", "2026-02-28T23:59:59Z"))
+
+    def test_closed_months_cached_then_only_open_window_queried(self):
+        stats, requests = self.run_stats(datetime(2026, 10, 14, tzinfo=timezone.utc))
+        self.assertEqual(requests, [[f"m2026_{m:02d}" for m in range(1, 10)] + ["y2026"]])
+        self.assertEqual(stats["commits"], 60 + 10)
+
+        stats, requests = self.run_stats(datetime(2026, 10, 20, tzinfo=timezone.utc))
+        self.assertEqual(requests, [["y2026"]])
+        self.assertEqual(stats["commits"], 60 + 10)
+
+    def test_just_closed_month_refetched_until_final(self):
+        self.run_stats(datetime(2026, 10, 1, 6, tzinfo=timezone.utc))
+        _, requests = self.run_stats(datetime(2026, 10, 3, tzinfo=timezone.utc))
+        self.assertEqual(requests, [["m2026_09", "y2026"]])
+
+    def test_finished_year_rolled_up_from_months(self):
+        self.run_stats(datetime(2026, 12, 20, tzinfo=timezone.utc))
+        stats, requests = self.run_stats(datetime(2027, 1, 10, tzinfo=timezone.utc), current_year=2027)
+        # December was still open in 2026, so 2026 is queried whole once more.
+        self.assertEqual(requests, [["y2026", "y2027"]])
+        cache = json.loads(self.cache_path.read_text())
+        self.assertEqual(cache["years"]["2026"]["computed_in_year"], 2027)
+        self.assertEqual(cache.get("months", {}), {})
+
+    def test_all_final_months_replace_the_year_query(self):
+        from _yearly_cache import month_key
+        cache = json.loads(self.cache_path.read_text())
+        cache["months"] = {month_key(2026, m): {"commits": 2, "fetched_at": "2027-01-05T00:00:00+00:00"}
+                           for m in range(1, 13)}
+        self.cache_path.write_text(json.dumps(cache))
+        stats, requests = self.run_stats(datetime(2027, 1, 10, tzinfo=timezone.utc), current_year=2027)
+        self.assertEqual(requests, [["y2027"]])
+        self.assertEqual(stats["commits"], 60 + 24 + 1)
+
+
 if __name__ == "__main__":
     unittest.main()